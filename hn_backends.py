@@ -0,0 +1,99 @@
+import logging
+
+from hn_fetch import TOP_STORIES_URL
+
+# --- Backends ---
+ALGOLIA_API_BASE = "https://hn.algolia.com/api/v1"
+ALGOLIA_FRONT_PAGE_HITS = 100 # The front_page tag holds ~30 stories; ask for all of them in one page
+BACKEND_FIREBASE = "firebase"
+BACKEND_ALGOLIA = "algolia"
+BACKENDS = (BACKEND_FIREBASE, BACKEND_ALGOLIA)
+
+# Backends only use the session they are given; requests itself stays off the startup path.
+class FirebaseBackend:
+    """
+    The official Hacker News (Firebase) API: one request for the ranked id
+    list, then one per item. No bulk query, so refreshes go through the
+    concurrent fetch engine.
+    """
+    name = BACKEND_FIREBASE
+    bulk = False
+
+    def __init__(self, session, top_stories_url=TOP_STORIES_URL):
+        self.session = session
+        self.top_stories_url = top_stories_url
+
+    def fetch_top_story_ids(self, timeout):
+        """Returns the ranked top story ids. Raises on network or format errors."""
+        response = self.session.get(self.top_stories_url, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def fetch_front_page(self, timeout):
+        """Not supported: callers fall back to the id list plus per-item requests."""
+        return None
+
+class AlgoliaBackend:
+    """
+    The HN Search (Algolia) API. A `front_page` tag query returns ids,
+    titles, URLs, points and authors for the whole front page in one request,
+    replacing the id list plus one request per item. Hits are converted to
+    Firebase-shaped item details, so the story filter and menu code work on
+    them unchanged. Stories come in Algolia's ranking of the front page
+    (close to, but not always exactly, the order on the site).
+    """
+    name = BACKEND_ALGOLIA
+    bulk = True
+
+    def __init__(self, session, api_base=ALGOLIA_API_BASE):
+        self.session = session
+        self.search_url = f"{api_base.rstrip('/')}/search"
+
+    def search(self, tags, hits_per_page, timeout):
+        response = self.session.get(
+            self.search_url, params={"tags": tags, "hitsPerPage": hits_per_page}, timeout=timeout
+        )
+        response.raise_for_status()
+        return response.json().get("hits") or []
+
+    def fetch_front_page(self, timeout):
+        """Returns the front page as ranked (item_id, details) pairs. Raises on network or format errors."""
+        pairs = []
+        for hit in self.search("front_page", ALGOLIA_FRONT_PAGE_HITS, timeout):
+            details = hit_to_details(hit)
+            if details is not None:
+                pairs.append((details["id"], details))
+        return pairs
+
+    def fetch_top_story_ids(self, timeout):
+        """Returns the front page's story ids. Raises on network or format errors."""
+        return [item_id for item_id, _ in self.fetch_front_page(timeout)]
+
+def hit_to_details(hit):
+    """Converts an Algolia search hit to Firebase-style item details (None if it has no usable id)."""
+    try:
+        item_id = int(hit["objectID"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    tags = hit.get("_tags") or ()
+    details = {
+        "id": item_id,
+        "type": next((item_type for item_type in ("job", "poll", "story") if item_type in tags), "story"),
+        "title": hit.get("title") or "",
+        "score": hit.get("points") or 0,
+        "by": hit.get("author"),
+        "time": hit.get("created_at_i"),
+        "descendants": hit.get("num_comments") or 0,
+    }
+    if hit.get("url"):
+        # Like Firebase, text posts have no url field at all
+        details["url"] = hit["url"]
+    return details
+
+def create_backend(name, session, firebase, algolia_api_base=ALGOLIA_API_BASE):
+    """Returns the backend called `name`, or `firebase` (the fallback) for it or an unknown name."""
+    if name == BACKEND_ALGOLIA:
+        return AlgoliaBackend(session, algolia_api_base)
+    if name != BACKEND_FIREBASE:
+        logging.warning(f"Unknown HN_BACKEND {name!r}, using {BACKEND_FIREBASE}.")
+    return firebase
@@ -0,0 +1,164 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+# --- Cache Defaults ---
+DEFAULT_ITEM_TTL_SECONDS = 7 * 24 * 3600 # Title/url/type are effectively immutable
+DEFAULT_SCORE_TTL_SECONDS = 300 # Scores move, refresh them on a short TTL
+DEFAULT_MAX_ENTRIES = 5000 # LRU size cap
+
+# Fields kept for the long item TTL; everything else is dropped before storing.
+IMMUTABLE_FIELDS = ("type", "title", "url", "by", "time")
+
+# --- Lookup States ---
+CACHE_FRESH = "fresh" # Usable as-is, no request needed
+CACHE_STALE_SCORE = "stale_score" # Usable, but the score should be re-fetched
+CACHE_NEGATIVE = "negative" # Known unlistable (comment/poll/dead), skip without a request
+
+# Bump when the meaning of stored rows changes; older caches are dropped on open.
+# 2: `eligible` means listable by some feed (stories and jobs, with or without a URL).
+CACHE_FORMAT_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    eligible INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    score INTEGER,
+    fetched_at REAL NOT NULL,
+    score_at REAL NOT NULL,
+    last_used REAL NOT NULL
+)
+"""
+
+# --- Item Cache ---
+class ItemCache:
+    """
+    On-disk (SQLite) cache of Hacker News item details.
+
+    Immutable fields live for `item_ttl` seconds, the score for `score_ttl`.
+    Items no feed can show are stored as negative entries so later refreshes
+    can skip them without a request. The cache is capped at `max_entries` rows,
+    evicting the least recently used ones on `flush()`. A cache written with
+    another CACHE_FORMAT_VERSION (SQLite user_version) is emptied on open.
+    """
+
+    def __init__(self, path, item_ttl=DEFAULT_ITEM_TTL_SECONDS,
+                 score_ttl=DEFAULT_SCORE_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.item_ttl = item_ttl
+        self.score_ttl = score_ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        (version,) = self._conn.execute("PRAGMA user_version").fetchone()
+        if version != CACHE_FORMAT_VERSION:
+            if version:
+                logging.info(f"Item cache {path} has format {version}, rebuilding it as format {CACHE_FORMAT_VERSION}.")
+            self._conn.execute("DROP TABLE IF EXISTS items")
+            self._conn.execute(f"PRAGMA user_version = {CACHE_FORMAT_VERSION}")
+        self._conn.execute(SCHEMA)
+        self._conn.commit()
+
+    def lookup(self, item_ids, now=None):
+        """
+        Looks up many ids at once.
+
+        Returns {id: (state, details)} for ids with a usable entry; missing or
+        expired ids are left out. Negative entries only carry the id and type.
+        """
+        now = time.time() if now is None else now
+        item_ids = list(item_ids)
+        results = {}
+        if not item_ids:
+            return results
+        with self._lock:
+            try:
+                self._lookup_locked(item_ids, now, results)
+            except sqlite3.Error as e:
+                logging.error(f"Error reading item cache {self.path}: {e}")
+        return results
+
+    def _lookup_locked(self, item_ids, now, results):
+        # Chunk to stay under SQLite's bound-parameter limit.
+        for start in range(0, len(item_ids), 500):
+            chunk = item_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT id, eligible, data, score, fetched_at, score_at FROM items WHERE id IN ({placeholders})",
+                chunk,
+            ).fetchall()
+            for item_id, eligible, data, score, fetched_at, score_at in rows:
+                if now - fetched_at > self.item_ttl:
+                    continue
+                details = json.loads(data)
+                details["id"] = item_id
+                if not eligible:
+                    results[item_id] = (CACHE_NEGATIVE, details)
+                    continue
+                details["score"] = score
+                state = CACHE_FRESH if now - score_at <= self.score_ttl else CACHE_STALE_SCORE
+                results[item_id] = (state, details)
+        if results:
+            self._conn.executemany(
+                "UPDATE items SET last_used = ? WHERE id = ?",
+                [(now, item_id) for item_id in results],
+            )
+
+    def store(self, item_id, details, eligible, now=None):
+        """Stores freshly fetched item details as a positive or (if not `eligible`, i.e. listable) negative entry."""
+        if not details:
+            return
+        now = time.time() if now is None else now
+        if eligible:
+            data = {field: details.get(field) for field in IMMUTABLE_FIELDS if field in details}
+        else:
+            data = {"type": details.get("type")}
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO items (id, eligible, data, score, fetched_at, score_at, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (item_id, int(eligible), json.dumps(data), details.get("score", 0), now, now, now),
+                )
+            except sqlite3.Error as e:
+                logging.error(f"Error writing item {item_id} to cache {self.path}: {e}")
+
+    def flush(self):
+        """Evicts least recently used rows over the size cap and commits pending writes."""
+        with self._lock:
+            try:
+                (count,) = self._conn.execute("SELECT COUNT(*) FROM items").fetchone()
+                overflow = count - self.max_entries
+                if overflow > 0:
+                    self._conn.execute(
+                        "DELETE FROM items WHERE id IN (SELECT id FROM items ORDER BY last_used LIMIT ?)",
+                        (overflow,),
+                    )
+                    logging.info(f"Evicted {overflow} items from the item cache.")
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logging.error(f"Error flushing item cache {self.path}: {e}")
+                self._conn.rollback()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def close(self):
+        """Flushes and closes the underlying database."""
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+# --- Settings Helper ---
+def open_item_cache(path, item_ttl=DEFAULT_ITEM_TTL_SECONDS,
+                    score_ttl=DEFAULT_SCORE_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+    """Opens the item cache, or returns None (caching disabled) if it cannot be opened."""
+    try:
+        return ItemCache(path, item_ttl=item_ttl, score_ttl=score_ttl, max_entries=max_entries)
+    except sqlite3.Error as e:
+        logging.error(f"Error opening item cache {path}: {e}. Continuing without cache.")
+        return None
@@ -0,0 +1,528 @@
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from hn_backends import ALGOLIA_API_BASE, BACKEND_FIREBASE, FirebaseBackend, create_backend
+from hn_cache import (
+    DEFAULT_ITEM_TTL_SECONDS, DEFAULT_SCORE_TTL_SECONDS, DEFAULT_MAX_ENTRIES,
+    open_item_cache,
+)
+from hn_feeds import FEEDS, fetch_feed_stories
+from hn_filters import compile_story_filter
+from hn_fetch import (
+    HN_API_BASE, DEFAULT_MAX_WORKERS,
+    create_session, fetch_eligible_stories, is_eligible_story, make_article, skip_reason,
+)
+from hn_incremental import DEFAULT_MAX_GAP_SECONDS, IncrementalRefresher
+from hn_metrics import METRICS_NDJSON_FILE, METRICS_PROM_FILE, RefreshMetrics
+from hn_schedule import (
+    DEFAULT_MIN_INTERVAL_SECONDS, DEFAULT_MAX_INTERVAL_SECONDS, DEFAULT_RETRY_BASE_SECONDS,
+    DEFAULT_BREAKER_FAILURES, DEFAULT_BREAKER_COOLDOWN_SECONDS, DEFAULT_IDLE_PAUSE_SECONDS,
+)
+from hn_trends import (
+    SCORE_HISTORY_FILE, TRENDING_FEED, DEFAULT_MAX_ITEMS, DEFAULT_SAMPLES, DEFAULT_WINDOW_SECONDS,
+    DEFAULT_EVICT_SECONDS, RANK_MOVE, TREND_RISER, TREND_FALLER, ScoreHistory,
+)
+
+# --- Configuration Defaults ---
+# These are used if settings.json is missing or invalid
+DEFAULT_SETTINGS = {
+    "MAX_TITLE_LENGTH": 50,
+    "UPDATE_INTERVAL_SECONDS": 3600,
+    "MIN_UPDATE_INTERVAL_SECONDS": DEFAULT_MIN_INTERVAL_SECONDS,
+    "MAX_UPDATE_INTERVAL_SECONDS": DEFAULT_MAX_INTERVAL_SECONDS,
+    "RETRY_BASE_SECONDS": DEFAULT_RETRY_BASE_SECONDS,
+    "CIRCUIT_BREAKER_FAILURES": DEFAULT_BREAKER_FAILURES,
+    "CIRCUIT_BREAKER_COOLDOWN_SECONDS": DEFAULT_BREAKER_COOLDOWN_SECONDS,
+    "IDLE_PAUSE_SECONDS": DEFAULT_IDLE_PAUSE_SECONDS,
+    "MAX_ARTICLES_IN_MENU": 5,
+    "REQUEST_TIMEOUT": 10,
+    "MAX_FETCH_WORKERS": DEFAULT_MAX_WORKERS,
+    "ITEM_CACHE_ENABLED": True,
+    "ITEM_TTL_SECONDS": DEFAULT_ITEM_TTL_SECONDS,
+    "SCORE_TTL_SECONDS": DEFAULT_SCORE_TTL_SECONDS,
+    "ITEM_CACHE_MAX_ENTRIES": DEFAULT_MAX_ENTRIES,
+    "INCREMENTAL_REFRESH": True,
+    "INCREMENTAL_MAX_GAP_SECONDS": DEFAULT_MAX_GAP_SECONDS,
+    "STREAMING_MODE": False,
+    "HN_API_BASE": HN_API_BASE,
+    "HN_BACKEND": BACKEND_FIREBASE, # "algolia": the whole front page in one request
+    "ALGOLIA_API_BASE": ALGOLIA_API_BASE,
+    "BACKEND_FALLBACK": True, # Use Firebase when the chosen backend fails or can't fill the menu
+    # Extra feeds shown as submenus -> number of articles (0 hides a feed; all off by default)
+    "FEEDS": {"new": 0, "best": 0, "ask": 0, "show": 0, "job": 0},
+    # Story filter, applied to every feed (empty lists / 0 / False = off)
+    "FILTER_MIN_SCORE": 0,
+    "FILTER_ALLOW_DOMAINS": [], # Only show these domains (and their subdomains)
+    "FILTER_BLOCK_DOMAINS": [],
+    "FILTER_TITLE_INCLUDE": [], # Regexes, case-insensitive; a title must match one
+    "FILTER_TITLE_EXCLUDE": [], # Regexes, case-insensitive; a title matching one is hidden
+    "HIDE_READ_STORIES": False, # Hide stories already opened from the menu
+    # Score history: trending view and riser/faller marks
+    "TREND_TRACKING": True,
+    "TRENDING_ARTICLES": 10, # Stories in the Trending submenu (0 hides it)
+    "TREND_WINDOW_SECONDS": DEFAULT_WINDOW_SECONDS,
+    "TREND_MAX_ITEMS": DEFAULT_MAX_ITEMS,
+    "TREND_SAMPLES": DEFAULT_SAMPLES,
+    "TREND_EVICT_SECONDS": DEFAULT_EVICT_SECONDS,
+    "METRICS_EXPORT_ENABLED": False,
+    "METRICS_NDJSON_FILE": METRICS_NDJSON_FILE,
+    "METRICS_PROM_FILE": METRICS_PROM_FILE,
+    "ICON_DEFAULT": "📰",
+    "ICON_ERROR": "⚠️"
+}
+SETTINGS_FILE = "settings.json"
+ITEM_CACHE_FILE = "item_cache.sqlite3" # Lives next to settings.json
+MENU_SNAPSHOT_FILE = "last_menu.json" # Last rendered articles, painted on the next launch
+
+# --- Settings Functions ---
+def load_settings(path=SETTINGS_FILE):
+    """Loads settings from JSON file or returns defaults."""
+    if not os.path.exists(path):
+        logging.warning(f"{path} not found, using default settings.")
+        return DEFAULT_SETTINGS.copy()
+    try:
+        with open(path, 'r') as f:
+            loaded = json.load(f)
+        # Ensure all keys exist, add defaults for missing ones
+        settings = DEFAULT_SETTINGS.copy()
+        settings.update(loaded) # Overwrite defaults with loaded values
+        logging.info(f"Loaded settings from {path}.")
+        return settings
+    except (json.JSONDecodeError, IOError) as e:
+        logging.error(f"Error loading {path}: {e}. Using default settings.")
+        return DEFAULT_SETTINGS.copy()
+
+# --- Menu Snapshot ---
+def save_menu_snapshot(articles, path=MENU_SNAPSHOT_FILE, feeds=None):
+    """Saves the articles (and feed submenus) just rendered so the next launch can paint them before any network work."""
+    temp_path = f"{path}.tmp"
+    try:
+        with open(temp_path, 'w') as f:
+            json.dump({"saved_at": time.time(), "articles": articles, "feeds": feeds or {}}, f)
+        os.replace(temp_path, path)
+    except (IOError, OSError, TypeError) as e:
+        logging.error(f"Error saving menu snapshot to {path}: {e}")
+
+def load_menu_snapshot(path=MENU_SNAPSHOT_FILE):
+    """Returns (articles, saved_at, feeds) from the last saved menu, or None if there is no usable snapshot."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r') as f:
+            snapshot = json.load(f)
+        articles = snapshot["articles"]
+        if not articles:
+            return None
+        return articles, snapshot.get("saved_at"), snapshot.get("feeds") or {}
+    except (json.JSONDecodeError, IOError, KeyError, TypeError) as e:
+        logging.error(f"Error loading menu snapshot from {path}: {e}")
+        return None
+
+# --- Title Formatting ---
+MENU_TITLE_MAX_LENGTH = 75 # Menu rows are cut a little before this many characters
+
+def format_menu_bar_title(article, icon, max_title_length):
+    """Formats the menu bar title for the top article, truncated to `max_title_length`."""
+    score = article.get('score', 0)
+    title = article.get('title', 'No Title')
+    prefix = f"{icon} [{score}] "
+    available_title_len = max(0, max_title_length - len(prefix))
+    truncated_article_title = (title[:available_title_len] + '...') if len(title) > available_title_len else title
+    return f"{prefix}{truncated_article_title}"
+
+TREND_MARKERS = {TREND_RISER: "▲ ", TREND_FALLER: "▼ "} # Shown before the score of moving stories
+
+def format_menu_title(index, article):
+    """Formats the dropdown row for the article at 0-based `index`."""
+    score = article.get('score', 0)
+    title = article.get('title', 'No Title')
+    marker = TREND_MARKERS.get(article.get('trend'), "")
+    menu_title = f"{index+1}. {marker}[{score}] {title}"
+    max_len = MENU_TITLE_MAX_LENGTH - (len(str(score)) + 4)
+    return (menu_title[:max_len] + '...') if len(menu_title) > max_len else menu_title
+
+def format_trending_title(index, article):
+    """Formats a Trending row: the article's points/hour instead of its score."""
+    speed = f"+{article.get('velocity', 0):.0f}/h"
+    title = article.get('title', 'No Title')
+    menu_title = f"{index+1}. [{speed}] {title}"
+    max_len = MENU_TITLE_MAX_LENGTH - (len(speed) + 4)
+    return (menu_title[:max_len] + '...') if len(menu_title) > max_len else menu_title
+
+# --- Headless Refresh Pipeline ---
+class HackerNewsCore:
+    """
+    The refresh pipeline without any UI: top story ids -> item details -> articles.
+
+    Built from a settings dict (missing keys fall back to DEFAULT_SETTINGS).
+    `HN_API_BASE` selects the API server, so the pipeline can be pointed at a
+    local stand-in. `HN_BACKEND` picks the source of the top stories: with a
+    bulk backend (Algolia) a refresh reads the whole front page in one
+    request, falling back to Firebase if enabled. `on_error(subtitle,
+    message)` is called when the top stories cannot be fetched; the app uses
+    it for notifications. With TREND_TRACKING, every refresh adds a snapshot
+    to a ScoreHistory (saved to `score_history_path`, kept in memory if None),
+    which marks risers and fallers and fills the Trending feed.
+    The story filter is compiled once from the settings; `read_history` (a
+    ReadHistory) backs HIDE_READ_STORIES.
+
+    Each fetch_articles()/fetch_feeds() call is recorded in `metrics` and
+    returns its cycle with the result; callers close that cycle with
+    finish_cycle(cycle) once the result has been rendered.
+    """
+
+    def __init__(self, settings=None, session=None, item_cache_path=ITEM_CACHE_FILE, on_error=None,
+                 read_history=None, score_history_path=SCORE_HISTORY_FILE):
+        from hn_session import InstrumentedSession # Pulls in requests; keep it off the import path
+
+        # Shared with the caller, so settings changed at runtime are picked up
+        self.settings = settings if settings is not None else DEFAULT_SETTINGS.copy()
+        self.on_error = on_error
+
+        api_base = self.get("HN_API_BASE").rstrip("/")
+        self.feed_urls = {feed: f"{api_base}/{endpoint}.json" for feed, (endpoint, _) in FEEDS.items()}
+        self.top_stories_url = self.feed_urls["top"]
+        self.item_url_template = f"{api_base}/item/{{}}.json"
+        self.updates_url = f"{api_base}/updates.json"
+
+        # One pooled keep-alive session shared by all refreshes, reporting to the metrics
+        self.metrics = RefreshMetrics()
+        self.session = session or create_session(
+            pool_size=self.get("MAX_FETCH_WORKERS"), session_class=InstrumentedSession
+        )
+        if isinstance(self.session, InstrumentedSession):
+            self.session.metrics = self.metrics
+        self.item_cache = None
+        if self.get("ITEM_CACHE_ENABLED") and item_cache_path:
+            self.item_cache = open_item_cache(
+                item_cache_path,
+                item_ttl=self.get("ITEM_TTL_SECONDS"),
+                score_ttl=self.get("SCORE_TTL_SECONDS"),
+                max_entries=self.get("ITEM_CACHE_MAX_ENTRIES"),
+            )
+        self.incremental = None
+        if self.get("INCREMENTAL_REFRESH"):
+            self.incremental = IncrementalRefresher(
+                max_gap=self.get("INCREMENTAL_MAX_GAP_SECONDS"), updates_url=self.updates_url
+            )
+        self.read_history = read_history
+        self.firebase = FirebaseBackend(self.session, self.top_stories_url)
+        self.backend = create_backend(
+            self.get("HN_BACKEND"), self.session, self.firebase, algolia_api_base=self.get("ALGOLIA_API_BASE")
+        )
+        self.story_filter = compile_story_filter({**DEFAULT_SETTINGS, **self.settings}, read_history)
+        self.trends = None
+        if self.get("TREND_TRACKING"):
+            self.trends = ScoreHistory(
+                score_history_path,
+                max_items=self.get("TREND_MAX_ITEMS"),
+                samples=self.get("TREND_SAMPLES"),
+                evict_seconds=self.get("TREND_EVICT_SECONDS"),
+            )
+        self.top_ids = [] # Ranked top list of the last cycle, for rank tracking
+
+    def get(self, key):
+        """Returns a setting, falling back to its default."""
+        return self.settings.get(key, DEFAULT_SETTINGS[key])
+
+    def backends(self):
+        """Returns the backends to try in order: the configured one, then Firebase if falling back."""
+        if self.backend is self.firebase or not self.get("BACKEND_FALLBACK"):
+            return [self.backend]
+        return [self.backend, self.firebase]
+
+    def fetch_top_story_ids(self, skip_bulk=False):
+        """
+        Fetches top story IDs from Hacker News, or None on failure.
+
+        `skip_bulk` leaves out bulk backends, for a cycle whose front page request already failed.
+        """
+        import requests
+
+        error = None
+        for backend in self.backends():
+            if skip_bulk and backend.bulk:
+                continue
+            try:
+                logging.info(f"Fetching top story IDs from {backend.name}")
+                story_ids = backend.fetch_top_story_ids(self.get("REQUEST_TIMEOUT"))
+                logging.info(f"Fetched {len(story_ids)} top story IDs.")
+                return story_ids
+            except requests.exceptions.RequestException as e:
+                logging.error(f"Error fetching top stories from {backend.name}: {e}")
+                error = ("Network Error", f"Could not fetch top stories: {e}")
+            except Exception as e:
+                logging.error(f"Unexpected error fetching top story IDs from {backend.name}: {e}")
+                error = ("API Error", f"Could not process top stories response: {e}")
+        if error is not None:
+            self._report_error(*error)
+        return None
+
+    def fetch_feed_ids(self, feed):
+        """Fetches a feed's story IDs, or None on failure (only the top feed reports errors)."""
+        if feed == "top":
+            return self.fetch_top_story_ids(skip_bulk=True)
+        import requests
+
+        try:
+            response = self.session.get(self.feed_urls[feed], timeout=self.get("REQUEST_TIMEOUT"))
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            logging.warning(f"Error fetching the {feed} feed: {e}")
+            return None
+        except Exception as e:
+            logging.warning(f"Unexpected error processing the {feed} feed: {e}")
+            return None
+
+    def feed_limits(self):
+        """Returns {feed: number of articles} for the enabled feeds, top first."""
+        limits = {"top": self.get("MAX_ARTICLES_IN_MENU")}
+        extra_feeds = self.get("FEEDS") or {}
+        for feed in FEEDS:
+            if feed != "top" and extra_feeds.get(feed, 0) > 0:
+                limits[feed] = extra_feeds[feed]
+        return limits
+
+    def fetch_bulk_articles(self, max_articles, stats):
+        """
+        Reads the top articles from a bulk backend's front page in one request.
+
+        Returns the articles, or None if the request failed (the Firebase path
+        runs instead when falling back). When falling back, a front page
+        without `max_articles` stories passing the filter is topped up from
+        Firebase; without fallback a failure is reported and a short list is
+        returned as is.
+        """
+        import requests
+
+        fallback = self.get("BACKEND_FALLBACK")
+        try:
+            pairs = self.backend.fetch_front_page(self.get("REQUEST_TIMEOUT"))
+            self.top_ids = [item_id for item_id, _ in pairs]
+        except (requests.exceptions.RequestException, ValueError, AttributeError) as e:
+            logging.warning(f"Error fetching the front page from {self.backend.name}: {e}")
+            if not fallback:
+                self._report_error("Network Error", f"Could not fetch the front page: {e}")
+            return None
+
+        articles = []
+        skipped_by_type = {}
+        for item_id, details in pairs:
+            if len(articles) >= max_articles:
+                break
+            if not is_eligible_story(details):
+                reason = skip_reason(details)
+            elif self.story_filter and not self.story_filter(item_id, details):
+                reason = "filtered"
+            else:
+                articles.append(make_article(item_id, details))
+                continue
+            skipped_by_type[reason] = skipped_by_type.get(reason, 0) + 1
+        stats.update({
+            "item_requests": 0,
+            "cache_hits": 0,
+            "items_examined": len(pairs),
+            "skipped_by_type": skipped_by_type,
+            "backend": self.backend.name,
+        })
+        if len(articles) < max_articles and fallback:
+            self._top_up_articles(articles, max_articles, stats)
+        else:
+            logging.info(f"Read {len(articles)} articles from the {self.backend.name} front page in one request.")
+        return articles
+
+    def _top_up_articles(self, articles, max_articles, stats):
+        """
+        Fills a short front page up to `max_articles` from the Firebase top
+        stories, skipping the ids the front page already listed. On failure
+        the front page is kept as it is.
+        """
+        import requests
+
+        missing = max_articles - len(articles)
+        logging.info(
+            f"The {self.backend.name} front page has only {len(articles)} of {max_articles} articles, "
+            f"fetching {missing} more from {self.firebase.name}."
+        )
+        try:
+            story_ids = self.firebase.fetch_top_story_ids(self.get("REQUEST_TIMEOUT"))
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logging.warning(f"Error fetching top story IDs from {self.firebase.name}, keeping the front page: {e}")
+            return
+        seen = set(self.top_ids)
+        remaining_ids = [item_id for item_id in story_ids if item_id not in seen]
+        self.top_ids = self.top_ids + remaining_ids
+        top_up_stats = {}
+        articles.extend(fetch_eligible_stories(
+            self.session, remaining_ids, missing, self.get("REQUEST_TIMEOUT"),
+            max_workers=self.get("MAX_FETCH_WORKERS"), cache=self.item_cache, stats=top_up_stats,
+            item_url_template=self.item_url_template, story_filter=self.story_filter
+        ))
+        for key in ("item_requests", "cache_hits", "items_examined"):
+            stats[key] += top_up_stats.get(key, 0)
+        for reason, count in top_up_stats.get("skipped_by_type", {}).items():
+            stats["skipped_by_type"][reason] = stats["skipped_by_type"].get(reason, 0) + count
+        stats["backend"] = f"{self.backend.name}+{self.firebase.name}"
+
+    def fetch_articles(self, story_ids=None):
+        """
+        Runs the fetch phase of one refresh cycle. Returns (articles, cycle):
+        the article list, or None if the IDs could not be fetched, and the
+        metrics cycle to pass to finish_cycle().
+
+        `story_ids` can be supplied by a caller that already has the list (e.g. the stream).
+        """
+        self.metrics.begin_cycle()
+        stats = {}
+        articles = self._fetch_articles(story_ids, stats)
+        return articles, self.metrics.end_fetch(articles, stats)
+
+    def _fetch_articles(self, story_ids, stats):
+        max_articles = self.get("MAX_ARTICLES_IN_MENU")
+        if story_ids is None and self.backend.bulk:
+            articles = self.fetch_bulk_articles(max_articles, stats)
+            if articles is not None or not self.get("BACKEND_FALLBACK"):
+                return articles
+        if story_ids is None:
+            story_ids = self.fetch_top_story_ids(skip_bulk=True)
+            if story_ids is None:
+                return None
+        self.top_ids = story_ids
+
+        timeout = self.get("REQUEST_TIMEOUT")
+        max_workers = self.get("MAX_FETCH_WORKERS")
+        if self.incremental is not None:
+            articles = self.incremental.refresh(
+                self.session, story_ids, max_articles, timeout, max_workers=max_workers,
+                cache=self.item_cache, stats=stats, item_url_template=self.item_url_template,
+                story_filter=self.story_filter
+            )
+        else:
+            articles = fetch_eligible_stories(
+                self.session, story_ids, max_articles, timeout, max_workers=max_workers,
+                cache=self.item_cache, stats=stats, item_url_template=self.item_url_template,
+                story_filter=self.story_filter
+            )
+        return articles
+
+    def fetch_feeds(self, story_ids=None):
+        """
+        Runs the fetch phase of one refresh cycle for every enabled feed.
+
+        Returns (feeds, cycle): {feed: articles}, with None for a feed whose
+        list could not be fetched, or None if the top story IDs could not be
+        fetched, and the metrics cycle to pass to finish_cycle(). All feeds
+        share one scheduler, so an item listed by several feeds is fetched once.
+        With a bulk backend the top feed comes from its front page instead.
+        With trend tracking the result also has the Trending feed.
+        """
+        self.metrics.begin_cycle()
+        stats = {}
+        feeds = self._fetch_feeds(story_ids, stats)
+        cycle = self.metrics.end_fetch(feeds["top"] if feeds is not None else None, stats)
+        if feeds is not None and self.trends is not None:
+            self.update_trends(feeds)
+        return feeds, cycle
+
+    def update_trends(self, feeds, now=None):
+        """
+        Adds this cycle's scores and top-list ranks to the score history, marks
+        risers and fallers in the top feed (article["trend"]) and sets the
+        Trending feed to the fastest-rising stories shown anywhere.
+        """
+        now = time.time() if now is None else now
+        window = self.get("TREND_WINDOW_SECONDS")
+        shown = {}
+        for articles in feeds.values():
+            for article in articles or ():
+                shown.setdefault(article["id"], article)
+        ranks = {item_id: rank for rank, item_id in enumerate(self.top_ids, 1) if item_id in shown}
+        self.trends.record(now, {
+            item_id: (article.get("score", 0), ranks.get(item_id, 0)) for item_id, article in shown.items()
+        })
+
+        for article in feeds["top"]:
+            change = self.trends.rank_change(article["id"], now, window)
+            if change is not None and change >= RANK_MOVE:
+                article["trend"] = TREND_RISER
+            elif change is not None and change <= -RANK_MOVE:
+                article["trend"] = TREND_FALLER
+        limit = self.get("TRENDING_ARTICLES")
+        if limit > 0:
+            feeds[TRENDING_FEED] = [
+                dict(shown[item_id], velocity=round(velocity, 1))
+                for item_id, velocity in self.trends.trending(now, limit, window) if item_id in shown
+            ]
+
+    def _fetch_feeds(self, story_ids, stats):
+        limits = self.feed_limits()
+        if len(limits) == 1:
+            articles = self._fetch_articles(story_ids, stats)
+            return None if articles is None else {"top": articles}
+
+        top_stats = {}
+        top_articles = None
+        if story_ids is None and self.backend.bulk:
+            top_articles = self.fetch_bulk_articles(limits["top"], top_stats)
+            if top_articles is None and not self.get("BACKEND_FALLBACK"):
+                return None
+        scheduled_limits = dict(limits)
+        if top_articles is not None:
+            del scheduled_limits["top"]
+
+        feed_ids = {"top": story_ids} if story_ids is not None else {}
+        # The feed lists are independent requests; fetch them side by side
+        with ThreadPoolExecutor(max_workers=len(limits), thread_name_prefix="hn-feed-ids") as executor:
+            futures = {
+                feed: executor.submit(self.fetch_feed_ids, feed) for feed in scheduled_limits if feed not in feed_ids
+            }
+            feed_ids.update((feed, future.result()) for feed, future in futures.items())
+        if top_articles is None and feed_ids["top"] is None:
+            return None
+        if feed_ids.get("top") is not None:
+            self.top_ids = feed_ids["top"]
+
+        available = {feed: feed_ids[feed] for feed in scheduled_limits if feed_ids[feed] is not None}
+        timeout = self.get("REQUEST_TIMEOUT")
+        max_workers = self.get("MAX_FETCH_WORKERS")
+        if self.incremental is not None:
+            feed_articles = self.incremental.refresh_feeds(
+                self.session, available, limits, timeout, max_workers=max_workers,
+                cache=self.item_cache, stats=stats, item_url_template=self.item_url_template,
+                story_filter=self.story_filter
+            )
+        else:
+            feed_articles = fetch_feed_stories(
+                self.session, available, limits, timeout, max_workers=max_workers,
+                cache=self.item_cache, stats=stats, item_url_template=self.item_url_template,
+                story_filter=self.story_filter
+            )
+        if top_articles is not None:
+            feed_articles["top"] = top_articles
+            for key in ("item_requests", "cache_hits", "items_examined"):
+                stats[key] = stats.get(key, 0) + top_stats[key]
+            stats["skipped_by_type"] = top_stats["skipped_by_type"]
+            stats["backend"] = top_stats["backend"]
+        return {feed: feed_articles.get(feed) for feed in limits}
+
+    def finish_cycle(self, cycle, menu_build_seconds=0.0):
+        """Closes `cycle` (from fetch_articles()/fetch_feeds()), exporting it if enabled. Returns its snapshot."""
+        cycle = self.metrics.finish_cycle(cycle, menu_build_seconds)
+        if cycle is not None and self.get("METRICS_EXPORT_ENABLED"):
+            self.metrics.write_ndjson(self.get("METRICS_NDJSON_FILE"))
+            self.metrics.write_prometheus(self.get("METRICS_PROM_FILE"))
+        return cycle
+
+    def close(self):
+        """Releases the session and item cache."""
+        if self.item_cache is not None:
+            self.item_cache.close()
+        self.session.close()
+
+    def _report_error(self, subtitle, message):
+        if self.on_error is not None:
+            self.on_error(subtitle, message)
@@ -0,0 +1,173 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from hn_cache import CACHE_FRESH, CACHE_NEGATIVE
+from hn_filters import FILTERED_CANDIDATE_MULTIPLIER
+from hn_fetch import (
+    DEFAULT_MAX_WORKERS, CANDIDATE_MULTIPLIER, INELIGIBLE_ALLOWANCE, ITEM_URL_TEMPLATE,
+    fetch_item, is_eligible_story, is_listable_item, make_article, skip_reason,
+)
+
+# --- Feeds ---
+# name -> (API endpoint, submenu label), in menu order
+FEEDS = {
+    "top": ("topstories", "Top"),
+    "new": ("newstories", "New"),
+    "best": ("beststories", "Best"),
+    "ask": ("askstories", "Ask HN"),
+    "show": ("showstories", "Show HN"),
+    "job": ("jobstories", "Jobs"),
+}
+HN_ITEM_PAGE_URL = "https://news.ycombinator.com/item?id={}" # Discussion page, for posts without a URL
+
+def is_feed_item(feed, details):
+    """Returns True if `details` can be shown in `feed`'s menu."""
+    if feed == "job":
+        return is_listable_item(details) and details.get("type") == "job"
+    if feed in ("ask", "show"):
+        # Ask HN posts (and some Show HN ones) are text posts without a URL
+        return is_listable_item(details) and details.get("type") == "story"
+    return is_eligible_story(details)
+
+def make_feed_article(item_id, details):
+    """Builds a menu article, linking posts without a URL to their discussion page."""
+    article = make_article(item_id, details)
+    if not article["url"]:
+        article["url"] = HN_ITEM_PAGE_URL.format(item_id)
+    return article
+
+# --- Shared Scheduler ---
+def fetch_feed_stories(session, feed_ids, limits, timeout,
+                       max_workers=DEFAULT_MAX_WORKERS,
+                       item_url_template=ITEM_URL_TEMPLATE,
+                       cache=None, overrides=None, observed=None, stats=None,
+                       story_filter=None):
+    """
+    Fetches the articles of several feeds at once. Returns {feed: articles}.
+
+    `feed_ids` maps feed names to their ranked id lists and `limits` to the
+    number of articles wanted from each. The ids needed across all feeds are
+    collected into one set, so an item listed by several feeds is fetched (or
+    read from the cache) once per cycle, and every menu is built from the
+    shared results. Work is scheduled in waves: each wave asks for the ids
+    still needed to fill every feed (plus an allowance for items a feed will
+    skip), ordered by rank across feeds so the visible top of each feed is
+    requested first. Later waves only run for feeds left short.
+
+    `cache`, `overrides`, `observed`, `stats` and `story_filter` work as in
+    fetch_eligible_stories(); the filter applies to every feed.
+    """
+    def shows(feed, item_id, details):
+        return is_feed_item(feed, details) and (not story_filter or story_filter(item_id, details))
+
+    multiplier = FILTERED_CANDIDATE_MULTIPLIER if story_filter else CANDIDATE_MULTIPLIER
+    feeds = [feed for feed in feed_ids if limits.get(feed, 0) > 0 and feed_ids[feed]]
+    results = {} # id -> details (None if it could not be fetched)
+    cursors = dict.fromkeys(feeds, 0)
+    requests_sent = cache_hits = skipped_negative = shared_items = waves = 0
+    skipped_by_type = {}
+    executor = None
+    try:
+        while True:
+            wanted = {} # id -> (rank, feed position), best one wins
+            for position, feed in enumerate(feeds):
+                ids = feed_ids[feed]
+                max_candidates = min(len(ids), limits[feed] * multiplier)
+                found = sum(1 for item_id in ids[:cursors[feed]] if shows(feed, item_id, results.get(item_id)))
+                needed = limits[feed] - found
+                budget = needed + needed // INELIGIBLE_ALLOWANCE + 1 if needed > 0 else 0
+                while budget > 0 and cursors[feed] < max_candidates:
+                    item_id = ids[cursors[feed]]
+                    cursors[feed] += 1
+                    if item_id in results:
+                        # Already resolved for another feed: free for this one
+                        shared_items += 1
+                        if shows(feed, item_id, results[item_id]):
+                            budget -= 1
+                        continue
+                    rank = (cursors[feed] - 1, position)
+                    if item_id in wanted:
+                        shared_items += 1
+                        rank = min(rank, wanted[item_id])
+                    wanted[item_id] = rank
+                    budget -= 1
+            if not wanted:
+                break
+            waves += 1
+
+            ordered_ids = sorted(wanted, key=wanted.get)
+            cached = cache.lookup(ordered_ids) if cache is not None else {}
+            if overrides:
+                cached.update((item_id, overrides[item_id]) for item_id in ordered_ids if item_id in overrides)
+            network = []
+            for item_id in ordered_ids:
+                state, cached_details = cached.get(item_id, (None, None))
+                if state == CACHE_NEGATIVE:
+                    skipped_negative += 1
+                    results[item_id] = cached_details
+                elif state == CACHE_FRESH:
+                    cache_hits += 1
+                    results[item_id] = cached_details
+                else:
+                    network.append((item_id, cached_details))
+            if not network:
+                continue
+
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=max(1, min(max_workers, len(network))), thread_name_prefix="hn-feeds"
+                )
+            # The pool runs submissions in order, so visible items go out first.
+            futures = [
+                (item_id, executor.submit(fetch_item, session, item_id, timeout, item_url_template), fallback)
+                for item_id, fallback in network
+            ]
+            requests_sent += len(futures)
+            for item_id, future, fallback in futures:
+                details = future.result()
+                if details:
+                    if cache is not None:
+                        cache.store(item_id, details, is_listable_item(details))
+                elif fallback is not None:
+                    details = fallback
+                results[item_id] = details
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False)
+        if cache is not None:
+            cache.flush()
+
+    feed_articles = {}
+    for feed in feed_ids:
+        limit = limits.get(feed, 0)
+        articles = []
+        for item_id in feed_ids[feed][:cursors.get(feed, 0)]:
+            if len(articles) >= limit:
+                break
+            details = results.get(item_id)
+            if shows(feed, item_id, details):
+                articles.append(make_feed_article(item_id, details))
+            elif feed == "top":
+                reason = "filtered" if is_feed_item(feed, details) else skip_reason(details)
+                skipped_by_type[reason] = skipped_by_type.get(reason, 0) + 1
+        if len(articles) < limit:
+            logging.warning(f"Feed '{feed}' has only {len(articles)} of {limit} articles.")
+        feed_articles[feed] = articles
+
+    if observed is not None:
+        observed.update((item_id, details) for item_id, details in results.items() if details)
+    if stats is not None:
+        stats.update({
+            "item_requests": requests_sent,
+            "cache_hits": cache_hits,
+            "skipped_negative": skipped_negative,
+            "items_examined": len(results),
+            "skipped_by_type": skipped_by_type,
+            "shared_items": shared_items,
+            "waves": waves,
+        })
+    logging.info(
+        f"Feed fetch for {len(feeds)} feeds used {requests_sent} requests in {waves} waves "
+        f"({cache_hits} cache hits, {shared_items} ids shared between feeds)."
+    )
+    return feed_articles
@@ -0,0 +1,243 @@
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from hn_cache import CACHE_FRESH, CACHE_NEGATIVE
+from hn_filters import FILTERED_CANDIDATE_MULTIPLIER
+
+# --- Hacker News API ---
+HN_API_BASE = "https://hacker-news.firebaseio.com/v0"
+TOP_STORIES_URL = f"{HN_API_BASE}/topstories.json"
+ITEM_URL_TEMPLATE = f"{HN_API_BASE}/item/{{}}.json" # Use .format()
+
+# --- Fetch Engine Defaults ---
+DEFAULT_MAX_WORKERS = 32 # Upper bound on concurrent item requests
+CANDIDATE_MULTIPLIER = 5 # Look at most this many ids per wanted article
+INELIGIBLE_ALLOWANCE = 4 # Expect roughly one in this many candidates to be skipped
+LISTABLE_TYPES = ("story", "job") # Item types any feed can show; the cache keeps full details for these
+
+# --- Session Functions ---
+# requests is imported on first use: it is the slowest import on the startup path.
+def create_session(pool_size=DEFAULT_MAX_WORKERS, session_class=None):
+    """Creates a requests Session (or `session_class` instance) whose keep-alive pool fits `pool_size` workers."""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = (session_class or requests.Session)()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def fetch_item(session, item_id, timeout, item_url_template=ITEM_URL_TEMPLATE):
+    """Fetches details for a specific Hacker News item, or None on failure."""
+    import requests
+
+    url = item_url_template.format(item_id)
+    try:
+        response = session.get(url, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.RequestException as e:
+        logging.warning(f"Error fetching item {item_id}: {e}")
+        return None
+    except Exception as e:
+        logging.error(f"Unexpected error fetching item {item_id}: {e}")
+        return None
+
+# --- Story Helpers ---
+def is_eligible_story(details):
+    """Returns True for items that can be shown in the menu (stories with a URL)."""
+    return bool(details) and details.get("type") == "story" and bool(details.get("url"))
+
+def is_listable_item(details):
+    """Returns True for items some feed can show (live stories and jobs with a title), with or without a URL."""
+    return (
+        bool(details) and details.get("type") in LISTABLE_TYPES and bool(details.get("title"))
+        and not details.get("dead") and not details.get("deleted")
+    )
+
+def skip_reason(details):
+    """Classifies why an item is not shown: its type, 'no_url', or 'error' if it could not be fetched."""
+    if not details:
+        return "error"
+    item_type = details.get("type") or "unknown"
+    if item_type != "story":
+        return item_type
+    return "no_url"
+
+def make_article(item_id, details):
+    """Builds the article dict used by the menu from raw item details."""
+    return {
+        "title": details.get("title", "No Title Provided"),
+        "url": details.get("url"),
+        "id": item_id,
+        "score": details.get("score", 0)
+    }
+
+def _resolved(value):
+    """Wraps an already known value in a completed Future."""
+    future = Future()
+    future.set_result(value)
+    return future
+
+# --- Concurrent Fetching ---
+def fetch_eligible_stories(session, story_ids, max_articles, timeout,
+                           max_workers=DEFAULT_MAX_WORKERS,
+                           item_url_template=ITEM_URL_TEMPLATE,
+                           cache=None, overrides=None, observed=None, stats=None,
+                           story_filter=None):
+    """
+    Fetches items concurrently and returns up to `max_articles` eligible stories.
+
+    Requests run on a bounded worker pool sharing `session`'s connection pool.
+    Results are consumed in the original `story_ids` rank order, so the returned
+    list keeps the topstories ordering. Only about as many requests as stories
+    still needed are kept in flight; once enough eligible stories are in hand no
+    further work is submitted and requests that have not started are dropped.
+
+    With an ItemCache, fresh entries are used without a request, known
+    ineligible items are skipped outright, and entries whose score has gone
+    stale are re-fetched (falling back to the cached copy if that fails).
+    `overrides` maps ids to (state, details) pairs that take precedence over
+    the cache, using the same states.
+
+    `story_filter(item_id, details)` (see hn_filters) is applied to each story
+    as it arrives, before it counts towards `max_articles`; with a filter the
+    search looks further down the list. Filtered items are never cached as
+    negative, since the filter (e.g. read history) can change.
+
+    If given, `observed` receives the details of every item examined (by id)
+    and `stats` is filled with request/cache counters for the cycle.
+    """
+    multiplier = FILTERED_CANDIDATE_MULTIPLIER if story_filter else CANDIDATE_MULTIPLIER
+    max_ids_to_process = min(len(story_ids), max_articles * multiplier)
+    candidate_ids = story_ids[:max_ids_to_process]
+    if max_articles <= 0 or not candidate_ids:
+        return []
+
+    cached = cache.lookup(candidate_ids) if cache is not None else {}
+    if overrides:
+        cached.update((item_id, overrides[item_id]) for item_id in candidate_ids if item_id in overrides)
+    workers = max(1, min(max_workers, len(candidate_ids)))
+    cancelled = threading.Event()
+
+    def fetch_unless_cancelled(item_id):
+        if cancelled.is_set():
+            return None
+        return fetch_item(session, item_id, timeout, item_url_template)
+
+    fetched_articles = []
+    pending = deque()
+    next_index = 0
+    requests_sent = cache_hits = skipped_negative = items_examined = 0
+    # Queued entries already known to be stories (cached), and network requests in flight.
+    known_queued = unknown_queued = network_queued = 0
+    skipped_by_type = {}
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hn-fetch")
+    try:
+        # Keep enough requests in flight to cover the stories still needed (plus an
+        # allowance for jobs/polls/url-less posts), refilling as the rank-ordered head resolves.
+        # Cached stories are certain, so they shrink the number of unknown items requested.
+        while True:
+            while next_index < len(candidate_ids):
+                item_id = candidate_ids[next_index]
+                state, cached_details = cached.get(item_id, (None, None))
+                uncertain_needed = max_articles - len(fetched_articles) - known_queued
+                if state == CACHE_NEGATIVE:
+                    skipped_negative += 1
+                    items_examined += 1
+                    reason = skip_reason(cached_details)
+                    skipped_by_type[reason] = skipped_by_type.get(reason, 0) + 1
+                    if observed is not None:
+                        observed[item_id] = cached_details
+                elif state is not None and not is_eligible_story(cached_details):
+                    # Listable in another feed (a job, an Ask HN post); type and url never change
+                    cache_hits += 1
+                    items_examined += 1
+                    reason = skip_reason(cached_details)
+                    skipped_by_type[reason] = skipped_by_type.get(reason, 0) + 1
+                    if observed is not None:
+                        observed[item_id] = cached_details
+                elif state == CACHE_FRESH and story_filter and not story_filter(item_id, cached_details):
+                    # Known to be filtered out, no need to queue it
+                    cache_hits += 1
+                    items_examined += 1
+                    skipped_by_type["filtered"] = skipped_by_type.get("filtered", 0) + 1
+                    if observed is not None:
+                        observed[item_id] = cached_details
+                elif state == CACHE_FRESH:
+                    cache_hits += 1
+                    known_queued += 1
+                    pending.append((item_id, _resolved(cached_details), False, True, None))
+                elif network_queued >= workers or uncertain_needed <= 0:
+                    break
+                elif cached_details is not None:
+                    # Known story with a stale score: re-fetch it, keeping the cached copy as fallback.
+                    requests_sent += 1
+                    known_queued += 1
+                    network_queued += 1
+                    pending.append((item_id, executor.submit(fetch_unless_cancelled, item_id), True, True, cached_details))
+                elif unknown_queued < uncertain_needed + uncertain_needed // INELIGIBLE_ALLOWANCE + 1:
+                    requests_sent += 1
+                    unknown_queued += 1
+                    network_queued += 1
+                    pending.append((item_id, executor.submit(fetch_unless_cancelled, item_id), True, False, None))
+                else:
+                    break
+                next_index += 1
+            if not pending:
+                break
+
+            item_id, future, from_network, known_story, fallback = pending.popleft()
+            details = future.result()
+            items_examined += 1
+            if known_story:
+                known_queued -= 1
+            else:
+                unknown_queued -= 1
+            if from_network:
+                network_queued -= 1
+                # Remember what the network returned, or fall back to the stale cached copy.
+                if details:
+                    if cache is not None:
+                        cache.store(item_id, details, is_listable_item(details))
+                elif fallback is not None:
+                    details = fallback
+            if observed is not None and details:
+                observed[item_id] = details
+            eligible = is_eligible_story(details)
+            if eligible and (not story_filter or story_filter(item_id, details)):
+                fetched_articles.append(make_article(item_id, details))
+                if len(fetched_articles) >= max_articles:
+                    logging.info(f"Reached target of {max_articles} articles.")
+                    break
+            else:
+                reason = "filtered" if eligible else skip_reason(details)
+                skipped_by_type[reason] = skipped_by_type.get(reason, 0) + 1
+    finally:
+        cancelled.set()
+        for item_id, future, from_network, _, _ in pending:
+            # Requests that already finished are not wasted: keep them for the next refresh.
+            if cache is not None and from_network and future.done() and not future.cancelled():
+                details = future.result()
+                if details:
+                    cache.store(item_id, details, is_listable_item(details))
+            future.cancel()
+        executor.shutdown(wait=False)
+        if cache is not None:
+            cache.flush()
+
+    if stats is not None:
+        stats.update({
+            "item_requests": requests_sent,
+            "cache_hits": cache_hits,
+            "skipped_negative": skipped_negative,
+            "items_examined": items_examined,
+            "skipped_by_type": skipped_by_type,
+        })
+    logging.info(f"Item fetch used {requests_sent} requests ({cache_hits} cache hits, {skipped_negative} known ineligible skipped).")
+    if len(fetched_articles) < max_articles:
+        logging.warning(f"Processed {max_ids_to_process} IDs without finding enough articles.")
+    return fetched_articles
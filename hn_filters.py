@@ -0,0 +1,110 @@
+import logging
+import re
+from urllib.parse import urlsplit
+
+# --- Filter Defaults ---
+HN_DOMAIN = "news.ycombinator.com" # Domain of posts without a URL (Ask HN, text jobs)
+FILTERED_CANDIDATE_MULTIPLIER = 20 # With a filter, look this far down a feed for enough matches
+
+def _domain_set(domains):
+    """Normalizes configured domains ("www.Example.com/" -> "example.com")."""
+    normalized = set()
+    for domain in domains or ():
+        domain = domain.strip().lower().rstrip("/")
+        if domain.startswith("www."):
+            domain = domain[4:]
+        if domain:
+            normalized.add(domain)
+    return normalized
+
+def _compile_patterns(patterns, setting):
+    """Compiles a list of regexes into one case-insensitive alternation, or None if empty."""
+    valid = []
+    for pattern in patterns or ():
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            logging.error(f"Ignoring invalid {setting} pattern {pattern!r}: {e}")
+            continue
+        valid.append(f"(?:{pattern})")
+    return re.compile("|".join(valid), re.IGNORECASE) if valid else None
+
+def item_domain(details):
+    """Returns the lower-case host of an item's URL without "www.", or HN's domain for text posts."""
+    url = details.get("url")
+    if not url:
+        return HN_DOMAIN
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+def _matches_domain(host, domains):
+    """True if `host` or one of its parent domains is in `domains` (one set lookup per label)."""
+    while host:
+        if host in domains:
+            return True
+        _, _, host = host.partition(".")
+    return False
+
+# --- Story Filter ---
+class StoryFilter:
+    """
+    A compiled story filter: call it with (item_id, details) to decide whether
+    a listable item may be shown.
+
+    Everything is prepared once from the settings: domains become sets
+    (a host matches itself or any parent domain), title patterns one
+    alternation regex each, and read ids are looked up in ReadHistory. Checks
+    run cheapest first, so most rejections cost a set lookup or a comparison.
+    The fetch loops apply it to items as they arrive and stop as soon as
+    enough have passed.
+    """
+
+    def __init__(self, min_score=0, allow_domains=(), block_domains=(),
+                 title_include=(), title_exclude=(), read_history=None):
+        self.min_score = min_score or 0
+        self.allow_domains = _domain_set(allow_domains)
+        self.block_domains = _domain_set(block_domains)
+        self.title_include = _compile_patterns(title_include, "FILTER_TITLE_INCLUDE")
+        self.title_exclude = _compile_patterns(title_exclude, "FILTER_TITLE_EXCLUDE")
+        self.read_history = read_history
+
+    def __bool__(self):
+        """False if no filter is configured, so callers can skip it entirely."""
+        return bool(
+            self.min_score or self.allow_domains or self.block_domains
+            or self.title_include or self.title_exclude or self.read_history is not None
+        )
+
+    def __call__(self, item_id, details):
+        if self.read_history is not None and item_id in self.read_history:
+            return False
+        if (details.get("score") or 0) < self.min_score:
+            return False
+        if self.allow_domains or self.block_domains:
+            host = item_domain(details)
+            if self.block_domains and _matches_domain(host, self.block_domains):
+                return False
+            if self.allow_domains and not _matches_domain(host, self.allow_domains):
+                return False
+        title = details.get("title") or ""
+        if self.title_exclude is not None and self.title_exclude.search(title):
+            return False
+        if self.title_include is not None and not self.title_include.search(title):
+            return False
+        return True
+
+def compile_story_filter(settings, read_history=None):
+    """
+    Builds the StoryFilter described by `settings` (see DEFAULT_SETTINGS), or
+    None if it would let everything through. `read_history` is only used when
+    HIDE_READ_STORIES is on.
+    """
+    story_filter = StoryFilter(
+        min_score=settings.get("FILTER_MIN_SCORE", 0),
+        allow_domains=settings.get("FILTER_ALLOW_DOMAINS"),
+        block_domains=settings.get("FILTER_BLOCK_DOMAINS"),
+        title_include=settings.get("FILTER_TITLE_INCLUDE"),
+        title_exclude=settings.get("FILTER_TITLE_EXCLUDE"),
+        read_history=read_history if settings.get("HIDE_READ_STORIES") else None,
+    )
+    return story_filter if story_filter else None
@@ -0,0 +1,131 @@
+import logging
+import time
+
+from hn_cache import CACHE_FRESH, CACHE_NEGATIVE, CACHE_STALE_SCORE
+from hn_feeds import fetch_feed_stories
+from hn_fetch import HN_API_BASE, DEFAULT_MAX_WORKERS, fetch_eligible_stories, is_listable_item
+
+UPDATES_URL = f"{HN_API_BASE}/updates.json"
+
+# --- Incremental Defaults ---
+# updates.json only covers recent changes, so knowledge older than this is not trusted.
+DEFAULT_MAX_GAP_SECONDS = 600
+
+def fetch_changed_item_ids(session, timeout, updates_url=UPDATES_URL):
+    """Fetches the ids of recently changed items from /v0/updates.json, or None on failure."""
+    import requests
+
+    try:
+        response = session.get(updates_url, timeout=timeout)
+        response.raise_for_status()
+        return set(response.json().get("items") or [])
+    except requests.exceptions.RequestException as e:
+        logging.warning(f"Error fetching changed items: {e}")
+        return None
+    except Exception as e:
+        logging.warning(f"Unexpected error processing changed items: {e}")
+        return None
+
+# --- Incremental Refresh ---
+class IncrementalRefresher:
+    """
+    Refreshes the story list by diffing against the previous cycle.
+
+    Items examined last cycle are reused without a request unless
+    /v0/updates.json lists them as changed; only items that entered the window
+    (and changed ones) go to the network. If the previous cycle is older than
+    `max_gap` seconds or updates.json is unavailable, the cycle runs as a full
+    refresh. Each cycle reports in the fetch stats whether it was incremental
+    and how many item requests the reused items saved.
+    """
+
+    def __init__(self, max_gap=DEFAULT_MAX_GAP_SECONDS, updates_url=UPDATES_URL):
+        self.max_gap = max_gap
+        self.updates_url = updates_url
+        self.previous_ids = [] # Visible window of the previous cycle
+        self.known_items = {} # id -> details from the previous cycle (None = known ineligible)
+        self.last_cycle_time = None
+
+    def build_overrides(self, changed_ids):
+        """Maps previously seen ids to fetch-engine states, forcing changed ones to be re-fetched."""
+        overrides = {}
+        for item_id, details in self.known_items.items():
+            if details is None or not is_listable_item(details):
+                # Type never changes, so an item no feed can show stays that way.
+                overrides[item_id] = (CACHE_NEGATIVE, details)
+            elif item_id in changed_ids:
+                overrides[item_id] = (CACHE_STALE_SCORE, details)
+            else:
+                overrides[item_id] = (CACHE_FRESH, details)
+        return overrides
+
+    def refresh(self, session, story_ids, max_articles, timeout,
+                max_workers=DEFAULT_MAX_WORKERS, cache=None, stats=None, **fetch_kwargs):
+        """
+        Fetches up to `max_articles` eligible stories for `story_ids`, incrementally when possible.
+
+        `stats`, if given, receives the fetch engine's counters for the cycle.
+        """
+        now = time.time()
+        incremental, overrides = self._begin_cycle(session, timeout, now)
+        window = story_ids[:max_articles]
+        observed = {}
+        stats = stats if stats is not None else {}
+        articles = fetch_eligible_stories(
+            session, story_ids, max_articles, timeout, max_workers=max_workers,
+            cache=cache, overrides=overrides, observed=observed, stats=stats, **fetch_kwargs
+        )
+        self._end_cycle(incremental, overrides, window, observed, stats, now)
+        return articles
+
+    def refresh_feeds(self, session, feed_ids, limits, timeout,
+                      max_workers=DEFAULT_MAX_WORKERS, cache=None, stats=None, **fetch_kwargs):
+        """Like refresh(), for several feeds through the shared scheduler. Returns {feed: articles}."""
+        now = time.time()
+        incremental, overrides = self._begin_cycle(session, timeout, now)
+        window = []
+        for feed, ids in feed_ids.items():
+            window.extend(ids[:limits.get(feed, 0)])
+        observed = {}
+        stats = stats if stats is not None else {}
+        feed_articles = fetch_feed_stories(
+            session, feed_ids, limits, timeout, max_workers=max_workers,
+            cache=cache, overrides=overrides, observed=observed, stats=stats, **fetch_kwargs
+        )
+        self._end_cycle(incremental, overrides, window, observed, stats, now)
+        return feed_articles
+
+    def _begin_cycle(self, session, timeout, now):
+        """Returns (incremental, overrides) for a cycle starting at `now`."""
+        incremental = (
+            self.last_cycle_time is not None
+            and now - self.last_cycle_time <= self.max_gap
+            and bool(self.known_items)
+        )
+        if incremental:
+            changed_ids = fetch_changed_item_ids(session, timeout, self.updates_url)
+            if changed_ids is not None:
+                return True, self.build_overrides(changed_ids)
+        return False, None
+
+    def _end_cycle(self, incremental, overrides, window, observed, stats, now):
+        """Reports the cycle in `stats` and records what it saw for the next cycle."""
+        entered = set(window).difference(self.previous_ids)
+        saved = 0
+        if incremental:
+            # Items this cycle used from the previous one instead of requesting them, less updates.json.
+            # Item cache hits are not counted: a full refresh gets those too.
+            reused = sum(
+                1 for item_id in observed if overrides.get(item_id, (CACHE_STALE_SCORE,))[0] != CACHE_STALE_SCORE
+            )
+            saved = max(0, reused - 1)
+        stats["incremental"] = incremental
+        stats["requests_saved"] = saved
+        logging.info(
+            f"{'Incremental' if incremental else 'Full'} refresh: {len(entered)} stories entered the window, "
+            f"{stats.get('item_requests', 0) + int(incremental)} requests sent, {saved} saved versus a full refresh."
+        )
+
+        self.previous_ids = list(window)
+        self.known_items = observed
+        self.last_cycle_time = now
@@ -1,59 +1,45 @@
 import rumps
-import requests
-import webbrowser
 import threading
 import time
 import logging
+import os
 from datetime import datetime
 import json
-import os
 
-# --- Configuration Defaults ---
-# These are used if settings.json is missing or invalid
-DEFAULT_SETTINGS = {
-    "MAX_TITLE_LENGTH": 50,
-    "UPDATE_INTERVAL_SECONDS": 3600,
-    "MAX_ARTICLES_IN_MENU": 5,
-    "REQUEST_TIMEOUT": 10,
-    "ICON_DEFAULT": "📰",
-    "ICON_ERROR": "⚠️"
-}
-SETTINGS_FILE = "settings.json"
+from AppKit import NSMenu
+from PyObjCTools import AppHelper
+
+# Only what the first paint needs is imported here; requests, webbrowser and the
+# stream are loaded on first use, off the startup path.
+from hn_core import (
+    DEFAULT_SETTINGS, SETTINGS_FILE, ITEM_CACHE_FILE, MENU_SNAPSHOT_FILE,
+    HackerNewsCore, load_settings, load_menu_snapshot, save_menu_snapshot,
+    format_menu_bar_title, format_menu_title, format_trending_title,
+)
+from hn_feeds import FEEDS
+from hn_fetch import DEFAULT_MAX_WORKERS
+from hn_menu_model import OP_PLACE, OP_REMOVE, OP_RETITLE, OP_RELINK, MenuModel
+from hn_metrics import format_stats_lines
+from hn_read_history import READ_HISTORY_FILE, ReadHistory
+from hn_refresh import RefreshWorker
+from hn_schedule import TICK_SECONDS, IDLE_RECHECK_SECONDS, AdaptiveScheduler, user_idle_seconds
+from hn_trends import TRENDING_FEED, TRENDING_LABEL
 
 # --- Configuration ---
 MAX_TITLE_LENGTH = 50 # Max length for the menu bar title in characters
 UPDATE_INTERVAL_SECONDS = 3600 # Update every hour (3600 seconds)
 MAX_ARTICLES_IN_MENU = 5 # Number of articles to show in the dropdown menu
 REQUEST_TIMEOUT = 10 # Seconds to wait for API requests
+MAX_FETCH_WORKERS = DEFAULT_MAX_WORKERS # Concurrent item requests per refresh
 ICON_DEFAULT = "📰"
 ICON_ERROR = "⚠️"
+# Set to the launch time (time.time()) to log time-to-first-title; see tools/measure_startup.py
+STARTUP_PROBE_ENV = "HN_STARTUP_PROBE"
 
 # --- Logging Setup ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# --- Hacker News API ---
-HN_API_BASE = "https://hacker-news.firebaseio.com/v0"
-TOP_STORIES_URL = f"{HN_API_BASE}/topstories.json"
-ITEM_URL_TEMPLATE = f"{HN_API_BASE}/item/{{}}.json" # Use .format()
-
 # --- Settings Functions ---
-def load_settings():
-    """Loads settings from JSON file or returns defaults."""
-    if not os.path.exists(SETTINGS_FILE):
-        logging.warning(f"{SETTINGS_FILE} not found, using default settings.")
-        return DEFAULT_SETTINGS.copy()
-    try:
-        with open(SETTINGS_FILE, 'r') as f:
-            loaded = json.load(f)
-        # Ensure all keys exist, add defaults for missing ones
-        settings = DEFAULT_SETTINGS.copy()
-        settings.update(loaded) # Overwrite defaults with loaded values
-        logging.info(f"Loaded settings from {SETTINGS_FILE}.")
-        return settings
-    except (json.JSONDecodeError, IOError) as e:
-        logging.error(f"Error loading {SETTINGS_FILE}: {e}. Using default settings.")
-        return DEFAULT_SETTINGS.copy()
-
 def save_settings(settings):
     """Saves settings dictionary to JSON file."""
     try:
@@ -64,6 +50,65 @@ def save_settings(settings):
         logging.error(f"Error saving settings to {SETTINGS_FILE}: {e}")
         rumps.alert("Error saving settings!", f"Could not write to {SETTINGS_FILE}.\n{e}")
 
+# --- Story Menu Sections ---
+class StoryMenuSection:
+    """
+    The block of story rows at the top of an NSMenu (the main menu or a feed
+    submenu), kept in sync with a MenuModel.
+
+    Each row is a rumps.MenuItem created once per story id; render() applies
+    only the model's edits, so unchanged rows keep their item and callback.
+    Rows without a URL (status lines) have no callback and show as disabled.
+    `make_callback(url, key)` builds the click handler of a story row.
+    """
+
+    def __init__(self, nsmenu, make_callback):
+        self.nsmenu = nsmenu
+        self.make_callback = make_callback
+        self.model = MenuModel()
+        self.items = {} # key -> rumps.MenuItem
+        self.urls = {} # key -> URL its callback opens
+        self.count = 0 # Rows currently in the NSMenu (indexes 0 .. count - 1)
+
+    def render(self, rows):
+        """Shows `rows`, a list of (key, title, url). Returns the number of menu items touched."""
+        operations = self.model.update(rows)
+        for operation in operations:
+            kind, key = operation[0], operation[1]
+            if kind == OP_REMOVE:
+                self.nsmenu.removeItem_(self.items.pop(key)._menuitem)
+                self.urls.pop(key)
+                self.count -= 1
+            elif kind == OP_PLACE:
+                _, _, anchor, title, url = operation
+                item = self.items.get(key)
+                if item is None:
+                    item = self.items[key] = rumps.MenuItem(title, callback=self.callback_for(key, url))
+                    self.urls[key] = url
+                else:
+                    # Moved: take it out and put it back at its new place
+                    self.nsmenu.removeItem_(item._menuitem)
+                    self.count -= 1
+                    if item.title != title:
+                        item.title = title
+                    self.relink(key, url)
+                index = self.count if anchor is None else self.nsmenu.indexOfItem_(self.items[anchor]._menuitem)
+                self.nsmenu.insertItem_atIndex_(item._menuitem, index)
+                self.count += 1
+            elif kind == OP_RETITLE:
+                self.items[key].title = operation[2]
+            elif kind == OP_RELINK:
+                self.relink(key, operation[2])
+        return len(operations)
+
+    def callback_for(self, key, url):
+        return self.make_callback(url, key) if url else None
+
+    def relink(self, key, url):
+        if self.urls.get(key) != url:
+            self.items[key].set_callback(self.callback_for(key, url))
+            self.urls[key] = url
+
 # --- App Class ---
 class HackerNewsApp(rumps.App):
     def __init__(self):
@@ -72,161 +117,273 @@ class HackerNewsApp(rumps.App):
 
         super(HackerNewsApp, self).__init__(f"{self.settings['ICON_DEFAULT']} Loading...")
         self.top_article_url = None
+        self.top_article_id = None
+        # Stories opened from the menu (read lazily, on the first lookup)
+        self.read_history = ReadHistory(READ_HISTORY_FILE)
         self.last_refresh_time = None
-        # Define initial menu including Settings as MenuItem
-        self.menu = ["Loading...", None, "Refresh", rumps.MenuItem("Settings", callback=self.settings_menu), rumps.MenuItem("Quit", callback=self.quit_app)]
-
-        # Set up the recurring timer using loaded interval
-        update_interval = self.settings.get("UPDATE_INTERVAL_SECONDS", DEFAULT_SETTINGS["UPDATE_INTERVAL_SECONDS"])
-        self.update_timer = rumps.Timer(self.update_hacker_news_thread, update_interval)
+        # Headless refresh pipeline (session, item cache, incremental state), created by the first refresh
+        self.core = None
+        # Optional push mode: the stream triggers refreshes, the timer keeps scores fresh
+        self.stream = None
+        # The static part of the menu is built once; story rows are diffed into it on every refresh
+        self.refresh_item = rumps.MenuItem("Refresh", callback=self.update_hacker_news_thread)
+        feed_items = [rumps.MenuItem(FEEDS[feed][1] if feed in FEEDS else TRENDING_LABEL) for feed in self.enabled_feeds()]
+        self.menu = [None, *feed_items, *([None] if feed_items else []), self.refresh_item, self.build_stats_menu(), rumps.MenuItem("Settings", callback=self.settings_menu), rumps.MenuItem("Quit", callback=self.quit_app)]
+        self.story_section = StoryMenuSection(self.menu._menu, self.create_menu_callback)
+        self.feed_sections = {}
+        for feed, feed_item in zip(self.enabled_feeds(), feed_items):
+            submenu = NSMenu.alloc().init()
+            feed_item._menuitem.setSubmenu_(submenu)
+            self.feed_sections[feed] = StoryMenuSection(submenu, self.create_menu_callback)
+        self.story_section.render([("status", "Loading...", None)])
+
+        # Paint the last session's menu right away; the first refresh replaces it
+        snapshot = load_menu_snapshot(MENU_SNAPSHOT_FILE)
+        if snapshot is not None:
+            articles, saved_at, feeds = snapshot
+            self.render_articles(articles, refreshed_at=saved_at, feeds=feeds)
+            logging.info(f"Painted {len(articles)} articles saved by the last session.")
+
+        # Network work runs on a background worker; results are applied on the main thread
+        self.refresh_worker = RefreshWorker(self.fetch_articles, self.apply_articles, dispatch=AppHelper.callAfter)
+
+        # The scheduler adapts the interval (backoff, circuit breaker, list churn); a short
+        # tick asks it whether a refresh is due. Timers don't fire while the machine sleeps.
+        self.scheduler = AdaptiveScheduler(
+            self.get_setting("UPDATE_INTERVAL_SECONDS"),
+            min_interval=self.get_setting("MIN_UPDATE_INTERVAL_SECONDS"),
+            max_interval=self.get_setting("MAX_UPDATE_INTERVAL_SECONDS"),
+            retry_base=self.get_setting("RETRY_BASE_SECONDS"),
+            breaker_failures=self.get_setting("CIRCUIT_BREAKER_FAILURES"),
+            breaker_cooldown=self.get_setting("CIRCUIT_BREAKER_COOLDOWN_SECONDS"),
+        )
+        self.last_error = None
+        self.last_tick = None
+        events = getattr(rumps, "events", None)
+        if events is not None and hasattr(events, "on_sleep"):
+            events.on_sleep.register(self.on_sleep)
+            events.on_wake.register(self.on_wake)
+        self.update_timer = rumps.Timer(self.on_scheduler_tick, TICK_SECONDS)
         self.update_timer.start()
+
+        self.startup_probe_timer = None
+        if os.environ.get(STARTUP_PROBE_ENV):
+            # Timers first fire once the run loop is up, i.e. once the title is on screen
+            self.startup_probe_timer = rumps.Timer(self.report_first_title, 1)
+            self.startup_probe_timer.start()
         logging.info("HackerNewsApp initialized, timer started.")
 
-    def fetch_top_story_ids(self):
-        """Fetches top story IDs from Hacker News."""
-        try:
-            logging.info(f"Fetching top story IDs from {TOP_STORIES_URL}")
-            # Use timeout from settings
-            timeout = self.settings.get("REQUEST_TIMEOUT", DEFAULT_SETTINGS["REQUEST_TIMEOUT"])
-            response = requests.get(TOP_STORIES_URL, timeout=timeout)
-            response.raise_for_status()
-            story_ids = response.json()
-            logging.info(f"Fetched {len(story_ids)} top story IDs.")
-            return story_ids
-        except requests.exceptions.RequestException as e:
-            logging.error(f"Error fetching top stories: {e}")
-            rumps.notification("Hacker News App Error", "Network Error", f"Could not fetch top stories: {e}")
-            self.title = f"{self.settings['ICON_ERROR']} HN Err"
-            return None
-        except Exception as e:
-            logging.error(f"Unexpected error fetching top story IDs: {e}")
-            rumps.notification("Hacker News App Error", "API Error", f"Could not process top stories response: {e}")
-            self.title = f"{self.settings['ICON_ERROR']} HN Err"
-            return None
-
-    def fetch_item_details(self, item_id):
-        """Fetches details for a specific Hacker News item."""
-        url = ITEM_URL_TEMPLATE.format(item_id)
-        try:
-            timeout = self.settings.get("REQUEST_TIMEOUT", DEFAULT_SETTINGS["REQUEST_TIMEOUT"])
-            response = requests.get(url, timeout=timeout)
-            response.raise_for_status()
-            details = response.json()
-            return details
-        except requests.exceptions.RequestException as e:
-            logging.warning(f"Error fetching item {item_id}: {e}")
-            return None
-        except Exception as e:
-            logging.error(f"Unexpected error fetching item {item_id}: {e}")
-            return None
+    def get_setting(self, key):
+        """Returns a setting, falling back to its default."""
+        return self.settings.get(key, DEFAULT_SETTINGS[key])
+
+    def enabled_feeds(self):
+        """Returns the submenus (extra feeds, then Trending) enabled in the settings, in menu order."""
+        extra_feeds = self.get_setting("FEEDS") or {}
+        feeds = [feed for feed in FEEDS if feed != "top" and extra_feeds.get(feed, 0) > 0]
+        if self.get_setting("TREND_TRACKING") and self.get_setting("TRENDING_ARTICLES") > 0:
+            feeds.append(TRENDING_FEED)
+        return feeds
+
+    def get_core(self):
+        """Returns the refresh pipeline, creating it (and starting the optional stream) on first use."""
+        if self.core is None:
+            core = HackerNewsCore(
+                self.settings, item_cache_path=ITEM_CACHE_FILE, on_error=self.notify_error,
+                read_history=self.read_history,
+            )
+            if self.settings.get("STREAMING_MODE", DEFAULT_SETTINGS["STREAMING_MODE"]):
+                from hn_stream import TopStoriesStream
+
+                max_articles = self.settings.get("MAX_ARTICLES_IN_MENU", DEFAULT_SETTINGS["MAX_ARTICLES_IN_MENU"])
+                stream = TopStoriesStream(
+                    on_window_change=self.on_stream_window_change,
+                    window_size=max_articles,
+                    url=core.top_stories_url,
+                    on_fallback=self.on_stream_fallback,
+                )
+                self.stream = stream
+                stream.start()
+            self.core = core
+        return self.core
+
+    def report_first_title(self, timer):
+        """Logs the time from launch to the first title on screen, then quits (startup measurement runs only)."""
+        timer.stop()
+        elapsed_ms = (time.time() - float(os.environ[STARTUP_PROBE_ENV])) * 1000
+        # Parsed by tools/measure_startup.py
+        print(f"first_title_ms={elapsed_ms:.1f} title={self.title!r}", flush=True)
+        self.quit_app(None)
+
+    def notify_error(self, subtitle, message):
+        """Remembers why a refresh failed; apply_articles() notifies once the circuit breaker opens."""
+        self.last_error = (subtitle, message)
+
+    def on_scheduler_tick(self, _):
+        """Timer callback: starts a refresh when the scheduler says one is due."""
+        now = time.time()
+        if self.last_tick is not None and now - self.last_tick > 3 * TICK_SECONDS and not self.scheduler.paused:
+            # The tick was held back for a while, so the machine was asleep: let the network come up first
+            logging.info(f"No timer tick for {now - self.last_tick:.0f}s, assuming the machine woke up.")
+            self.scheduler.resume(now)
+        self.last_tick = now
+        if not self.scheduler.due(now) or self.refresh_worker.busy:
+            return
+        idle_pause = self.get_setting("IDLE_PAUSE_SECONDS")
+        if idle_pause:
+            idle = user_idle_seconds()
+            if idle is not None and idle >= idle_pause:
+                logging.info(f"User idle for {idle:.0f}s, holding off the refresh.")
+                self.scheduler.postpone(IDLE_RECHECK_SECONDS, now)
+                return
+        self.update_hacker_news_thread(None)
+
+    def on_sleep(self):
+        """Called when the machine goes to sleep: nothing is due until it wakes."""
+        logging.info("Machine going to sleep, pausing refreshes.")
+        self.scheduler.pause()
+
+    def on_wake(self):
+        """Called when the machine wakes: an overdue refresh runs after a short grace period."""
+        logging.info("Machine woke up, resuming refreshes.")
+        self.scheduler.resume()
+        self.last_tick = time.time()
 
     def update_hacker_news_thread(self, _):
-        """Runs the update logic in a separate thread to avoid blocking the UI."""
-        logging.info("Starting Hacker News update cycle.")
-        top_story_ids = self.fetch_top_story_ids()
-
+        """Starts a background refresh unless one is already in flight (timer and Refresh callback)."""
+        if self.refresh_worker.request_refresh():
+            logging.info("Starting Hacker News update cycle.")
+
+    def on_stream_window_change(self, _story_ids):
+        """Called on the stream thread when the visible top stories change."""
+        # Don't let a change that lands mid-cycle be lost: ask for a follow-up cycle
+        self.refresh_worker.request_refresh(rerun_if_busy=True)
+
+    def on_stream_fallback(self):
+        """
+        Called on the stream thread when streaming gives up; the timer keeps
+        polling. Readers on other threads take `self.stream` into a local once.
+        """
+        logging.warning("Streaming unavailable, continuing with timer-based polling.")
+        self.stream = None
+
+    def fetch_articles(self):
+        """
+        Runs on the refresh worker thread. Returns ({feed: articles}, or None if
+        the top IDs could not be fetched, and the cycle's metrics).
+        """
+        core = self.get_core()
+        story_ids = None
+        stream = self.stream # on_stream_fallback() may clear it from the stream thread
+        if stream is not None and stream.live:
+            # The stream already holds the current list, no request needed
+            story_ids = stream.story_ids
+        return core.fetch_feeds(story_ids)
+
+    def apply_articles(self, result):
+        """Runs on the main thread. Updates the title and menus from a finished refresh in one step."""
+        # None if the refresh raised before handing back its cycle
+        fetched_feeds, cycle = result or (None, None)
+        started = time.perf_counter()
+        fetched_articles = fetched_feeds["top"] if fetched_feeds is not None else None
+        feeds = {feed: articles for feed, articles in (fetched_feeds or {}).items() if feed != "top"}
+        self.render_articles(fetched_articles, feeds=feeds)
+        if self.core is not None:
+            self.core.finish_cycle(cycle, menu_build_seconds=time.perf_counter() - started)
+            self.update_stats_menu()
+        if fetched_articles:
+            save_menu_snapshot(fetched_articles, MENU_SNAPSHOT_FILE, feeds=feeds)
+        self.schedule_next_refresh(fetched_articles)
+
+    def schedule_next_refresh(self, fetched_articles):
+        """Feeds the cycle's outcome to the scheduler; notifies once when the circuit breaker opens."""
+        if fetched_articles is None:
+            delay, opened = self.scheduler.record_failure()
+            if opened:
+                subtitle, message = self.last_error or ("Refresh Failed", "Could not fetch stories.")
+                rumps.notification(
+                    "Hacker News App Error", subtitle,
+                    f"{message}\nRetrying quietly every {self.scheduler.breaker_cooldown // 60:.0f} minutes."
+                )
+            logging.info(f"Refresh failed, next attempt in {delay:.0f}s.")
+            return
+        delay, recovered = self.scheduler.record_success(article["id"] for article in fetched_articles)
+        if recovered:
+            logging.info("Refresh succeeded again, circuit breaker closed.")
+        self.last_error = None
+        logging.info(f"Next refresh in {delay:.0f}s.")
+
+    def last_cycle(self):
+        """Returns the last finished refresh cycle's metrics, or None before the first one."""
+        return self.core.metrics.last_cycle if self.core is not None else None
+
+    def build_stats_menu(self):
+        """Builds the Stats submenu from the last finished refresh cycle."""
+        return (rumps.MenuItem("Stats"), format_stats_lines(self.last_cycle()))
+
+    def update_stats_menu(self):
+        """Refills the Stats submenu in place once the current cycle has been recorded."""
+        stats_item = self.menu.get("Stats")
+        if stats_item is None:
+            return
+        stats_item.clear()
+        stats_item.update(format_stats_lines(self.last_cycle()))
+
+    def feed_rows(self, feed, articles):
+        """Returns the rows of a feed's submenu (articles is None if its list could not be fetched)."""
+        if articles is None:
+            return [("status", "Could not load this feed", None)]
+        if not articles:
+            return [("status", "Not enough score history yet" if feed == TRENDING_FEED else "No articles", None)]
+        format_title = format_trending_title if feed == TRENDING_FEED else format_menu_title
+        return [(article["id"], format_title(i, article), article.get("url")) for i, article in enumerate(articles)]
+
+    def render_articles(self, fetched_articles, refreshed_at=None, feeds=None):
+        """
+        Updates the title and menu for a refresh result (or a saved one from `refreshed_at`).
+
+        `feeds` maps extra feeds to their articles, shown in their submenus.
+        Only rows whose story, title or link changed are touched.
+        """
         # Use icons from settings
         icon_default = self.settings.get("ICON_DEFAULT", DEFAULT_SETTINGS["ICON_DEFAULT"])
         icon_error = self.settings.get("ICON_ERROR", DEFAULT_SETTINGS["ICON_ERROR"])
 
-        if top_story_ids is None:
+        if fetched_articles is None:
             self.title = f"{icon_error} HN Err"
-            self.menu.clear()
-            # Rebuild menu explicitly on error
-            self.menu = [
-                "Error fetching stories",
-                None,
-                "Refresh",
-                rumps.MenuItem("Settings", callback=self.settings_menu), # Explicit MenuItem
-                rumps.MenuItem("Quit", callback=self.quit_app)
-            ]
+            self.story_section.render([("status", "Error fetching stories", None)])
             logging.warning("Update failed: Could not fetch story IDs.")
             return
 
-        fetched_articles = []
-        processed_ids = 0
-        # Use max articles from settings
-        max_articles = self.settings.get("MAX_ARTICLES_IN_MENU", DEFAULT_SETTINGS["MAX_ARTICLES_IN_MENU"])
-        max_ids_to_process = min(len(top_story_ids), max_articles * 5)
-
-        with requests.Session() as session:
-            for story_id in top_story_ids:
-                if len(fetched_articles) >= max_articles:
-                    logging.info(f"Reached target of {max_articles} articles.")
-                    break
-                if processed_ids >= max_ids_to_process:
-                    logging.warning(f"Processed {max_ids_to_process} IDs without finding enough articles.")
-                    break
-
-                processed_ids += 1
-                details = self.fetch_item_details(story_id)
-
-                if details and details.get("type") == "story" and details.get("url"):
-                    article = {
-                        "title": details.get("title", "No Title Provided"),
-                        "url": details.get("url"),
-                        "id": story_id,
-                        "score": details.get("score", 0)
-                    }
-                    fetched_articles.append(article)
-
         if not fetched_articles:
             self.title = f"{icon_default} HN Empty"
-            self.menu.clear()
-            # Rebuild menu explicitly on error
-            self.menu = [
-                "No suitable articles found",
-                None,
-                "Refresh",
-                rumps.MenuItem("Settings", callback=self.settings_menu), # Explicit MenuItem
-                rumps.MenuItem("Quit", callback=self.quit_app)
-            ]
+            self.story_section.render([("status", "No suitable articles found", None)])
             logging.warning("Update completed but no suitable articles found.")
             return
 
         top_article = fetched_articles[0]
         self.top_article_url = top_article.get("url")
+        self.top_article_id = top_article.get("id")
 
         # Use title length from settings
         max_title_len_setting = self.settings.get("MAX_TITLE_LENGTH", DEFAULT_SETTINGS["MAX_TITLE_LENGTH"])
-        score = top_article.get('score', 0)
-        title = top_article.get('title', 'No Title')
-        prefix = f"{icon_default} [{score}] "
-        available_title_len = max(0, max_title_len_setting - len(prefix))
-        truncated_article_title = (title[:available_title_len] + '...') if len(title) > available_title_len else title
-        self.title = f"{prefix}{truncated_article_title}"
-
-        new_menu_items = []
-        for i, article in enumerate(fetched_articles):
-            score = article.get('score', 0)
-            title = article.get('title', 'No Title')
-            menu_title = f"{i+1}. [{score}] {title}"
-            max_len = 75 - (len(str(score)) + 4)
-            menu_title_truncated = (menu_title[:max_len] + '...') if len(menu_title) > max_len else menu_title
-            callback = self.create_menu_callback(article.get("url"))
-            menu_item = rumps.MenuItem(menu_title_truncated, callback=callback)
-            new_menu_items.append(menu_item)
-
-        new_menu_items.append(None)
-
-        refresh_title = "Refresh"
-        if self.last_refresh_time:
-            refresh_time_str = datetime.fromtimestamp(self.last_refresh_time).strftime('%H:%M:%S')
-            refresh_title = f"Refresh (Last: {refresh_time_str})"
-
-        new_menu_items.append(rumps.MenuItem(refresh_title, callback=self.update_hacker_news_thread))
-        # Explicitly add Settings MenuItem
-        new_menu_items.append(rumps.MenuItem("Settings", callback=self.settings_menu))
-        new_menu_items.append(rumps.MenuItem("Quit", callback=self.quit_app))
-
-        self.menu.clear()
-        self.menu = new_menu_items
-
-        self.last_refresh_time = time.time()
-        logging.info(f"Update successful. Title set to: {truncated_article_title}")
-
-    def create_menu_callback(self, url):
-        """Creates a callback function for a menu item to open a specific URL."""
+        self.title = format_menu_bar_title(top_article, icon_default, max_title_len_setting)
+
+        touched = self.story_section.render([
+            (article["id"], format_menu_title(i, article), article.get("url"))
+            for i, article in enumerate(fetched_articles)
+        ])
+        for feed, section in self.feed_sections.items():
+            if feeds and feed in feeds:
+                touched += section.render(self.feed_rows(feed, feeds[feed]))
+
+        self.last_refresh_time = refreshed_at or time.time()
+        refresh_time_str = datetime.fromtimestamp(self.last_refresh_time).strftime('%H:%M:%S')
+        self.refresh_item.title = f"Refresh (Last: {refresh_time_str})"
+        logging.info(f"Update successful, {touched} menu items changed. Title set to: {self.title}")
+
+    def create_menu_callback(self, url, item_id=None):
+        """Creates a callback function for a menu item to open a specific URL (and mark `item_id` read)."""
         if not url:
             def no_url_callback(_):
                 logging.warning("Clicked menu item with no associated URL.")
@@ -236,7 +393,9 @@ class HackerNewsApp(rumps.App):
             def open_url_callback(_):
                 logging.info(f"Opening URL via menu click: {url}")
                 try:
+                    import webbrowser # Deferred: only needed once something is clicked
                     webbrowser.open(url)
+                    self.read_history.mark_read(item_id)
                 except Exception as e:
                     logging.error(f"Failed to open URL {url}: {e}")
                     rumps.notification("Error", "Browser Error", f"Could not open link: {e}")
@@ -248,7 +407,9 @@ class HackerNewsApp(rumps.App):
         if self.top_article_url:
             logging.info(f"Left-click: Opening top article URL: {self.top_article_url}")
             try:
+                import webbrowser
                 webbrowser.open(self.top_article_url)
+                self.read_history.mark_read(self.top_article_id)
             except Exception as e:
                 logging.error(f"Failed to open top article URL {self.top_article_url}: {e}")
                 rumps.notification("Error", "Browser Error", f"Could not open link: {e}")
@@ -290,16 +451,17 @@ class HackerNewsApp(rumps.App):
                     raise ValueError("Values must be positive integers.")
 
                 # Update settings dictionary
+                old_interval = self.get_setting("UPDATE_INTERVAL_SECONDS")
                 self.settings["UPDATE_INTERVAL_SECONDS"] = new_interval
                 self.settings["MAX_TITLE_LENGTH"] = new_title_len
 
                 # Save to file
                 save_settings(self.settings)
 
-                # Apply interval change to timer
-                if self.update_timer.interval != new_interval:
+                # Apply interval change to the scheduler (it adapts from the new base)
+                if old_interval != new_interval:
                     logging.info(f"Changing update interval to {new_interval} seconds.")
-                    self.update_timer.interval = new_interval # rumps timers allow direct interval update
+                    self.scheduler.set_base_interval(new_interval)
                     # Optionally trigger an immediate refresh after changing settings
                     # self.update_hacker_news_thread(None)
 
@@ -319,6 +481,10 @@ class HackerNewsApp(rumps.App):
     @rumps.clicked("Quit")
     def quit_app(self, _):
         logging.info("Quit button clicked.")
+        self.refresh_worker.stop()
+        stream = self.stream
+        if stream is not None:
+            stream.stop()
         rumps.quit_application()
 
 # --- Main Execution ---
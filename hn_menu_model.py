@@ -0,0 +1,90 @@
+from bisect import bisect_left
+
+# --- Menu Edit Operations ---
+# ("remove", key)                     drop the row
+# ("place", key, anchor, title, url)  insert the row (or move it, if it exists) right before
+#                                     the `anchor` row, or at the end of the section if anchor is None;
+#                                     a moved row also takes the given title and url
+# ("retitle", key, title)             change the row's title in place
+# ("relink", key, url)                point the row's click callback at a new URL
+OP_REMOVE = "remove"
+OP_PLACE = "place"
+OP_RETITLE = "retitle"
+OP_RELINK = "relink"
+
+def _longest_increasing_run(values):
+    """Returns the indexes (into `values`) of one longest strictly increasing subsequence."""
+    tails = [] # tails[k] = index of the smallest tail of an increasing run of length k + 1
+    tail_values = []
+    previous = [None] * len(values)
+    for index, value in enumerate(values):
+        k = bisect_left(tail_values, value)
+        if k:
+            previous[index] = tails[k - 1]
+        if k == len(tails):
+            tails.append(index)
+            tail_values.append(value)
+        else:
+            tails[k] = index
+            tail_values[k] = value
+    run = []
+    index = tails[-1] if tails else None
+    while index is not None:
+        run.append(index)
+        index = previous[index]
+    return run[::-1]
+
+# --- Menu Model ---
+class MenuModel:
+    """
+    Keyed model of a block of menu rows, each a (key, title, url) tuple.
+
+    update() compares a new render with the current rows and returns the
+    smallest edit list that turns one into the other: rows that disappeared
+    are removed, new rows inserted, and only rows that are out of order
+    relative to the rest (the complement of a longest increasing run) are
+    moved. Rows that stay keep their menu item and callback; only changed
+    titles or URLs are touched. Keys are story ids (or fixed strings for
+    status rows), so a score change touches exactly one row.
+    """
+
+    def __init__(self):
+        self.rows = []
+
+    def update(self, new_rows):
+        """Adopts `new_rows` (duplicate keys keep their first row) and returns the edits to apply, in order."""
+        seen = set()
+        unique_rows = []
+        for row in new_rows:
+            if row[0] not in seen:
+                seen.add(row[0])
+                unique_rows.append(row)
+        new_rows = unique_rows
+        new_keys = [key for key, _, _ in new_rows]
+        old_index = {key: index for index, (key, _, _) in enumerate(self.rows)}
+        old_rows = {key: (title, url) for key, title, url in self.rows}
+
+        operations = [(OP_REMOVE, key) for key, _, _ in self.rows if key not in seen]
+
+        # Rows whose old positions form a longest increasing run are already in order; everything else moves.
+        kept = [key for key in new_keys if key in old_index]
+        stable = {kept[i] for i in _longest_increasing_run([old_index[key] for key in kept])}
+
+        # Walk backwards so every row is placed before a neighbour that is already final.
+        anchor = None
+        placements = []
+        for key, title, url in reversed(new_rows):
+            if key not in stable:
+                placements.append((OP_PLACE, key, anchor, title, url))
+            anchor = key
+        operations.extend(placements)
+
+        for key, title, url in new_rows:
+            if key in stable:
+                old_title, old_url = old_rows[key]
+                if title != old_title:
+                    operations.append((OP_RETITLE, key, title))
+                if url != old_url:
+                    operations.append((OP_RELINK, key, url))
+        self.rows = list(new_rows)
+        return operations
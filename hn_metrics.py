@@ -0,0 +1,219 @@
+import json
+import logging
+import os
+import threading
+import time
+
+# --- Metrics Defaults ---
+# Upper bounds (seconds) of the request latency histogram buckets, Prometheus style.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRICS_NDJSON_FILE = "refresh_metrics.ndjson" # Lives next to settings.json
+METRICS_PROM_FILE = "refresh_metrics.prom"
+MAX_NDJSON_BYTES = 5 * 1024 * 1024 # Rotate the NDJSON log to .1 past this size
+
+# --- Per-Cycle Recorder ---
+class RefreshMetrics:
+    """
+    Collects instrumentation for refresh cycles.
+
+    Network counters are fed by InstrumentedSession from any thread and go to
+    the cycle whose fetch phase is running (only one fetches at a time). A
+    cycle runs begin_cycle() -> end_fetch() (worker thread), which hands the
+    cycle back; the caller passes it to finish_cycle() after the menu is
+    built, so a follow-up cycle that starts in between can't take over its
+    figures. finish_cycle() freezes `last_cycle` and updates the
+    process-lifetime totals used by the Prometheus export.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fetching = None # Cycle in its fetch phase, charged for requests
+        self.last_cycle = None
+        self.cycles_total = 0
+        self.failed_cycles_total = 0
+        self.requests_total = 0
+        self.request_errors_total = 0
+        self.bytes_total = 0
+        self.requests_saved_total = 0
+        self.latency_buckets_total = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum_total = 0.0
+
+    def begin_cycle(self):
+        """Starts recording a new cycle's fetch phase and returns the cycle."""
+        with self._lock:
+            self._fetching = {
+                "started_at": time.time(),
+                "_started": time.perf_counter(),
+                "requests": 0,
+                "request_errors": 0,
+                "bytes": 0,
+                "retries": 0,
+                "latency_buckets": [0] * (len(LATENCY_BUCKETS) + 1),
+                "latency_sum": 0.0,
+                "latency_max": 0.0,
+            }
+            return self._fetching
+
+    def record_request(self, latency, size=0, error=False, retries=0):
+        """Records one HTTP request made during the fetch phase of the current cycle."""
+        bucket = len(LATENCY_BUCKETS)
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if latency <= bound:
+                bucket = index
+                break
+        with self._lock:
+            cycle = self._fetching
+            if cycle is None:
+                return
+            cycle["requests"] += 1
+            cycle["request_errors"] += int(error)
+            cycle["bytes"] += size
+            cycle["retries"] += retries
+            cycle["latency_buckets"][bucket] += 1
+            cycle["latency_sum"] += latency
+            cycle["latency_max"] = max(cycle["latency_max"], latency)
+
+    def end_fetch(self, articles, fetch_stats=None):
+        """
+        Records the outcome of the fetch phase (articles is None if the ids
+        could not be fetched) and returns the cycle for finish_cycle().
+        """
+        fetch_stats = fetch_stats or {}
+        with self._lock:
+            cycle, self._fetching = self._fetching, None
+            if cycle is None:
+                return None
+            cycle["fetch_seconds"] = time.perf_counter() - cycle["_started"]
+            cycle["ok"] = articles is not None
+            cycle["articles"] = len(articles or [])
+            cycle["item_requests"] = fetch_stats.get("item_requests", 0)
+            cycle["cache_hits"] = fetch_stats.get("cache_hits", 0)
+            # Item requests an incremental refresh avoided versus a full one (0 without INCREMENTAL_REFRESH)
+            cycle["requests_saved"] = fetch_stats.get("requests_saved", 0)
+            cycle["skipped_by_type"] = dict(fetch_stats.get("skipped_by_type", {}))
+            cycle["backend"] = fetch_stats.get("backend", "firebase")
+            return cycle
+
+    def finish_cycle(self, cycle, menu_build_seconds=0.0):
+        """Closes `cycle` (from end_fetch()) and returns its snapshot, or None if there is none."""
+        if cycle is None:
+            return None
+        with self._lock:
+            cycle.setdefault("ok", False)
+            cycle["menu_build_seconds"] = menu_build_seconds
+            cycle["duration_seconds"] = time.perf_counter() - cycle.pop("_started")
+            cycle["latency_histogram"] = {
+                _bucket_label(index): count for index, count in enumerate(cycle.pop("latency_buckets"))
+            }
+
+            self.cycles_total += 1
+            self.failed_cycles_total += int(not cycle["ok"])
+            self.requests_total += cycle["requests"]
+            self.request_errors_total += cycle["request_errors"]
+            self.bytes_total += cycle["bytes"]
+            self.requests_saved_total += cycle.get("requests_saved", 0)
+            self.latency_sum_total += cycle["latency_sum"]
+            for index, count in enumerate(cycle["latency_histogram"].values()):
+                self.latency_buckets_total[index] += count
+            self.last_cycle = cycle
+            return dict(cycle)
+
+    # --- Exports ---
+    def write_ndjson(self, path=METRICS_NDJSON_FILE, max_bytes=MAX_NDJSON_BYTES):
+        """Appends the last cycle as one JSON line, rotating the file past `max_bytes`."""
+        if self.last_cycle is None:
+            return
+        try:
+            if os.path.exists(path) and os.path.getsize(path) > max_bytes:
+                os.replace(path, f"{path}.1")
+            with open(path, 'a') as f:
+                f.write(json.dumps(self.last_cycle, sort_keys=True) + "\n")
+        except (IOError, OSError) as e:
+            logging.error(f"Error writing metrics to {path}: {e}")
+
+    def prometheus_text(self):
+        """Renders the lifetime totals and last-cycle gauges in Prometheus text format."""
+        with self._lock:
+            last = self.last_cycle or {}
+            lines = [
+                "# HELP hn_refresh_cycles_total Refresh cycles completed.",
+                "# TYPE hn_refresh_cycles_total counter",
+                f"hn_refresh_cycles_total {self.cycles_total}",
+                "# HELP hn_refresh_failed_cycles_total Refresh cycles that could not fetch the story list.",
+                "# TYPE hn_refresh_failed_cycles_total counter",
+                f"hn_refresh_failed_cycles_total {self.failed_cycles_total}",
+                "# HELP hn_refresh_requests_total HTTP requests made by refreshes.",
+                "# TYPE hn_refresh_requests_total counter",
+                f"hn_refresh_requests_total {self.requests_total}",
+                "# HELP hn_refresh_request_errors_total Failed HTTP requests made by refreshes.",
+                "# TYPE hn_refresh_request_errors_total counter",
+                f"hn_refresh_request_errors_total {self.request_errors_total}",
+                "# HELP hn_refresh_bytes_total Response bytes received by refreshes.",
+                "# TYPE hn_refresh_bytes_total counter",
+                f"hn_refresh_bytes_total {self.bytes_total}",
+                "# HELP hn_refresh_requests_saved_total Item requests incremental refreshes avoided versus full ones.",
+                "# TYPE hn_refresh_requests_saved_total counter",
+                f"hn_refresh_requests_saved_total {self.requests_saved_total}",
+                "# HELP hn_refresh_request_latency_seconds Latency of refresh HTTP requests.",
+                "# TYPE hn_refresh_request_latency_seconds histogram",
+            ]
+            cumulative = 0
+            for index, count in enumerate(self.latency_buckets_total):
+                cumulative += count
+                lines.append(f'hn_refresh_request_latency_seconds_bucket{{le="{_bucket_label(index)}"}} {cumulative}')
+            lines.append(f"hn_refresh_request_latency_seconds_sum {self.latency_sum_total:.6f}")
+            lines.append(f"hn_refresh_request_latency_seconds_count {cumulative}")
+
+            gauges = (
+                ("last_duration_seconds", "Wall time of the last refresh cycle.", last.get("duration_seconds", 0.0)),
+                ("last_menu_build_seconds", "Time spent building the menu in the last cycle.", last.get("menu_build_seconds", 0.0)),
+                ("last_requests", "HTTP requests in the last cycle.", last.get("requests", 0)),
+                ("last_bytes", "Response bytes in the last cycle.", last.get("bytes", 0)),
+                ("last_retries", "Retried requests in the last cycle.", last.get("retries", 0)),
+                ("last_cache_hits", "Item cache hits in the last cycle.", last.get("cache_hits", 0)),
+                ("last_requests_saved", "Item requests the last cycle avoided versus a full refresh.", last.get("requests_saved", 0)),
+                ("last_articles", "Articles shown after the last cycle.", last.get("articles", 0)),
+                ("last_timestamp_seconds", "Start time of the last cycle.", last.get("started_at", 0)),
+            )
+            for name, help_text, value in gauges:
+                lines.append(f"# HELP hn_refresh_{name} {help_text}")
+                lines.append(f"# TYPE hn_refresh_{name} gauge")
+                lines.append(f"hn_refresh_{name} {value}")
+            lines.append("# HELP hn_refresh_last_skipped_items Items skipped in the last cycle, by reason.")
+            lines.append("# TYPE hn_refresh_last_skipped_items gauge")
+            for reason, count in sorted(last.get("skipped_by_type", {}).items()):
+                lines.append(f'hn_refresh_last_skipped_items{{reason="{reason}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path=METRICS_PROM_FILE):
+        """Writes the Prometheus textfile atomically (for node_exporter's textfile collector)."""
+        temp_path = f"{path}.tmp"
+        try:
+            with open(temp_path, 'w') as f:
+                f.write(self.prometheus_text())
+            os.replace(temp_path, path)
+        except (IOError, OSError) as e:
+            logging.error(f"Error writing metrics to {path}: {e}")
+
+def _bucket_label(index):
+    return "+Inf" if index >= len(LATENCY_BUCKETS) else str(LATENCY_BUCKETS[index])
+
+def format_stats_lines(cycle):
+    """Formats a cycle snapshot as short lines for the Stats submenu."""
+    if not cycle:
+        return ["No refresh yet"]
+    skipped = cycle.get("skipped_by_type") or {}
+    skipped_text = ", ".join(f"{reason} {count}" for reason, count in sorted(skipped.items())) or "none"
+    requests_count = cycle.get("requests", 0)
+    mean_latency = cycle.get("latency_sum", 0.0) / requests_count if requests_count else 0.0
+    return [
+        f"Cycle: {cycle.get('duration_seconds', 0.0) * 1000:.0f} ms" + ("" if cycle.get("ok") else " (failed)"),
+        f"Requests: {requests_count} ({cycle.get('request_errors', 0)} errors, {cycle.get('retries', 0)} retries)",
+        f"Latency: mean {mean_latency * 1000:.0f} ms, max {cycle.get('latency_max', 0.0) * 1000:.0f} ms",
+        f"Data: {cycle.get('bytes', 0) / 1024:.1f} KB",
+        f"Source: {cycle.get('backend', 'firebase')}",
+        f"Cache hits: {cycle.get('cache_hits', 0)}",
+        f"Saved: {cycle.get('requests_saved', 0)} requests vs. full refresh",
+        f"Skipped: {skipped_text}",
+        f"Menu build: {cycle.get('menu_build_seconds', 0.0) * 1000:.1f} ms",
+    ]
@@ -0,0 +1,112 @@
+import logging
+import os
+import sys
+import threading
+from array import array
+from bisect import bisect_left, insort
+
+# --- Read History Defaults ---
+READ_HISTORY_FILE = "read_history.bin" # Lives next to settings.json
+DEFAULT_MAX_ENTRIES = 20000 # Oldest (lowest) ids are dropped beyond this; old stories no longer show anyway
+BLOOM_BITS_PER_ENTRY = 10 # With BLOOM_HASHES, about 1% of unread lookups need the exact check
+BLOOM_HASHES = 4
+ID_TYPECODE = "I" if array("I").itemsize == 4 else "L" # Item ids fit in 32 bits; stored little-endian
+
+# --- Read History ---
+class ReadHistory:
+    """
+    The ids of stories opened from the menu, kept small after years of use.
+
+    On disk it is a sorted array of 32-bit ids (4 bytes per story), capped at
+    `max_entries` by dropping the lowest ids: ids grow over time, so those are
+    the oldest stories, long gone from every feed. In memory a Bloom filter
+    sized for the cap answers most lookups (the unread ones) with a few bit
+    tests; only its rare positives are confirmed by binary search over the
+    array, so membership is exact. Nothing is read until the first use, which
+    keeps the file off the startup path. Safe to use from several threads.
+    """
+
+    def __init__(self, path=READ_HISTORY_FILE, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._ids = None # Sorted array, loaded on first use
+        self._bits = None
+        self._bit_count = max(64, max_entries * BLOOM_BITS_PER_ENTRY)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._load())
+
+    def __contains__(self, item_id):
+        with self._lock:
+            ids = self._load()
+            for position in self._positions(item_id):
+                if not self._bits[position >> 3] & (1 << (position & 7)):
+                    return False
+            index = bisect_left(ids, item_id)
+            return index < len(ids) and ids[index] == item_id
+
+    def mark_read(self, item_id):
+        """Records `item_id` as read and saves the history. Returns False if it already was."""
+        if item_id is None:
+            return False
+        with self._lock:
+            ids = self._load()
+            index = bisect_left(ids, item_id)
+            if index < len(ids) and ids[index] == item_id:
+                return False
+            insort(ids, item_id)
+            self._set_bits(item_id)
+            if len(ids) > self.max_entries:
+                del ids[:len(ids) - self.max_entries]
+                self._rebuild_bits()
+            self._save()
+            return True
+
+    def _load(self):
+        if self._ids is None:
+            ids = array(ID_TYPECODE)
+            try:
+                with open(self.path, "rb") as f:
+                    ids.frombytes(f.read())
+                if sys.byteorder != "little":
+                    ids.byteswap()
+            except FileNotFoundError:
+                pass
+            except (IOError, ValueError) as e:
+                logging.error(f"Error loading read history from {self.path}: {e}")
+                ids = array(ID_TYPECODE)
+            # Tolerate a file written by hand or cut short: keep it sorted, unique and capped
+            ids = array(ID_TYPECODE, sorted(set(ids))[-self.max_entries:])
+            self._ids = ids
+            self._rebuild_bits()
+        return self._ids
+
+    def _save(self):
+        ids = self._ids
+        if sys.byteorder != "little":
+            ids = array(ID_TYPECODE, ids)
+            ids.byteswap()
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(ids.tobytes())
+            os.replace(temp_path, self.path)
+        except IOError as e:
+            logging.error(f"Error saving read history to {self.path}: {e}")
+
+    def _positions(self, item_id):
+        # Double hashing: k bit positions from two multiplicative hashes of the id
+        first = (item_id * 0x9E3779B1) & 0xFFFFFFFF
+        second = ((item_id * 0x85EBCA6B) & 0xFFFFFFFF) | 1
+        return [(first + i * second) % self._bit_count for i in range(BLOOM_HASHES)]
+
+    def _set_bits(self, item_id):
+        for position in self._positions(item_id):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def _rebuild_bits(self):
+        self._bits = bytearray((self._bit_count + 7) // 8)
+        for item_id in self._ids:
+            self._set_bits(item_id)
@@ -0,0 +1,109 @@
+import logging
+import threading
+
+# --- Background Refresh Worker ---
+class RefreshWorker:
+    """
+    Runs refresh cycles on a background thread and hands results to the UI thread.
+
+    `refresh_fn()` does the (blocking) network work off the main thread and
+    returns whatever `apply_fn(result)` needs; `apply_fn` is then called through
+    `dispatch`, which must schedule a callable on the UI thread (e.g.
+    PyObjCTools.AppHelper.callAfter). Without a dispatcher `apply_fn` runs on the
+    worker thread, which keeps the worker usable headless.
+
+    Triggers that arrive while a cycle is in flight are coalesced into it: only
+    one fetch cycle ever runs at a time. A trigger carrying news the running
+    cycle may have missed can ask for one follow-up cycle instead.
+    """
+
+    def __init__(self, refresh_fn, apply_fn, dispatch=None, name="hn-refresh"):
+        self.refresh_fn = refresh_fn
+        self.apply_fn = apply_fn
+        self.dispatch = dispatch
+        self.name = name
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._busy = False
+        self._rerun = False
+        self._stopping = False
+        self._thread = None
+        self.cycles_run = 0
+        self.triggers_coalesced = 0
+
+    @property
+    def busy(self):
+        """True while a fetch cycle is running."""
+        return self._busy
+
+    def request_refresh(self, rerun_if_busy=False):
+        """
+        Requests a refresh; returns False if it was merged into one already running.
+
+        With `rerun_if_busy`, a trigger arriving mid-cycle schedules a single
+        follow-up cycle (further triggers merge into that one).
+        """
+        with self._lock:
+            if self._stopping:
+                return False
+            if self._busy:
+                self._rerun = self._rerun or rerun_if_busy
+                self.triggers_coalesced += 1
+                logging.info("Refresh already in progress, coalescing trigger.")
+                return False
+            self._busy = True
+            self._idle.clear()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return True
+
+    def wait_idle(self, timeout=None):
+        """Blocks until no cycle is running. Returns False on timeout."""
+        return self._idle.wait(timeout)
+
+    def stop(self):
+        """Stops the worker thread after the current cycle (if any) finishes."""
+        with self._lock:
+            self._stopping = True
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._stopping:
+                return
+
+            try:
+                result = self.refresh_fn()
+            except Exception as e:
+                logging.error(f"Unexpected error during refresh: {e}", exc_info=True)
+                result = None
+
+            with self._lock:
+                self.cycles_run += 1
+                rerun = self._rerun and not self._stopping
+                self._rerun = False
+                self._busy = rerun
+            # Applying is queued in FIFO order on the UI thread, so results from
+            # consecutive cycles land in the order they were fetched.
+            if self.dispatch is not None:
+                self.dispatch(self._apply, result)
+            else:
+                self._apply(result)
+            with self._lock:
+                if not self._busy:
+                    self._idle.set()
+            if rerun:
+                logging.info("Running follow-up refresh for a trigger that arrived mid-cycle.")
+                self._wake.set()
+
+    def _apply(self, result):
+        try:
+            self.apply_fn(result)
+        except Exception as e:
+            logging.error(f"Error applying refresh result: {e}", exc_info=True)
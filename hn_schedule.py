@@ -0,0 +1,172 @@
+import logging
+import random
+import time
+
+# --- Scheduler Defaults ---
+DEFAULT_MIN_INTERVAL_SECONDS = 300 # Fastest polling while the top list churns
+DEFAULT_MAX_INTERVAL_SECONDS = 4 * 3600 # Slowest polling while nothing changes
+DEFAULT_RETRY_BASE_SECONDS = 30 # First retry after a failure, doubled per further failure
+DEFAULT_BREAKER_FAILURES = 5 # Consecutive failures that open the circuit breaker
+DEFAULT_BREAKER_COOLDOWN_SECONDS = 1800 # Probe interval while the breaker is open
+DEFAULT_IDLE_PAUSE_SECONDS = 900 # Skip refreshes once the user has been idle this long (0 = never)
+FAST_CHURN_FRACTION = 0.2 # Share of the visible window replaced in one cycle that counts as fast
+STABLE_CYCLES = 3 # Unchanged cycles in a row before the interval is lengthened
+WAKE_GRACE_SECONDS = 10 # Give the network a moment after waking before refreshing
+JITTER_FRACTION = 0.1 # Random spread applied to every delay, so clients don't poll in lockstep
+TICK_SECONDS = 15 # How often the app asks the scheduler whether a refresh is due
+IDLE_RECHECK_SECONDS = 60 # While the user is idle, look again this often
+
+# --- Breaker States ---
+BREAKER_CLOSED = "closed" # Normal polling
+BREAKER_OPEN = "open" # Too many failures: probe rarely, stay quiet
+
+# --- Adaptive Scheduler ---
+class AdaptiveScheduler:
+    """
+    Decides when the next refresh is due. Pure bookkeeping, no timers or UI.
+
+    After a successful cycle the interval adapts to how much of the visible
+    window changed: it halves (down to `min_interval`) when the list churns
+    and doubles (up to `max_interval`) after `STABLE_CYCLES` unchanged
+    cycles. A configured interval below `min_interval` is kept as it is and
+    becomes the floor instead. Failures retry with exponential backoff and jitter; after
+    `breaker_failures` in a row the circuit breaker opens and the source is
+    only probed every `breaker_cooldown` seconds until a cycle succeeds.
+    While paused (machine asleep) nothing is due.
+    """
+
+    def __init__(self, base_interval, min_interval=DEFAULT_MIN_INTERVAL_SECONDS,
+                 max_interval=DEFAULT_MAX_INTERVAL_SECONDS, retry_base=DEFAULT_RETRY_BASE_SECONDS,
+                 breaker_failures=DEFAULT_BREAKER_FAILURES, breaker_cooldown=DEFAULT_BREAKER_COOLDOWN_SECONDS,
+                 rng=None):
+        self.configured_min_interval = min_interval
+        self.min_interval = min(min_interval, base_interval)
+        self.max_interval = max(min_interval, max_interval)
+        self.retry_base = retry_base
+        self.breaker_failures = breaker_failures
+        self.breaker_cooldown = breaker_cooldown
+        self.random = rng or random.Random()
+        self.interval = self._clamp(base_interval)
+        self.failures = 0
+        self.breaker = BREAKER_CLOSED
+        self.unchanged_cycles = 0
+        self.previous_window = None
+        self.next_due = 0.0 # Due immediately
+        self.paused = False
+
+    def set_base_interval(self, base_interval, now=None):
+        """Applies a new configured interval (e.g. from Settings); the adaptation restarts from it."""
+        now = time.time() if now is None else now
+        self.min_interval = min(self.configured_min_interval, base_interval)
+        self.interval = self._clamp(base_interval)
+        self.unchanged_cycles = 0
+        if self.breaker == BREAKER_CLOSED and not self.failures:
+            self.next_due = min(self.next_due, now + self._jittered(self.interval))
+
+    def due(self, now=None):
+        """True if a refresh should start now."""
+        now = time.time() if now is None else now
+        return not self.paused and now >= self.next_due
+
+    def record_success(self, window_ids, now=None):
+        """
+        Records a successful cycle showing `window_ids` (the visible top ids).
+
+        Returns (delay, recovered), where `recovered` is True if this closed an open breaker.
+        """
+        now = time.time() if now is None else now
+        recovered = self.breaker == BREAKER_OPEN
+        self.failures = 0
+        self.breaker = BREAKER_CLOSED
+
+        window_ids = list(window_ids)
+        if self.previous_window is not None and window_ids:
+            entered = len(set(window_ids).difference(self.previous_window))
+            if entered / len(window_ids) >= FAST_CHURN_FRACTION:
+                self.interval = self._clamp(self.interval / 2)
+                self.unchanged_cycles = 0
+                logging.info(f"Top list churning ({entered} new of {len(window_ids)}), polling every {self.interval:.0f}s.")
+            elif entered == 0 and window_ids == self.previous_window:
+                self.unchanged_cycles += 1
+                if self.unchanged_cycles >= STABLE_CYCLES:
+                    self.interval = self._clamp(self.interval * 2)
+                    self.unchanged_cycles = 0
+                    logging.info(f"Top list unchanged for {STABLE_CYCLES} cycles, polling every {self.interval:.0f}s.")
+            else:
+                self.unchanged_cycles = 0
+        self.previous_window = window_ids
+
+        delay = self._jittered(self.interval)
+        self.next_due = now + delay
+        return delay, recovered
+
+    def record_failure(self, now=None):
+        """
+        Records a failed cycle. Returns (delay, opened), where `opened` is True
+        only for the failure that opened the breaker (the one to notify about).
+        """
+        now = time.time() if now is None else now
+        self.failures += 1
+        opened = False
+        if self.breaker == BREAKER_OPEN or self.failures >= self.breaker_failures:
+            opened = self.breaker == BREAKER_CLOSED
+            self.breaker = BREAKER_OPEN
+            delay = self._jittered(self.breaker_cooldown)
+            if opened:
+                logging.warning(f"{self.failures} refreshes failed in a row, backing off to one probe every {self.breaker_cooldown}s.")
+        else:
+            # Exponential backoff, never slower than the normal interval
+            backoff = min(self.retry_base * 2 ** (self.failures - 1), self.interval)
+            delay = self._jittered(backoff)
+        self.next_due = now + delay
+        return delay, opened
+
+    def postpone(self, delay, now=None):
+        """Moves the next refresh `delay` seconds out (e.g. while the user is idle)."""
+        now = time.time() if now is None else now
+        self.next_due = now + delay
+
+    def pause(self):
+        """Stops anything from being due (e.g. the machine is going to sleep)."""
+        self.paused = True
+
+    def resume(self, now=None):
+        """Resumes after a pause; an overdue refresh runs after a short grace period."""
+        now = time.time() if now is None else now
+        self.paused = False
+        self.next_due = max(self.next_due, now + WAKE_GRACE_SECONDS)
+
+    def _clamp(self, interval):
+        return max(self.min_interval, min(self.max_interval, interval))
+
+    def _jittered(self, delay):
+        return delay * (1 + self.random.uniform(-JITTER_FRACTION, JITTER_FRACTION))
+
+# --- User Idle Time ---
+CORE_GRAPHICS_PATH = "/System/Library/Frameworks/ApplicationServices.framework/ApplicationServices"
+HID_SYSTEM_STATE = 1 # kCGEventSourceStateHIDSystemState
+ANY_INPUT_EVENT = 0xFFFFFFFF # kCGAnyInputEventType
+_seconds_since_input = None # CGEventSourceSecondsSinceLastEventType, bound on first use
+
+def user_idle_seconds():
+    """
+    Returns seconds since the last keyboard/mouse input, or None if unavailable
+    (not macOS). Asks CoreGraphics in-process, so it is cheap enough for the
+    main thread.
+    """
+    global _seconds_since_input
+    if _seconds_since_input is None:
+        import ctypes # Only needed once a refresh is due, keep it off the startup path
+
+        try:
+            function = ctypes.CDLL(CORE_GRAPHICS_PATH).CGEventSourceSecondsSinceLastEventType
+        except (OSError, AttributeError) as e:
+            logging.debug(f"Could not load CoreGraphics for the user idle time: {e}")
+            _seconds_since_input = False
+            return None
+        function.restype = ctypes.c_double
+        function.argtypes = (ctypes.c_int32, ctypes.c_uint32)
+        _seconds_since_input = function
+    if not _seconds_since_input:
+        return None
+    return _seconds_since_input(HID_SYSTEM_STATE, ANY_INPUT_EVENT)
@@ -0,0 +1,31 @@
+import time
+
+import requests
+
+# --- Instrumented Session ---
+class InstrumentedSession(requests.Session):
+    """requests Session that reports every request's latency, size and outcome to `metrics`."""
+
+    def __init__(self, metrics=None):
+        super().__init__()
+        self.metrics = metrics
+
+    def request(self, method, url, *args, **kwargs):
+        if self.metrics is None or kwargs.get("stream"):
+            return super().request(method, url, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except requests.exceptions.RequestException:
+            self.metrics.record_request(time.perf_counter() - started, error=True)
+            raise
+        # urllib3 keeps the attempts it retried on the raw response
+        raw_retries = getattr(response.raw, "retries", None)
+        retries = len(raw_retries.history) if raw_retries is not None else 0
+        self.metrics.record_request(
+            time.perf_counter() - started,
+            size=len(response.content),
+            error=response.status_code >= 400,
+            retries=retries,
+        )
+        return response
@@ -0,0 +1,226 @@
+import json
+import logging
+import random
+import threading
+
+import requests
+
+from hn_fetch import TOP_STORIES_URL, INELIGIBLE_ALLOWANCE
+
+# --- Streaming Defaults ---
+DEFAULT_MAX_FAILURES = 5 # Consecutive failed connections before falling back to polling
+DEFAULT_RETRY_SECONDS = 1.0 # First reconnect delay, doubled after each failure
+MAX_RETRY_SECONDS = 60.0
+# Firebase sends a keep-alive event every ~30s; a silent stream longer than this is dead.
+DEFAULT_READ_TIMEOUT = 90
+
+# --- Server-Sent Events Parsing ---
+def parse_sse(lines):
+    """Parses decoded text/event-stream lines into (event, data, event_id, retry_ms) tuples."""
+    event, data, event_id, retry = None, [], None, None
+    for line in lines:
+        if line is None:
+            continue
+        if line == "":
+            if data or event:
+                yield (event or "message", "\n".join(data), event_id, retry)
+            event, data, retry = None, [], None
+            continue
+        if line.startswith(":"):
+            continue # Comment line
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+        if field == "event":
+            event = value
+        elif field == "data":
+            data.append(value)
+        elif field == "id":
+            event_id = value
+        elif field == "retry" and value.isdigit():
+            retry = int(value)
+
+# --- Firebase Patch Application ---
+def _as_entries(data):
+    """Converts a Firebase array value (list, sparse dict or null) into {index: value}."""
+    if isinstance(data, list):
+        return {index: value for index, value in enumerate(data) if value is not None}
+    if isinstance(data, dict):
+        return {int(key): value for key, value in data.items() if value is not None}
+    return {}
+
+def apply_firebase_event(entries, event, payload):
+    """
+    Applies a Firebase `put`/`patch` event to an {index: id} list representation in place.
+
+    Returns True if the event was understood.
+    """
+    path = (payload.get("path") or "/").strip("/")
+    data = payload.get("data")
+    if event == "put":
+        if not path:
+            entries.clear()
+            entries.update(_as_entries(data))
+        else:
+            index = int(path.split("/")[0])
+            if data is None:
+                entries.pop(index, None)
+            else:
+                entries[index] = data
+        return True
+    if event == "patch" and not path and isinstance(data, dict):
+        for key, value in data.items():
+            if value is None:
+                entries.pop(int(key), None)
+            else:
+                entries[int(key)] = value
+        return True
+    return False
+
+def entries_to_ids(entries):
+    """Returns the story ids of an {index: id} representation in rank order."""
+    return [entries[index] for index in sorted(entries)]
+
+# --- Top Stories Stream ---
+class TopStoriesStream:
+    """
+    Keeps the top story id list current over a Firebase server-sent-events stream.
+
+    Streamed `put`/`patch` events are applied to the in-memory list and
+    `on_window_change(story_ids)` is called (from the stream thread) only when
+    the visible head of the list changes. Dropped connections are re-opened
+    with exponential backoff; Firebase resumes by sending the full current list
+    as the first event of every connection. After `max_failures` consecutive
+    failed connections the stream gives up and calls `on_fallback()`, so the
+    caller can return to polling.
+    """
+
+    def __init__(self, on_window_change, window_size, url=TOP_STORIES_URL, on_fallback=None,
+                 session=None, max_failures=DEFAULT_MAX_FAILURES, retry_seconds=DEFAULT_RETRY_SECONDS,
+                 read_timeout=DEFAULT_READ_TIMEOUT, connect_timeout=10):
+        self.on_window_change = on_window_change
+        self.on_fallback = on_fallback
+        self.url = url
+        # Leave room for jobs/url-less posts near the top, as the fetch engine does.
+        self.window_size = window_size + window_size // INELIGIBLE_ALLOWANCE + 1
+        self.session = session or requests.Session()
+        self.max_failures = max_failures
+        self.retry_seconds = retry_seconds
+        self.read_timeout = read_timeout
+        self.connect_timeout = connect_timeout
+        self.story_ids = None # Latest full id list, replaced (never mutated) on each change
+        self.connected = False
+        self.fallen_back = False
+        self.events_received = 0
+        self._entries = {}
+        self._window = None
+        self._last_event_id = None
+        self._stop = threading.Event()
+        self._response = None
+        self._thread = None
+
+    def start(self):
+        """Starts the stream on a daemon thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="hn-stream", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stops the stream and closes the connection."""
+        self._stop.set()
+        response = self._response
+        if response is not None:
+            response.close()
+
+    @property
+    def live(self):
+        """True while connected and holding a complete id list."""
+        return self.connected and self.story_ids is not None
+
+    def _run(self):
+        failures = 0
+        delay = self.retry_seconds
+        while not self._stop.is_set():
+            received_before = self.events_received
+            server_retry = None
+            try:
+                server_retry = self._consume()
+                logging.warning("Top stories stream closed by server.")
+            except requests.exceptions.RequestException as e:
+                if self._stop.is_set():
+                    break
+                logging.warning(f"Top stories stream error: {e}")
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                logging.error(f"Unexpected top stories stream error: {e}")
+            finally:
+                self.connected = False
+                self._response = None
+            if self._stop.is_set():
+                break
+
+            if self.events_received > received_before:
+                # The connection worked for a while; start the backoff over.
+                failures = 0
+                delay = self.retry_seconds
+            failures += 1
+            if failures >= self.max_failures:
+                logging.error(f"Top stories stream failed {failures} times, falling back to polling.")
+                self.fallen_back = True
+                if self.on_fallback is not None:
+                    self.on_fallback()
+                return
+
+            wait = server_retry / 1000.0 if server_retry else delay
+            wait = wait * random.uniform(0.8, 1.2)
+            logging.info(f"Reconnecting top stories stream in {wait:.1f}s.")
+            self._stop.wait(wait)
+            delay = min(delay * 2, MAX_RETRY_SECONDS)
+
+    def _consume(self):
+        """Reads one connection until it ends. Returns the server's retry hint, if any."""
+        headers = {"Accept": "text/event-stream"}
+        if self._last_event_id:
+            headers["Last-Event-ID"] = self._last_event_id
+        retry = None
+        with self.session.get(self.url, headers=headers, stream=True,
+                              timeout=(self.connect_timeout, self.read_timeout)) as response:
+            self._response = response
+            response.raise_for_status()
+            self.connected = True
+            logging.info(f"Top stories stream connected to {self.url}.")
+            # chunk_size=1: larger chunks would hold small events back until the buffer fills.
+            lines = response.iter_lines(chunk_size=1, decode_unicode=True)
+            for event, data, event_id, event_retry in parse_sse(lines):
+                if self._stop.is_set():
+                    break
+                self.events_received += 1
+                if event_id:
+                    self._last_event_id = event_id
+                if event_retry:
+                    retry = event_retry
+                if event in ("cancel", "auth_revoked"):
+                    logging.warning(f"Top stories stream {event} by server.")
+                    break
+                if event in ("put", "patch"):
+                    self._handle_patch(event, data)
+        return retry
+
+    def _handle_patch(self, event, data):
+        try:
+            payload = json.loads(data) if data else {}
+            if not apply_firebase_event(self._entries, event, payload):
+                logging.debug(f"Ignoring unsupported stream event {event}: {data[:100]}")
+                return
+        except (ValueError, TypeError, AttributeError) as e:
+            logging.warning(f"Malformed stream event {event}: {e}")
+            return
+
+        story_ids = entries_to_ids(self._entries)
+        self.story_ids = story_ids
+        window = story_ids[:self.window_size]
+        if window != self._window:
+            self._window = window
+            logging.info("Visible top stories changed on stream.")
+            self.on_window_change(story_ids)
@@ -0,0 +1,338 @@
+import heapq
+import logging
+import os
+import struct
+import sys
+from array import array
+from itertools import repeat
+from operator import add, mul, not_, sub, truediv
+
+# --- Trend Defaults ---
+SCORE_HISTORY_FILE = "score_history.bin" # Lives next to settings.json
+TRENDING_FEED = "trending" # Key of the Trending submenu among the feeds
+TRENDING_LABEL = "Trending"
+DEFAULT_MAX_ITEMS = 3000 # Tracked items; the least recently seen one makes room beyond this
+DEFAULT_SAMPLES = 48 # Snapshots kept per item (one per refresh)
+DEFAULT_WINDOW_SECONDS = 3600 # Velocity is measured over about this long
+DEFAULT_EVICT_SECONDS = 6 * 3600 # Items not in any feed for this long are dropped
+MIN_SAMPLE_SECONDS = 60 # Refreshes closer together than this update the newest snapshot instead
+MIN_VELOCITY_SECONDS = 600 # Don't extrapolate points/hour from less than this much history
+RANK_MOVE = 3 # Top-list places gained/lost within the window to count as a riser/faller
+TREND_RISER = "riser"
+TREND_FALLER = "faller"
+
+MISSING = -1 # Score of an item not seen in a snapshot
+FORMAT_MAGIC = b"HNTS2"
+HEADER = struct.Struct("<5sIII") # magic, capacity, samples, head; fixed size, so every array has a fixed offset
+MAX_PARTIAL_WRITES = 2048 # Past this many separate writes (e.g. many evictions), rewrite the whole file
+
+# --- Score History ---
+class ScoreHistory:
+    """
+    Fixed-size, array-backed score history of the stories seen in the feeds.
+
+    Every refresh writes one snapshot row of (score, rank) for all tracked
+    items; the rows form a ring of `samples` rows over `max_items` item slots,
+    so memory is fixed at about 6 bytes per item per sample, allocated up
+    front. Items get a slot when first seen and lose it once they have been
+    out of every feed for `evict_seconds` (or, when all slots are taken, the
+    least recently seen one makes room).
+
+    Velocities are computed for all slots at once, column-wise over the
+    arrays with C-level map() calls rather than a Python loop per item. The
+    history is read back on first use and saved after every snapshot: only
+    what changed (the snapshot row, the slots it touched and the header) is
+    written in place at fixed offsets, and the file is rewritten in full only
+    when it is missing or has another layout.
+    Not thread-safe: the refresh worker is its only user.
+    """
+
+    def __init__(self, path=SCORE_HISTORY_FILE, max_items=DEFAULT_MAX_ITEMS, samples=DEFAULT_SAMPLES,
+                 evict_seconds=DEFAULT_EVICT_SECONDS):
+        self.path = path
+        self.capacity = max_items
+        self.samples = samples
+        self.evict_seconds = evict_seconds
+        self.loaded = False
+        self._reset()
+
+    def _reset(self):
+        capacity, samples = self.capacity, self.samples
+        self.ids = array("I", bytes(4 * capacity)) # 0 = free slot
+        self.first_seen = array("d", bytes(8 * capacity))
+        self.last_seen = array("d", bytes(8 * capacity))
+        self.first_score = array("i", bytes(4 * capacity))
+        self.row_times = array("d", bytes(8 * samples)) # 0 = row not written yet
+        self.scores = array("i", [MISSING]) * (samples * capacity)
+        self.ranks = array("H", bytes(2 * samples * capacity)) # 1-based top rank, 0 = not on top
+        self.head = 0 # Newest row
+        self.slots = {} # id -> slot
+        self.free = list(range(capacity - 1, -1, -1)) # Free slots, lowest last
+        # Changes not saved yet; `synced` is False until the file has this layout
+        self.synced = False
+        self.dirty_rows = set()
+        self.dirty_slots = set() # Slots whose id, times or first score changed
+        self.cleared_slots = set() # Freed slots, whose column in every row was cleared
+        self.last_save_bytes = 0
+
+    def __len__(self):
+        return len(self.slots)
+
+    def memory_bytes(self):
+        """Returns the bytes held by the arrays, fixed by `max_items` and `samples`."""
+        return sum(len(values) * values.itemsize for values in self._arrays())
+
+    def record(self, now, observed):
+        """Adds a snapshot: `observed` maps item ids to (score, top rank or 0). Saves the history."""
+        self._load()
+        capacity = self.capacity
+        if self.row_times[self.head] and now - self.row_times[self.head] < MIN_SAMPLE_SECONDS:
+            self.row_times[self.head] = now
+        else:
+            if self.row_times[self.head]:
+                self.head = (self.head + 1) % self.samples
+            start = self.head * capacity
+            self.scores[start:start + capacity] = array("i", [MISSING]) * capacity
+            self.ranks[start:start + capacity] = array("H", bytes(2 * capacity))
+            self.row_times[self.head] = now
+        self.dirty_rows.add(self.head)
+        self.evict(now - self.evict_seconds, keep=observed)
+
+        start = self.head * capacity
+        for item_id, (score, rank) in observed.items():
+            slot = self.slots.get(item_id)
+            if slot is None:
+                slot = self._allocate(item_id, now, score)
+            self.last_seen[slot] = now
+            self.dirty_slots.add(slot)
+            self.scores[start + slot] = max(0, score)
+            self.ranks[start + slot] = min(rank, 0xFFFF)
+        self.save()
+
+    def evict(self, cutoff, keep=()):
+        """Frees the slots of items last seen before `cutoff` (except ids in `keep`)."""
+        stale = [slot for slot, seen in enumerate(self.last_seen) if 0 < seen < cutoff and self.ids[slot] not in keep]
+        for slot in stale:
+            self._free(slot)
+        if stale:
+            logging.info(f"Stopped tracking {len(stale)} stories that left all feeds.")
+
+    def reference_row(self, now, window=DEFAULT_WINDOW_SECONDS):
+        """Returns the newest row at least `window` seconds old, or the oldest row if the history is shorter."""
+        oldest = self.head
+        for back in range(1, self.samples):
+            row = (self.head - back) % self.samples
+            if not self.row_times[row]:
+                break
+            oldest = row
+            if self.row_times[row] <= now - window:
+                return row
+        return oldest
+
+    def velocities(self, now, window=DEFAULT_WINDOW_SECONDS):
+        """
+        Returns an array of points/hour per slot over about `window` seconds,
+        measured from the reference row. Items missing from the reference row
+        (new since, or out of the feeds back then) are measured from their
+        first score and when it was seen instead. Slots missing from the
+        newest row come out negative.
+        """
+        self._load()
+        capacity = self.capacity
+        newest = self.scores[self.head * capacity:(self.head + 1) * capacity]
+        reference = self.reference_row(now, window)
+        if reference == self.head:
+            return array("d", bytes(8 * capacity))
+        # Pick (reference score, reference time) or (first score, first seen) per slot, never a mix
+        reference_scores = self.scores[reference * capacity:(reference + 1) * capacity]
+        present = list(map(MISSING.__ne__, reference_scores))
+        absent = list(map(not_, present))
+        base = map(add, map(mul, reference_scores, present), map(mul, self.first_score, absent))
+        since = map(add, map(mul, repeat(self.row_times[reference]), present), map(mul, self.first_seen, absent))
+        seconds = map(max, map(sub, repeat(self.row_times[self.head]), since), repeat(MIN_VELOCITY_SECONDS))
+        gained = map(sub, newest, base)
+        return array("d", map(mul, map(truediv, gained, seconds), repeat(3600.0)))
+
+    def trending(self, now, limit, window=DEFAULT_WINDOW_SECONDS):
+        """Returns up to `limit` (item_id, points/hour) pairs for items in the newest snapshot, fastest first."""
+        ranked = heapq.nlargest(limit, zip(self.velocities(now, window), self.ids))
+        return [(item_id, velocity) for velocity, item_id in ranked if item_id and velocity > 0]
+
+    def rank_change(self, item_id, now, window=DEFAULT_WINDOW_SECONDS):
+        """
+        Returns the top-list places gained (negative: lost) over the window, or
+        None if the item is not ranked now. An item that was seen but not on
+        the top list at the start of the window counts as gaining RANK_MOVE
+        places; one with no snapshot back then counts as unchanged.
+        """
+        slot = self.slots.get(item_id)
+        if slot is None:
+            return None
+        rank = self.ranks[self.head * self.capacity + slot]
+        if not rank:
+            return None
+        reference = self.reference_row(now, window)
+        if reference == self.head:
+            return 0
+        previous = self.ranks[reference * self.capacity + slot]
+        if previous:
+            return previous - rank
+        return RANK_MOVE if self.scores[reference * self.capacity + slot] != MISSING else 0
+
+    def _allocate(self, item_id, now, score):
+        if not self.free:
+            # Full: make room by dropping the least recently seen item
+            self._free(min(range(self.capacity), key=self.last_seen.__getitem__))
+        free = self.free.pop()
+        self.ids[free] = item_id
+        self.slots[item_id] = free
+        self.first_seen[free] = now
+        self.first_score[free] = max(0, score)
+        self.dirty_slots.add(free)
+        return free
+
+    def _free(self, slot):
+        self.slots.pop(self.ids[slot], None)
+        self.ids[slot] = 0
+        self.first_seen[slot] = self.last_seen[slot] = 0.0
+        self.first_score[slot] = 0
+        for row in range(self.samples):
+            self.scores[row * self.capacity + slot] = MISSING
+            self.ranks[row * self.capacity + slot] = 0
+        self.free.append(slot)
+        self.dirty_slots.add(slot)
+        self.cleared_slots.add(slot)
+
+    # --- Persistence ---
+    def _arrays(self):
+        return (self.ids, self.first_seen, self.last_seen, self.first_score, self.row_times, self.scores, self.ranks)
+
+    def _offsets(self):
+        """Returns the file offset of each array (by id), which only depends on the layout."""
+        offsets, offset = {}, HEADER.size
+        for values in self._arrays():
+            offsets[id(values)] = offset
+            offset += len(values) * values.itemsize
+        return offsets
+
+    def _load(self):
+        if self.loaded:
+            return
+        self.loaded = True
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "rb") as f:
+                magic, capacity, samples, head = HEADER.unpack(f.read(HEADER.size))
+                if magic != FORMAT_MAGIC:
+                    if magic.startswith(FORMAT_MAGIC[:4]):
+                        logging.info(f"Score history format changed, starting a new one in {self.path}.")
+                        return
+                    raise ValueError("not a score history file")
+                if (capacity, samples) != (self.capacity, self.samples):
+                    logging.info(f"Score history size changed, starting a new one in {self.path}.")
+                    return
+                for values in self._arrays():
+                    size = len(values) * values.itemsize
+                    chunk = f.read(size)
+                    if len(chunk) != size:
+                        raise ValueError("file is truncated")
+                    values[:] = array(values.typecode, chunk)
+                    if sys.byteorder != "little":
+                        values.byteswap()
+            self.head = head % self.samples
+            self.slots = {item_id: slot for slot, item_id in enumerate(self.ids) if item_id}
+            self.free = [slot for slot in range(self.capacity - 1, -1, -1) if not self.ids[slot]]
+            self.synced = True
+            logging.info(f"Loaded score history of {len(self.slots)} stories from {self.path}.")
+        except (IOError, ValueError, struct.error) as e:
+            logging.error(f"Error loading score history from {self.path}: {e}")
+            self._reset()
+
+    def save(self):
+        """
+        Writes the changes since the last save to `path` (no-op without a path).
+        They go in place when the file has this layout, otherwise the whole
+        history is written atomically.
+        """
+        if not self.path:
+            return
+        if self.synced and self._partial_writes() <= MAX_PARTIAL_WRITES:
+            try:
+                with open(self.path, "r+b") as f:
+                    self.last_save_bytes = self._write_changes(f)
+                self._mark_saved()
+                return
+            except IOError as e:
+                logging.warning(f"Error updating score history in {self.path}, rewriting it: {e}")
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(HEADER.pack(FORMAT_MAGIC, self.capacity, self.samples, self.head))
+                for values in self._arrays():
+                    _write_values(f, values)
+            os.replace(temp_path, self.path)
+            self.last_save_bytes = os.path.getsize(self.path)
+            self._mark_saved()
+        except IOError as e:
+            logging.error(f"Error saving score history to {self.path}: {e}")
+
+    def _partial_writes(self):
+        clean_rows = self.samples - len(self.dirty_rows)
+        return (
+            3 * len(self.dirty_rows)
+            + 4 * len(_runs(self.dirty_slots))
+            + 2 * clean_rows * len(_runs(self.cleared_slots))
+        )
+
+    def _write_changes(self, f):
+        """Writes the dirty rows, cleared columns, dirty slots and then the header. Returns the bytes written."""
+        capacity = self.capacity
+        offsets = self._offsets()
+        written = 0
+
+        def write(values, start, stop):
+            nonlocal written
+            f.seek(offsets[id(values)] + start * values.itemsize)
+            written += _write_values(f, values[start:stop])
+
+        for row in self.dirty_rows:
+            write(self.row_times, row, row + 1)
+            write(self.scores, row * capacity, (row + 1) * capacity)
+            write(self.ranks, row * capacity, (row + 1) * capacity)
+        for start, stop in _runs(self.cleared_slots):
+            for row in range(self.samples):
+                if row not in self.dirty_rows:
+                    write(self.scores, row * capacity + start, row * capacity + stop)
+                    write(self.ranks, row * capacity + start, row * capacity + stop)
+        for start, stop in _runs(self.dirty_slots):
+            for values in (self.ids, self.first_seen, self.last_seen, self.first_score):
+                write(values, start, stop)
+        # Header last: it holds `head`, which must not point at a row that isn't written yet
+        f.seek(0)
+        f.write(HEADER.pack(FORMAT_MAGIC, self.capacity, self.samples, self.head))
+        return written + HEADER.size
+
+    def _mark_saved(self):
+        self.synced = True
+        self.dirty_rows.clear()
+        self.dirty_slots.clear()
+        self.cleared_slots.clear()
+
+def _runs(indices):
+    """Groups indices into sorted (start, stop) runs of consecutive values."""
+    runs = []
+    for index in sorted(indices):
+        if runs and runs[-1][1] == index:
+            runs[-1][1] = index + 1
+        else:
+            runs.append([index, index + 1])
+    return runs
+
+def _write_values(f, values):
+    """Writes an array little-endian. Returns the bytes written."""
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    values.tofile(f)
+    return len(values) * values.itemsize
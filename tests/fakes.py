@@ -0,0 +1,61 @@
+import threading
+import time
+
+import requests
+
+API_BASE = "https://hn.test/v0"
+ITEM_URL_TEMPLATE = f"{API_BASE}/item/{{}}.json"
+UPDATES_URL = f"{API_BASE}/updates.json"
+
+def story(item_id, score=10, url=True, **fields):
+    details = {"id": item_id, "type": "story", "title": f"Story {item_id}", "score": score, **fields}
+    if url:
+        details["url"] = f"https://example.com/{item_id}"
+    return details
+
+class FakeResponse:
+    def __init__(self, status, payload):
+        self.status_code = status
+        self.payload = payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} error")
+
+    def json(self):
+        return self.payload
+
+class FakeSession:
+    """
+    Stands in for a requests Session: serves JSON from `routes` (url -> payload),
+    404 for unknown urls and a connection error for urls in `failing`. `delays`
+    (url -> seconds) holds responses back, so requests can complete out of
+    order. Every requested url is recorded in `requests`, from any thread.
+    """
+
+    def __init__(self, routes=None, items=(), delays=None, failing=()):
+        self.routes = dict(routes or {})
+        for details in items:
+            self.routes[ITEM_URL_TEMPLATE.format(details["id"])] = details
+        self.delays = dict(delays or {})
+        self.failing = set(failing)
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def get(self, url, timeout=None, **kwargs):
+        with self._lock:
+            self.requests.append(url)
+        time.sleep(self.delays.get(url, 0))
+        if url in self.failing:
+            raise requests.exceptions.ConnectionError(f"cannot reach {url}")
+        if url not in self.routes:
+            return FakeResponse(404, None)
+        return FakeResponse(200, self.routes[url])
+
+    def item_requests(self):
+        """Returns the ids of the items requested, in request order."""
+        prefix, suffix = ITEM_URL_TEMPLATE.split("{}")
+        return [int(url[len(prefix):-len(suffix)]) for url in self.requests if url.startswith(prefix)]
+
+    def close(self):
+        pass
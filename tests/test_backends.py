@@ -0,0 +1,107 @@
+import pytest
+import requests
+from fakes import API_BASE, FakeSession, story
+
+from hn_backends import BACKEND_ALGOLIA
+from hn_core import HackerNewsCore
+
+TOP_STORIES_URL = f"{API_BASE}/topstories.json"
+
+class StubFrontPage:
+    """A bulk backend serving a fixed front page, or failing with `error`."""
+
+    name = BACKEND_ALGOLIA
+    bulk = True
+
+    def __init__(self, pairs=(), error=None):
+        self.pairs = list(pairs)
+        self.error = error
+
+    def fetch_front_page(self, timeout):
+        if self.error is not None:
+            raise self.error
+        return self.pairs
+
+def make_core(session, front_page, fallback=True, max_articles=3):
+    errors = []
+    settings = {
+        "HN_API_BASE": API_BASE,
+        "HN_BACKEND": BACKEND_ALGOLIA,
+        "BACKEND_FALLBACK": fallback,
+        "MAX_ARTICLES_IN_MENU": max_articles,
+        "INCREMENTAL_REFRESH": False,
+        "TREND_TRACKING": False,
+    }
+    core = HackerNewsCore(
+        settings, session=session, item_cache_path=None, score_history_path=None,
+        on_error=lambda subtitle, message: errors.append(subtitle),
+    )
+    core.backend = front_page
+    return core, errors
+
+@pytest.fixture
+def session():
+    return FakeSession(routes={TOP_STORIES_URL: [1, 2, 3, 4, 5]}, items=[story(item_id) for item_id in range(1, 6)])
+
+def ids(articles):
+    return [article["id"] for article in articles]
+
+def test_a_full_front_page_makes_no_other_requests(session):
+    front_page = StubFrontPage([(item_id, story(item_id)) for item_id in (7, 8, 9)])
+    core, errors = make_core(session, front_page)
+    stats = {}
+    assert ids(core.fetch_bulk_articles(3, stats)) == [7, 8, 9]
+    assert session.requests == []
+    assert stats["backend"] == BACKEND_ALGOLIA
+    assert core.top_ids == [7, 8, 9]
+    assert errors == []
+
+def test_a_failed_front_page_falls_back_to_firebase(session):
+    core, errors = make_core(session, StubFrontPage(error=requests.exceptions.ConnectionError("down")))
+    assert core.fetch_bulk_articles(3, {}) is None
+    # The fallback covers the failure, so nothing is reported
+    assert errors == []
+    articles, _ = core.fetch_articles()
+    assert ids(articles) == [1, 2, 3]
+    assert core.top_ids == [1, 2, 3, 4, 5]
+    assert errors == []
+
+def test_a_failed_front_page_is_reported_without_fallback(session):
+    core, errors = make_core(session, StubFrontPage(error=ValueError("bad JSON")), fallback=False)
+    assert core.fetch_bulk_articles(3, {}) is None
+    assert errors == ["Network Error"]
+    articles, _ = core.fetch_articles()
+    assert articles is None
+    assert session.requests == []
+
+def test_a_short_front_page_is_topped_up_from_firebase(session):
+    # Story 2 is already on the front page; story 4 has no URL and is skipped there
+    front_page = StubFrontPage([(2, story(2)), (4, story(4, url=False))])
+    core, errors = make_core(session, front_page, max_articles=3)
+    stats = {}
+    articles = core.fetch_bulk_articles(3, stats)
+    assert ids(articles) == [2, 1, 3]
+    assert 2 not in session.item_requests() and 4 not in session.item_requests()
+    assert core.top_ids == [2, 4, 1, 3, 5]
+    assert stats["backend"] == f"{BACKEND_ALGOLIA}+{core.firebase.name}"
+    assert stats["items_examined"] >= 4
+    assert stats["skipped_by_type"] == {"no_url": 1}
+    assert errors == []
+
+def test_a_short_front_page_is_kept_without_fallback(session):
+    core, errors = make_core(session, StubFrontPage([(2, story(2))]), fallback=False)
+    stats = {}
+    assert ids(core.fetch_bulk_articles(3, stats)) == [2]
+    assert session.requests == []
+    assert stats["backend"] == BACKEND_ALGOLIA
+    assert errors == []
+
+def test_a_failed_top_up_keeps_the_front_page():
+    session = FakeSession(failing=[TOP_STORIES_URL])
+    core, errors = make_core(session, StubFrontPage([(2, story(2))]))
+    stats = {}
+    assert ids(core.fetch_bulk_articles(3, stats)) == [2]
+    assert session.item_requests() == []
+    assert stats["backend"] == BACKEND_ALGOLIA
+    assert core.top_ids == [2]
+    assert errors == []
@@ -0,0 +1,119 @@
+import sqlite3
+import time
+
+import pytest
+from fakes import ITEM_URL_TEMPLATE, FakeSession, story
+
+from hn_cache import CACHE_FORMAT_VERSION, CACHE_FRESH, CACHE_NEGATIVE, CACHE_STALE_SCORE, ItemCache, open_item_cache
+from hn_fetch import fetch_eligible_stories
+
+NOW = 1_700_000_000.0
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ItemCache(str(tmp_path / "items.sqlite3"), item_ttl=3600, score_ttl=60, max_entries=3)
+    yield cache
+    cache.close()
+
+def test_states_follow_the_score_and_item_ttls(cache):
+    cache.store(1, story(1, score=5, kids=[2, 3]), True, now=NOW)
+    cache.store(2, {"id": 2, "type": "comment", "text": "hi"}, False, now=NOW)
+
+    assert cache.lookup([1, 2, 3], now=NOW + 30) == {
+        1: (CACHE_FRESH, {"id": 1, "type": "story", "title": "Story 1", "url": "https://example.com/1", "score": 5}),
+        2: (CACHE_NEGATIVE, {"id": 2, "type": "comment"}),
+    }
+    assert cache.lookup([1], now=NOW + 61)[1][0] == CACHE_STALE_SCORE
+    assert cache.lookup([2], now=NOW + 3599)[2][0] == CACHE_NEGATIVE
+    assert cache.lookup([1, 2], now=NOW + 3601) == {}
+
+def test_storing_again_refreshes_the_score(cache):
+    cache.store(1, story(1, score=5), True, now=NOW)
+    cache.store(1, story(1, score=9), True, now=NOW + 100)
+    state, details = cache.lookup([1], now=NOW + 110)[1]
+    assert (state, details["score"]) == (CACHE_FRESH, 9)
+
+def test_flush_evicts_the_least_recently_used(cache):
+    for item_id in range(1, 5):
+        cache.store(item_id, story(item_id), True, now=NOW + item_id)
+    cache.lookup([1], now=NOW + 10) # 1 is now the most recently used
+    cache.flush()
+    assert len(cache) == 3
+    assert sorted(cache.lookup([1, 2, 3, 4], now=NOW + 11)) == [1, 3, 4]
+
+def test_entries_survive_reopening(tmp_path):
+    path = str(tmp_path / "items.sqlite3")
+    cache = ItemCache(path)
+    cache.store(1, story(1), True)
+    cache.close()
+    cache = ItemCache(path)
+    assert list(cache.lookup([1])) == [1]
+    cache.close()
+
+def test_other_format_version_is_dropped(tmp_path):
+    path = str(tmp_path / "items.sqlite3")
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, stale TEXT)")
+    connection.execute("INSERT INTO items VALUES (1, 'old')")
+    connection.execute("PRAGMA user_version = 1")
+    connection.commit()
+    connection.close()
+
+    cache = ItemCache(path)
+    assert len(cache) == 0
+    cache.store(1, story(1), True)
+    assert list(cache.lookup([1])) == [1]
+    cache.close()
+    connection = sqlite3.connect(path)
+    assert connection.execute("PRAGMA user_version").fetchone() == (CACHE_FORMAT_VERSION,)
+    connection.close()
+
+def test_unopenable_cache_disables_caching(tmp_path):
+    assert open_item_cache(str(tmp_path / "missing" / "items.sqlite3")) is None
+
+# --- Use by the fetch engine ---
+def fetch(session, story_ids, max_articles, cache, stats):
+    return fetch_eligible_stories(
+        session, story_ids, max_articles, timeout=1, max_workers=4, cache=cache, stats=stats,
+        item_url_template=ITEM_URL_TEMPLATE
+    )
+
+def test_fresh_and_negative_entries_skip_the_network(cache):
+    cache.max_entries = 100
+    cache.store(1, story(1), True)
+    cache.store(2, {"id": 2, "type": "comment"}, False)
+    cache.store(3, story(3, url=False), True) # Ask HN post: listable, but not for the top menu
+    session = FakeSession(items=[story(4)])
+    stats = {}
+    articles = fetch(session, [1, 2, 3, 4], 2, cache, stats)
+    assert [article["id"] for article in articles] == [1, 4]
+    assert session.item_requests() == [4]
+    assert stats["skipped_negative"] == 1
+    assert stats["skipped_by_type"] == {"comment": 1, "no_url": 1}
+
+def test_stale_entry_falls_back_to_the_cached_copy_when_the_request_fails(cache):
+    cache.store(1, story(1, score=5), True, now=time.time() - 120) # Score past its TTL
+    assert cache.lookup([1])[1][0] == CACHE_STALE_SCORE
+    session = FakeSession(failing={ITEM_URL_TEMPLATE.format(1)})
+    articles = fetch(session, [1], 1, cache, {})
+    assert session.item_requests() == [1]
+    assert [(article["id"], article["score"]) for article in articles] == [(1, 5)]
+
+def test_stale_entry_is_refreshed_from_the_network(cache):
+    cache.store(1, story(1, score=5), True, now=time.time() - 120) # Score past its TTL
+    assert cache.lookup([1])[1][0] == CACHE_STALE_SCORE
+    session = FakeSession(items=[story(1, score=50)])
+    articles = fetch(session, [1], 1, cache, {})
+    assert articles[0]["score"] == 50
+    assert cache.lookup([1])[1] == (CACHE_FRESH, story(1, score=50))
+
+def test_fetched_items_are_stored_for_the_next_refresh(cache):
+    cache.max_entries = 100
+    session = FakeSession(items=[story(1), {"id": 2, "type": "poll", "title": "Poll"}, story(3)])
+    fetch(session, [1, 2, 3], 2, cache, {})
+    assert {item_id: state for item_id, (state, _) in cache.lookup([1, 2, 3]).items()} == {
+        1: CACHE_FRESH, 2: CACHE_NEGATIVE, 3: CACHE_FRESH,
+    }
+    session = FakeSession()
+    assert [article["id"] for article in fetch(session, [1, 2, 3], 2, cache, {})] == [1, 3]
+    assert session.requests == []
@@ -0,0 +1,96 @@
+from fakes import ITEM_URL_TEMPLATE, FakeSession, story
+
+from hn_feeds import HN_ITEM_PAGE_URL, fetch_feed_stories, is_feed_item
+from hn_fetch import INELIGIBLE_ALLOWANCE
+
+def fetch(session, feed_ids, limits, **kwargs):
+    return fetch_feed_stories(
+        session, feed_ids, limits, timeout=1, max_workers=8, item_url_template=ITEM_URL_TEMPLATE, **kwargs
+    )
+
+def ids(articles):
+    return [article["id"] for article in articles]
+
+def job(item_id, url=False):
+    details = {"id": item_id, "type": "job", "title": f"Job {item_id}"}
+    if url:
+        details["url"] = f"https://jobs.example.com/{item_id}"
+    return details
+
+def test_each_item_is_fetched_once_across_feeds():
+    items = [story(item_id) for item_id in range(1, 13)]
+    session = FakeSession(items=items)
+    feed_ids = {"top": [1, 2, 3, 4], "new": [5, 1, 6, 2], "best": [2, 3, 7, 8]}
+    stats = {}
+    feeds = fetch(session, feed_ids, {"top": 3, "new": 3, "best": 3}, stats=stats)
+    assert ids(feeds["top"]) == [1, 2, 3]
+    assert ids(feeds["new"]) == [5, 1, 6]
+    assert ids(feeds["best"]) == [2, 3, 7]
+    requested = session.item_requests()
+    assert len(requested) == len(set(requested))
+    assert stats["shared_items"] > 0
+
+def test_rank_order_survives_out_of_order_completion():
+    delays = {ITEM_URL_TEMPLATE.format(item_id): (10 - item_id) * 0.01 for item_id in range(1, 10)}
+    session = FakeSession(items=[story(item_id) for item_id in range(1, 10)], delays=delays)
+    feeds = fetch(session, {"top": [1, 2, 3, 4], "new": [9, 8, 7, 6]}, {"top": 4, "new": 4})
+    assert ids(feeds["top"]) == [1, 2, 3, 4]
+    assert ids(feeds["new"]) == [9, 8, 7, 6]
+
+def test_stops_requesting_once_every_feed_is_full():
+    session = FakeSession(items=[story(item_id) for item_id in range(1, 81)])
+    stats = {}
+    feeds = fetch(session, {"top": list(range(1, 41)), "new": list(range(41, 81))}, {"top": 3, "new": 3}, stats=stats)
+    assert ids(feeds["top"]) == [1, 2, 3]
+    assert ids(feeds["new"]) == [41, 42, 43]
+    # One wave covers both feeds; beyond the small allowance for skipped items, nothing further
+    # down the lists is touched
+    assert stats["waves"] == 1
+    allowance = 3 // INELIGIBLE_ALLOWANCE + 1
+    assert sorted(session.item_requests()) == list(range(1, 4 + allowance)) + list(range(41, 44 + allowance))
+
+def test_each_feed_shows_its_own_kind_of_item():
+    items = [story(1), story(2, url=False), job(3), job(4, url=True), {"id": 5, "type": "poll", "title": "Poll"}]
+    session = FakeSession(items=items)
+    feed_ids = {"top": [1, 2, 3, 4, 5], "ask": [2, 1, 5], "job": [3, 4, 1]}
+    stats = {}
+    feeds = fetch(session, feed_ids, {"top": 5, "ask": 5, "job": 5}, stats=stats)
+    assert ids(feeds["top"]) == [1]
+    assert ids(feeds["ask"]) == [2, 1]
+    assert ids(feeds["job"]) == [3, 4]
+    # Posts without a URL link to their discussion page
+    assert feeds["ask"][0]["url"] == HN_ITEM_PAGE_URL.format(2)
+    assert feeds["job"][1]["url"] == "https://jobs.example.com/4"
+    assert stats["skipped_by_type"] == {"no_url": 1, "job": 2, "poll": 1}
+
+def test_short_feeds_are_filled_in_later_waves():
+    items = [job(item_id) for item_id in range(1, 7)] + [story(item_id) for item_id in range(7, 10)]
+    session = FakeSession(items=items)
+    stats = {}
+    feeds = fetch(session, {"top": list(range(1, 10))}, {"top": 3}, stats=stats)
+    assert ids(feeds["top"]) == [7, 8, 9]
+    assert stats["waves"] > 1
+    requested = session.item_requests()
+    assert len(requested) == len(set(requested))
+
+def test_story_filter_applies_to_every_feed():
+    session = FakeSession(items=[story(item_id, score=item_id) for item_id in range(1, 7)])
+    feeds = fetch(session, {"top": [1, 2, 3, 4], "new": [6, 5, 2]}, {"top": 2, "new": 2},
+                  story_filter=lambda item_id, details: details["score"] % 2 == 0)
+    assert ids(feeds["top"]) == [2, 4]
+    assert ids(feeds["new"]) == [6, 2]
+
+def test_disabled_or_empty_feeds_make_no_requests():
+    session = FakeSession(items=[story(1)])
+    feeds = fetch(session, {"top": [1], "new": [], "best": [1]}, {"top": 0, "new": 3})
+    assert feeds == {"top": [], "new": [], "best": []}
+    assert session.requests == []
+
+def test_is_feed_item():
+    assert is_feed_item("top", story(1))
+    assert not is_feed_item("top", story(1, url=False))
+    assert is_feed_item("ask", story(1, url=False))
+    assert not is_feed_item("ask", job(1))
+    assert is_feed_item("job", job(1))
+    assert not is_feed_item("job", story(1))
+    assert not is_feed_item("new", None)
@@ -0,0 +1,71 @@
+from fakes import ITEM_URL_TEMPLATE, FakeSession, story
+
+from hn_fetch import CANDIDATE_MULTIPLIER, INELIGIBLE_ALLOWANCE, fetch_eligible_stories
+
+def fetch(session, story_ids, max_articles, **kwargs):
+    kwargs.setdefault("max_workers", 8)
+    return fetch_eligible_stories(
+        session, story_ids, max_articles, timeout=1, item_url_template=ITEM_URL_TEMPLATE, **kwargs
+    )
+
+def ids(articles):
+    return [article["id"] for article in articles]
+
+def test_rank_order_survives_out_of_order_completion():
+    # Higher-ranked items answer last
+    delays = {ITEM_URL_TEMPLATE.format(item_id): (6 - item_id) * 0.02 for item_id in range(1, 6)}
+    session = FakeSession(items=[story(item_id) for item_id in range(1, 6)], delays=delays)
+    assert ids(fetch(session, [1, 2, 3, 4, 5], 5)) == [1, 2, 3, 4, 5]
+
+def test_stops_requesting_once_enough_stories_are_in_hand():
+    session = FakeSession(items=[story(item_id) for item_id in range(1, 41)])
+    stats = {}
+    articles = fetch(session, list(range(1, 41)), 4, stats=stats)
+    assert ids(articles) == [1, 2, 3, 4]
+    # Only the stories needed plus a small allowance for skipped ones are ever queued; queued
+    # requests that had not started yet when enough stories arrived are dropped
+    assert len(session.item_requests()) <= stats["item_requests"] <= 4 + 4 // INELIGIBLE_ALLOWANCE + 1
+
+def test_ineligible_items_are_skipped_and_replaced_from_further_down():
+    items = [
+        story(1),
+        {"id": 2, "type": "job", "title": "Hiring"},
+        story(3, url=False),
+        {"id": 4, "type": "comment"},
+        story(5, dead=True),
+        story(6),
+        story(7),
+    ]
+    session = FakeSession(items=items, failing={ITEM_URL_TEMPLATE.format(8)})
+    stats = {}
+    articles = fetch(session, [1, 2, 3, 4, 8, 6, 7], 3, stats=stats)
+    assert ids(articles) == [1, 6, 7]
+    assert stats["skipped_by_type"] == {"job": 1, "no_url": 1, "comment": 1, "error": 1}
+    assert articles[0] == {"title": "Story 1", "url": "https://example.com/1", "id": 1, "score": 10}
+
+def test_story_filter_applies_as_items_arrive():
+    session = FakeSession(items=[story(item_id, score=item_id * 10) for item_id in range(1, 11)])
+    stats = {}
+    articles = fetch(session, list(range(1, 11)), 2, stats=stats,
+                     story_filter=lambda item_id, details: details["score"] >= 50)
+    assert ids(articles) == [5, 6]
+    assert stats["skipped_by_type"] == {"filtered": 4}
+
+def test_only_a_bounded_number_of_candidates_is_examined():
+    jobs = [{"id": item_id, "type": "job", "title": "Hiring"} for item_id in range(1, 101)]
+    session = FakeSession(items=jobs)
+    assert fetch(session, list(range(1, 101)), 2) == []
+    assert len(session.item_requests()) == 2 * CANDIDATE_MULTIPLIER
+
+def test_nothing_wanted_or_nothing_listed_makes_no_requests():
+    session = FakeSession(items=[story(1)])
+    assert fetch(session, [1], 0) == []
+    assert fetch(session, [], 5) == []
+    assert session.requests == []
+
+def test_observed_receives_every_examined_item():
+    session = FakeSession(items=[story(1), {"id": 2, "type": "poll", "title": "Poll"}, story(3)])
+    observed = {}
+    fetch(session, [1, 2, 3], 2, observed=observed)
+    assert sorted(observed) == [1, 2, 3]
+    assert observed[2]["type"] == "poll"
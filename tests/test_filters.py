@@ -0,0 +1,61 @@
+import logging
+
+from fakes import story
+
+from hn_filters import HN_DOMAIN, StoryFilter, compile_story_filter, item_domain
+from hn_read_history import ReadHistory
+
+def with_url(url, **fields):
+    return dict(story(1, **fields), url=url)
+
+def test_item_domain_strips_www_and_maps_text_posts_to_hn():
+    assert item_domain(with_url("https://www.Example.com/a")) == "example.com"
+    assert item_domain(with_url("http://blog.example.com:8080/")) == "blog.example.com"
+    assert item_domain(story(1, url=False)) == HN_DOMAIN
+
+def test_block_domains_cover_subdomains_only_on_label_boundaries():
+    story_filter = StoryFilter(block_domains=["www.Example.com/"])
+    assert not story_filter(1, with_url("https://example.com/a"))
+    assert not story_filter(1, with_url("https://blog.example.com/a"))
+    assert story_filter(1, with_url("https://notexample.com/a"))
+    assert story_filter(1, with_url("https://example.com.evil.org/a"))
+
+def test_allow_domains_and_text_posts():
+    story_filter = StoryFilter(allow_domains=["github.com", HN_DOMAIN])
+    assert story_filter(1, with_url("https://gist.github.com/x"))
+    assert story_filter(1, story(1, url=False))
+    assert not story_filter(1, with_url("https://gitlab.com/x"))
+
+def test_block_wins_over_allow():
+    story_filter = StoryFilter(allow_domains=["example.com"], block_domains=["ads.example.com"])
+    assert story_filter(1, with_url("https://example.com/"))
+    assert not story_filter(1, with_url("https://ads.example.com/"))
+
+def test_title_patterns_and_min_score():
+    story_filter = StoryFilter(min_score=10, title_include=["python", "rust"], title_exclude=[r"\bcrypto\b"])
+    assert story_filter(1, dict(story(1, score=10), title="Python 4 released"))
+    assert not story_filter(1, dict(story(1, score=9), title="Python 4 released"))
+    assert not story_filter(1, dict(story(1, score=50), title="Go 2 released"))
+    assert not story_filter(1, dict(story(1, score=50), title="Rust for Crypto wallets"))
+    assert story_filter(1, dict(story(1, score=50), title="Rust cryptography"))
+
+def test_invalid_pattern_is_skipped(caplog):
+    with caplog.at_level(logging.ERROR):
+        story_filter = StoryFilter(title_exclude=["(unclosed", "spam"])
+    assert "(unclosed" in caplog.text
+    assert story_filter(1, dict(story(1), title="Nothing to see"))
+    assert not story_filter(1, dict(story(1), title="Spam here"))
+    assert StoryFilter(title_include=["[bad"]).title_include is None
+
+def test_read_history_hides_read_stories_only_when_enabled(tmp_path):
+    read_history = ReadHistory(str(tmp_path / "read.bin"))
+    read_history.mark_read(1)
+    hiding = compile_story_filter({"HIDE_READ_STORIES": True}, read_history)
+    assert not hiding(1, story(1))
+    assert hiding(2, story(2))
+    assert compile_story_filter({"HIDE_READ_STORIES": False}, read_history) is None
+
+def test_empty_settings_compile_to_no_filter():
+    assert compile_story_filter({}) is None
+    assert compile_story_filter({"FILTER_MIN_SCORE": 0, "FILTER_TITLE_INCLUDE": []}) is None
+    assert compile_story_filter({"FILTER_MIN_SCORE": 5}) is not None
@@ -0,0 +1,90 @@
+from fakes import ITEM_URL_TEMPLATE, UPDATES_URL, FakeSession, story
+
+from hn_cache import CACHE_FRESH, CACHE_NEGATIVE, CACHE_STALE_SCORE, ItemCache
+from hn_incremental import IncrementalRefresher
+
+def make_session(changed=(), items=None):
+    items = items if items is not None else [story(item_id) for item_id in range(1, 9)]
+    return FakeSession(routes={UPDATES_URL: {"items": list(changed), "profiles": []}}, items=items)
+
+def refresh(refresher, session, story_ids, max_articles=5, **kwargs):
+    stats = {}
+    articles = refresher.refresh(
+        session, story_ids, max_articles, timeout=1, max_workers=4, stats=stats,
+        item_url_template=ITEM_URL_TEMPLATE, **kwargs
+    )
+    return articles, stats
+
+def test_build_overrides_refetches_changed_and_skips_unlistable_items():
+    refresher = IncrementalRefresher(updates_url=UPDATES_URL)
+    job = {"id": 3, "type": "job", "title": "Hiring"}
+    comment = {"id": 4, "type": "comment"}
+    refresher.known_items = {1: story(1), 2: story(2), 3: job, 4: comment, 5: None}
+    assert refresher.build_overrides({2, 4, 99}) == {
+        1: (CACHE_FRESH, story(1)),
+        2: (CACHE_STALE_SCORE, story(2)),
+        3: (CACHE_FRESH, job),
+        4: (CACHE_NEGATIVE, comment),
+        5: (CACHE_NEGATIVE, None),
+    }
+
+def test_first_cycle_is_a_full_refresh():
+    session = make_session()
+    articles, stats = refresh(IncrementalRefresher(updates_url=UPDATES_URL), session, list(range(1, 9)))
+    assert [article["id"] for article in articles] == [1, 2, 3, 4, 5]
+    assert stats["incremental"] is False
+    assert stats["requests_saved"] == 0
+    assert UPDATES_URL not in session.requests
+
+def test_incremental_cycle_requests_only_changed_and_new_items():
+    refresher = IncrementalRefresher(updates_url=UPDATES_URL)
+    refresh(refresher, make_session(), [1, 2, 3, 4, 5])
+
+    session = make_session(changed=[2])
+    articles, stats = refresh(refresher, session, [6, 1, 2, 3, 4, 5])
+    assert [article["id"] for article in articles] == [6, 1, 2, 3, 4]
+    assert sorted(session.item_requests()) == [2, 6]
+    assert session.requests.count(UPDATES_URL) == 1
+    assert stats["incremental"] is True
+    # 1, 3 and 4 were reused; updates.json cost one request
+    assert stats["requests_saved"] == 2
+
+def test_changed_scores_come_from_the_network():
+    refresher = IncrementalRefresher(updates_url=UPDATES_URL)
+    refresh(refresher, make_session(), [1, 2])
+    session = make_session(changed=[2], items=[story(1), story(2, score=99)])
+    articles, _ = refresh(refresher, session, [1, 2], max_articles=2)
+    assert [article["score"] for article in articles] == [10, 99]
+
+def test_full_cycle_with_a_warm_cache_saves_nothing(tmp_path):
+    cache = ItemCache(str(tmp_path / "items.sqlite3"))
+    try:
+        # A negative gap makes every cycle a full refresh
+        refresher = IncrementalRefresher(max_gap=-1, updates_url=UPDATES_URL)
+        refresh(refresher, make_session(), [1, 2, 3, 4, 5], cache=cache)
+        session = make_session()
+        _, stats = refresh(refresher, session, [1, 2, 3, 4, 5], cache=cache)
+        assert stats["cache_hits"] == 5
+        assert stats["incremental"] is False
+        assert stats["requests_saved"] == 0
+        assert session.requests == []
+    finally:
+        cache.close()
+
+def test_unavailable_updates_feed_falls_back_to_a_full_refresh():
+    refresher = IncrementalRefresher(updates_url=UPDATES_URL)
+    refresh(refresher, make_session(), [1, 2, 3])
+    session = FakeSession(items=[story(item_id) for item_id in range(1, 4)], failing={UPDATES_URL})
+    articles, stats = refresh(refresher, session, [1, 2, 3], max_articles=3)
+    assert len(articles) == 3
+    assert stats["incremental"] is False
+    assert sorted(session.item_requests()) == [1, 2, 3]
+
+def test_stale_knowledge_is_not_trusted():
+    refresher = IncrementalRefresher(max_gap=600, updates_url=UPDATES_URL)
+    refresh(refresher, make_session(), [1, 2])
+    refresher.last_cycle_time -= 601
+    session = make_session()
+    _, stats = refresh(refresher, session, [1, 2], max_articles=2)
+    assert stats["incremental"] is False
+    assert sorted(session.item_requests()) == [1, 2]
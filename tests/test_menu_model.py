@@ -0,0 +1,95 @@
+import random
+
+import pytest
+
+from hn_menu_model import OP_PLACE, OP_RELINK, OP_REMOVE, OP_RETITLE, MenuModel
+
+def apply_to_list(rows, operations):
+    """Applies edit operations to a plain list of (key, title, url) rows, as the menu does. Returns the new list."""
+    rows = list(rows)
+    for operation in operations:
+        kind, key = operation[0], operation[1]
+        index = next((i for i, row in enumerate(rows) if row[0] == key), None)
+        if kind == OP_REMOVE:
+            del rows[index]
+        elif kind == OP_PLACE:
+            _, _, anchor, title, url = operation
+            if index is not None:
+                del rows[index]
+            position = len(rows) if anchor is None else next(i for i, row in enumerate(rows) if row[0] == anchor)
+            rows.insert(position, (key, title, url))
+        elif kind == OP_RETITLE:
+            rows[index] = (key, operation[2], rows[index][2])
+        elif kind == OP_RELINK:
+            rows[index] = (key, rows[index][1], operation[2])
+        else:
+            raise AssertionError(f"unknown operation {operation!r}")
+    return rows
+
+def random_rows(rng, keys, max_rows=12):
+    rows = []
+    for key in rng.sample(keys, rng.randint(0, min(max_rows, len(keys)))):
+        rows.append((key, f"title {rng.randint(0, 2)}", rng.choice([None, f"https://example.com/{rng.randint(0, 2)}"])))
+    if rows and rng.random() < 0.2:
+        # Duplicate keys keep their first row
+        rows.append((rows[0][0], "duplicate", None))
+    return rows
+
+def unique(rows):
+    seen = set()
+    return [row for row in rows if row[0] not in seen and not seen.add(row[0])]
+
+@pytest.mark.parametrize("seed", range(200))
+def test_random_updates_replay_to_the_new_rows(seed):
+    rng = random.Random(seed)
+    keys = list(range(1, 16)) + ["status"]
+    model = MenuModel()
+    rows = []
+    for _ in range(10):
+        new_rows = random_rows(rng, keys)
+        operations = model.update(new_rows)
+        assert apply_to_list(rows, operations) == unique(new_rows)
+        assert model.rows == unique(new_rows)
+
+        new_keys = {row[0] for row in new_rows}
+        removed = [operation[1] for operation in operations if operation[0] == OP_REMOVE]
+        assert set(removed) == {key for key, _, _ in rows if key not in new_keys}
+        # Each row is touched at most once per kind of edit
+        touched = [(operation[0], operation[1]) for operation in operations]
+        assert len(touched) == len(set(touched))
+        rows = unique(new_rows)
+
+def test_unchanged_rows_produce_no_edits():
+    model = MenuModel()
+    rows = [(1, "a", "u1"), (2, "b", "u2"), (3, "c", None)]
+    model.update(rows)
+    assert model.update(list(rows)) == []
+
+def test_title_change_retitles_one_row():
+    model = MenuModel()
+    model.update([(1, "a", "u1"), (2, "b", "u2")])
+    assert model.update([(1, "a", "u1"), (2, "b (10)", "u2")]) == [(OP_RETITLE, 2, "b (10)")]
+
+def test_url_change_relinks_one_row():
+    model = MenuModel()
+    model.update([(1, "a", "u1")])
+    assert model.update([(1, "a", "u2")]) == [(OP_RELINK, 1, "u2")]
+
+def test_row_moved_to_the_top_is_the_only_placement():
+    model = MenuModel()
+    rows = [(key, str(key), None) for key in range(1, 6)]
+    model.update(rows)
+    operations = model.update([rows[4]] + rows[:4])
+    assert operations == [(OP_PLACE, 5, 1, "5", None)]
+
+def test_new_row_is_inserted_before_its_successor():
+    model = MenuModel()
+    model.update([(1, "a", None), (3, "c", None)])
+    assert model.update([(1, "a", None), (2, "b", None), (3, "c", None)]) == [(OP_PLACE, 2, 3, "b", None)]
+
+def test_dropped_rows_are_removed_first():
+    model = MenuModel()
+    model.update([(1, "a", None), (2, "b", None)])
+    operations = model.update([(3, "c", None)])
+    assert operations[:2] == [(OP_REMOVE, 1), (OP_REMOVE, 2)]
+    assert operations[2:] == [(OP_PLACE, 3, None, "c", None)]
@@ -0,0 +1,59 @@
+import random
+import struct
+
+from hn_read_history import ReadHistory
+
+def test_membership_is_exact_for_read_and_unread_ids(tmp_path):
+    history = ReadHistory(str(tmp_path / "read.bin"), max_entries=1000)
+    rng = random.Random(3)
+    read = set(rng.sample(range(1, 10_000_000), 500))
+    for item_id in read:
+        assert history.mark_read(item_id)
+    assert len(history) == 500
+    assert all(item_id in history for item_id in read)
+    unread = set(rng.sample(range(1, 10_000_000), 5000)) - read
+    assert not any(item_id in history for item_id in unread)
+
+def test_marking_twice_or_none_is_a_no_op(tmp_path):
+    history = ReadHistory(str(tmp_path / "read.bin"))
+    assert history.mark_read(5)
+    assert not history.mark_read(5)
+    assert not history.mark_read(None)
+    assert len(history) == 1
+
+def test_round_trip_through_the_file(tmp_path):
+    path = str(tmp_path / "read.bin")
+    history = ReadHistory(path)
+    for item_id in (30, 10, 20):
+        history.mark_read(item_id)
+    reloaded = ReadHistory(path)
+    assert [item_id for item_id in (10, 20, 30, 40) if item_id in reloaded] == [10, 20, 30]
+
+def test_file_is_sorted_little_endian_32_bit_ids(tmp_path):
+    path = tmp_path / "read.bin"
+    history = ReadHistory(str(path))
+    for item_id in (0x01020304, 7, 300):
+        history.mark_read(item_id)
+    assert path.read_bytes() == struct.pack("<3I", 7, 300, 0x01020304)
+
+def test_cap_drops_the_lowest_ids(tmp_path):
+    path = tmp_path / "read.bin"
+    history = ReadHistory(str(path), max_entries=3)
+    for item_id in (50, 10, 40, 20, 30):
+        history.mark_read(item_id)
+    assert [item_id for item_id in (10, 20, 30, 40, 50) if item_id in history] == [30, 40, 50]
+    assert path.read_bytes() == struct.pack("<3I", 30, 40, 50)
+
+def test_hand_edited_file_is_sorted_deduplicated_and_capped(tmp_path):
+    path = tmp_path / "read.bin"
+    path.write_bytes(struct.pack("<6I", 9, 3, 9, 1, 7, 5))
+    history = ReadHistory(str(path), max_entries=4)
+    assert len(history) == 4
+    assert [item_id for item_id in range(1, 10) if item_id in history] == [3, 5, 7, 9]
+    history.mark_read(8)
+    assert path.read_bytes() == struct.pack("<4I", 5, 7, 8, 9)
+
+def test_missing_file_is_an_empty_history(tmp_path):
+    history = ReadHistory(str(tmp_path / "read.bin"))
+    assert len(history) == 0
+    assert 1 not in history
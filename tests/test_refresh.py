@@ -0,0 +1,105 @@
+import threading
+
+from hn_refresh import RefreshWorker
+
+TIMEOUT = 5
+
+class BlockingRefresh:
+    """A refresh function that counts its calls and blocks until released."""
+
+    def __init__(self):
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        assert self.release.wait(TIMEOUT)
+        return self.calls
+
+def test_triggers_during_a_cycle_are_coalesced():
+    refresh = BlockingRefresh()
+    applied = []
+    worker = RefreshWorker(refresh, applied.append)
+    try:
+        assert worker.request_refresh()
+        assert refresh.started.wait(TIMEOUT)
+        assert worker.busy
+        assert not worker.request_refresh()
+        assert not worker.request_refresh()
+        refresh.release.set()
+        assert worker.wait_idle(TIMEOUT)
+    finally:
+        worker.stop()
+    assert refresh.calls == 1
+    assert worker.cycles_run == 1
+    assert worker.triggers_coalesced == 2
+    assert applied == [1]
+    assert not worker.busy
+
+def test_rerun_if_busy_runs_a_single_follow_up_cycle():
+    refresh = BlockingRefresh()
+    applied = []
+    worker = RefreshWorker(refresh, applied.append)
+    try:
+        worker.request_refresh()
+        assert refresh.started.wait(TIMEOUT)
+        assert not worker.request_refresh(rerun_if_busy=True)
+        assert not worker.request_refresh(rerun_if_busy=True)
+        assert not worker.request_refresh()
+        refresh.release.set()
+        assert worker.wait_idle(TIMEOUT)
+    finally:
+        worker.stop()
+    assert refresh.calls == 2
+    assert applied == [1, 2]
+
+def test_a_trigger_after_the_cycle_starts_a_new_one():
+    refresh = BlockingRefresh()
+    refresh.release.set()
+    applied = []
+    worker = RefreshWorker(refresh, applied.append)
+    try:
+        for _ in range(3):
+            assert worker.request_refresh()
+            assert worker.wait_idle(TIMEOUT)
+    finally:
+        worker.stop()
+    assert applied == [1, 2, 3]
+    assert worker.triggers_coalesced == 0
+
+def test_results_are_applied_through_the_dispatcher():
+    dispatched = []
+    applied = []
+
+    def dispatch(function, result):
+        dispatched.append(result)
+        function(result)
+
+    worker = RefreshWorker(lambda: "articles", applied.append, dispatch=dispatch)
+    try:
+        worker.request_refresh()
+        assert worker.wait_idle(TIMEOUT)
+    finally:
+        worker.stop()
+    assert dispatched == ["articles"]
+    assert applied == ["articles"]
+
+def test_a_failing_refresh_applies_none():
+    def refresh():
+        raise RuntimeError("network down")
+
+    applied = []
+    worker = RefreshWorker(refresh, applied.append)
+    try:
+        worker.request_refresh()
+        assert worker.wait_idle(TIMEOUT)
+    finally:
+        worker.stop()
+    assert applied == [None]
+
+def test_stopped_worker_ignores_triggers():
+    worker = RefreshWorker(lambda: None, lambda result: None)
+    worker.stop()
+    assert not worker.request_refresh()
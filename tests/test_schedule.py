@@ -0,0 +1,96 @@
+import random
+
+import pytest
+
+from hn_schedule import (
+    BREAKER_CLOSED, BREAKER_OPEN, JITTER_FRACTION, STABLE_CYCLES, WAKE_GRACE_SECONDS, AdaptiveScheduler,
+)
+
+class NoJitter(random.Random):
+    def uniform(self, a, b):
+        return 0.0
+
+def make_scheduler(base_interval=600, **kwargs):
+    kwargs.setdefault("min_interval", 300)
+    kwargs.setdefault("max_interval", 4800)
+    kwargs.setdefault("retry_base", 30)
+    kwargs.setdefault("breaker_failures", 5)
+    kwargs.setdefault("breaker_cooldown", 1800)
+    return AdaptiveScheduler(base_interval, rng=NoJitter(), **kwargs)
+
+def test_failures_back_off_exponentially_up_to_the_interval():
+    scheduler = make_scheduler(base_interval=200, breaker_failures=10)
+    delays = [scheduler.record_failure(now=0)[0] for _ in range(5)]
+    assert delays == [30, 60, 120, 200, 200]
+
+def test_breaker_notifies_exactly_once_until_recovery():
+    scheduler = make_scheduler()
+    opened = [scheduler.record_failure(now=0)[1] for _ in range(8)]
+    assert opened == [False] * 4 + [True] + [False] * 3
+    assert scheduler.breaker == BREAKER_OPEN
+    assert scheduler.record_failure(now=0)[0] == 1800
+
+    delay, recovered = scheduler.record_success([1, 2, 3], now=0)
+    assert recovered
+    assert scheduler.breaker == BREAKER_CLOSED
+    assert delay == 600
+    assert not scheduler.record_success([1, 2, 3], now=0)[1]
+    # A new run of failures starts from the first retry and opens the breaker (and notifies) again
+    opened = [scheduler.record_failure(now=0) for _ in range(5)]
+    assert opened[0] == (30, False)
+    assert [was_opened for _, was_opened in opened] == [False] * 4 + [True]
+
+def test_churn_halves_and_stability_doubles_the_interval():
+    scheduler = make_scheduler(base_interval=1200)
+    scheduler.record_success([1, 2, 3, 4, 5], now=0)
+    assert scheduler.record_success([6, 2, 3, 4, 5], now=0)[0] == 600
+    assert scheduler.record_success([7, 8, 3, 4, 5], now=0)[0] == 300
+    assert scheduler.record_success([9, 10, 3, 4, 5], now=0)[0] == 300 # Floor
+    for _ in range(STABLE_CYCLES - 1):
+        assert scheduler.record_success([9, 10, 3, 4, 5], now=0)[0] == 300
+    assert scheduler.record_success([9, 10, 3, 4, 5], now=0)[0] == 600
+
+def test_interval_never_exceeds_the_maximum():
+    scheduler = make_scheduler(base_interval=4000)
+    for _ in range(4 * STABLE_CYCLES):
+        delay, _ = scheduler.record_success([1, 2], now=0)
+    assert delay == 4800
+
+def test_configured_interval_below_the_minimum_is_kept():
+    scheduler = make_scheduler(base_interval=60)
+    assert scheduler.record_success([1], now=0)[0] == 60
+    scheduler.set_base_interval(900, now=0)
+    assert scheduler.interval == 900
+    assert scheduler.min_interval == 300
+    scheduler.set_base_interval(120, now=0)
+    assert scheduler.interval == 120
+
+def test_jitter_stays_within_its_fraction():
+    scheduler = AdaptiveScheduler(600, rng=random.Random(1))
+    for cycle in range(50):
+        # Same stories in a new order: neither churn nor a stable list, so the interval stays put
+        delay, _ = scheduler.record_success([1, 2] if cycle % 2 else [2, 1], now=0)
+        assert 600 * (1 - JITTER_FRACTION) <= delay <= 600 * (1 + JITTER_FRACTION)
+
+def test_due_respects_pause_postpone_and_wake_grace():
+    scheduler = make_scheduler()
+    assert scheduler.due(now=0)
+    scheduler.record_success([1], now=0)
+    assert not scheduler.due(now=599)
+    assert scheduler.due(now=600)
+    scheduler.postpone(60, now=600)
+    assert not scheduler.due(now=630)
+    scheduler.pause()
+    assert not scheduler.due(now=10000)
+    scheduler.resume(now=10000)
+    assert not scheduler.due(now=10000)
+    assert scheduler.due(now=10000 + WAKE_GRACE_SECONDS)
+
+@pytest.mark.parametrize("failures", [1, 3])
+def test_changing_the_interval_keeps_a_pending_retry(failures):
+    scheduler = make_scheduler()
+    for _ in range(failures):
+        scheduler.record_failure(now=0)
+    next_due = scheduler.next_due
+    scheduler.set_base_interval(300, now=0)
+    assert scheduler.next_due == next_due
@@ -0,0 +1,83 @@
+import json
+
+from hn_stream import TopStoriesStream, apply_firebase_event, entries_to_ids, parse_sse
+
+def test_parse_sse_splits_events_on_blank_lines():
+    lines = [
+        "event: put",
+        'data: {"path": "/", "data": [1, 2]}',
+        "",
+        "event: keep-alive",
+        "data: null",
+        "",
+    ]
+    assert list(parse_sse(lines)) == [
+        ("put", '{"path": "/", "data": [1, 2]}', None, None),
+        ("keep-alive", "null", None, None),
+    ]
+
+def test_parse_sse_joins_data_lines_and_reads_id_and_retry():
+    lines = ["id: 7", "retry: 2500", "data: first", "data:second", ""]
+    assert list(parse_sse(lines)) == [("message", "first\nsecond", "7", 2500)]
+
+def test_parse_sse_skips_comments_and_keeps_the_last_id():
+    lines = [": ping", "", "id: 1", "event: put", "data: x", "", None, "event: patch", "data: y", ""]
+    assert list(parse_sse(lines)) == [("put", "x", "1", None), ("patch", "y", "1", None)]
+
+def test_parse_sse_ignores_an_unterminated_event():
+    assert list(parse_sse(["event: put", "data: x"])) == []
+
+def test_put_at_the_root_replaces_the_list():
+    entries = {0: 9}
+    assert apply_firebase_event(entries, "put", {"path": "/", "data": [1, 2, None, 4]})
+    assert entries == {0: 1, 1: 2, 3: 4}
+    assert entries_to_ids(entries) == [1, 2, 4]
+
+def test_put_at_the_root_accepts_a_sparse_dict_and_null():
+    entries = {}
+    apply_firebase_event(entries, "put", {"path": "/", "data": {"3": 30, "1": 10}})
+    assert entries_to_ids(entries) == [10, 30]
+    apply_firebase_event(entries, "put", {"path": "/", "data": None})
+    assert entries == {}
+
+def test_put_at_an_index_sets_or_deletes_one_entry():
+    entries = {0: 1, 1: 2}
+    apply_firebase_event(entries, "put", {"path": "/1", "data": 5})
+    apply_firebase_event(entries, "put", {"path": "/2", "data": 6})
+    assert entries_to_ids(entries) == [1, 5, 6]
+    apply_firebase_event(entries, "put", {"path": "/0", "data": None})
+    assert entries_to_ids(entries) == [5, 6]
+
+def test_patch_merges_indexes():
+    entries = {0: 1, 1: 2, 2: 3}
+    assert apply_firebase_event(entries, "patch", {"path": "/", "data": {"0": 7, "2": None, "5": 8}})
+    assert entries == {0: 7, 1: 2, 5: 8}
+
+def test_unsupported_events_are_rejected():
+    entries = {0: 1}
+    assert not apply_firebase_event(entries, "patch", {"path": "/0", "data": {"x": 1}})
+    assert not apply_firebase_event(entries, "cancel", {})
+    assert entries == {0: 1}
+
+def test_stream_reports_only_visible_window_changes():
+    changes = []
+    stream = TopStoriesStream(changes.append, window_size=2, session=object())
+    window = stream.window_size
+    ids = list(range(100, 100 + window + 5))
+    stream._handle_patch("put", json.dumps({"path": "/", "data": ids}))
+    assert changes == [ids]
+    # Beyond the visible window: the list updates, nobody is told
+    stream._handle_patch("put", json.dumps({"path": f"/{window + 2}", "data": 1}))
+    assert len(changes) == 1
+    assert stream.story_ids[window + 2] == 1
+    stream._handle_patch("patch", json.dumps({"path": "/", "data": {"0": 42}}))
+    assert len(changes) == 2
+    assert changes[-1][0] == 42
+
+def test_stream_ignores_malformed_events():
+    changes = []
+    stream = TopStoriesStream(changes.append, window_size=2, session=object())
+    stream._handle_patch("put", "{not json")
+    stream._handle_patch("put", json.dumps({"path": "/x", "data": 1}))
+    assert changes == []
+    assert stream.story_ids is None
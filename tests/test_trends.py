@@ -0,0 +1,128 @@
+import os
+import random
+import struct
+
+import hn_trends
+from hn_trends import FORMAT_MAGIC, HEADER, MISSING, RANK_MOVE, ScoreHistory
+
+def assert_same_history(history, path):
+    loaded = ScoreHistory(path, max_items=history.capacity, samples=history.samples,
+                          evict_seconds=history.evict_seconds)
+    loaded._load()
+    for saved, read_back in zip(history._arrays(), loaded._arrays()):
+        assert saved == read_back
+    assert loaded.head == history.head
+    assert loaded.slots == history.slots
+    assert sorted(loaded.free) == sorted(history.free)
+    return loaded
+
+T0 = 1_700_000_000.0 # Row time 0 means "not written yet", so tests use real timestamps
+
+def random_snapshot(rng):
+    return {
+        rng.randrange(1, 60): (rng.randrange(0, 500), rng.randrange(0, 12))
+        for _ in range(rng.randrange(0, 15))
+    }
+
+def test_in_place_saves_match_the_history_after_evictions_and_slot_reuse(tmp_path):
+    path = str(tmp_path / "history.bin")
+    history = ScoreHistory(path, max_items=20, samples=6, evict_seconds=3000)
+    rng = random.Random(7)
+    now = T0
+    partial_saves = 0
+    for cycle in range(300):
+        # Short gaps update the newest row, long ones evict; 20 slots for 59 ids forces reuse
+        now += rng.choice([30, 300, 900, 4000])
+        history.record(now, random_snapshot(rng))
+        partial_saves += history.last_save_bytes < os.path.getsize(path)
+        assert_same_history(history, path)
+        if cycle % 50 == 49:
+            # Carry on from what is on disk, as after a restart
+            history = assert_same_history(history, path)
+    assert partial_saves > 250
+    assert len(history.ids) == 20
+
+def test_file_layout_is_a_fixed_header_then_little_endian_arrays(tmp_path):
+    path = str(tmp_path / "history.bin")
+    history = ScoreHistory(path, max_items=4, samples=3)
+    history.record(T0 + 1000, {0x01020304: (7, 1)})
+    history.record(T0 + 2000, {0x01020304: (9, 2)})
+    with open(path, "rb") as f:
+        data = f.read()
+    assert HEADER.unpack_from(data) == (FORMAT_MAGIC, 4, 3, history.head)
+    assert len(data) == HEADER.size + history.memory_bytes()
+    assert struct.unpack_from("<I", data, HEADER.size) == (0x01020304,)
+    scores_offset = history._offsets()[id(history.scores)]
+    assert struct.unpack_from("<i", data, scores_offset + 4 * history.head * 4) == (9,)
+
+def test_size_change_starts_a_new_history_and_rewrites_the_file(tmp_path):
+    path = str(tmp_path / "history.bin")
+    history = ScoreHistory(path, max_items=4, samples=3)
+    history.record(T0 + 1000, {1: (5, 1)})
+    resized = ScoreHistory(path, max_items=8, samples=3)
+    resized.record(T0 + 2000, {2: (5, 1)})
+    assert 1 not in resized.slots
+    assert resized.last_save_bytes == os.path.getsize(path) == HEADER.size + resized.memory_bytes()
+    assert_same_history(resized, path)
+
+def test_older_format_starts_a_new_history(tmp_path):
+    path = str(tmp_path / "history.bin")
+    with open(path, "wb") as f:
+        f.write(struct.pack("<5sI", b"HNTS1", 2) + b"{}")
+    history = ScoreHistory(path, max_items=4, samples=3)
+    history.record(T0 + 1000, {1: (5, 1)})
+    assert history.last_save_bytes == os.path.getsize(path)
+    assert_same_history(history, path)
+
+def test_too_many_writes_or_a_missing_file_fall_back_to_a_full_rewrite(tmp_path, monkeypatch):
+    path = str(tmp_path / "history.bin")
+    history = ScoreHistory(path, max_items=10, samples=4)
+    history.record(T0 + 1000, {1: (5, 1), 2: (6, 2)})
+    history.record(T0 + 2000, {1: (7, 1)})
+    assert history.last_save_bytes < os.path.getsize(path)
+
+    monkeypatch.setattr(hn_trends, "MAX_PARTIAL_WRITES", 0)
+    history.record(T0 + 3000, {1: (8, 1)})
+    assert history.last_save_bytes == os.path.getsize(path)
+    monkeypatch.undo()
+
+    os.remove(path)
+    history.record(T0 + 4000, {1: (9, 1)})
+    assert history.last_save_bytes == os.path.getsize(path)
+    assert_same_history(history, path)
+
+def test_velocities_rank_changes_and_trending():
+    history = ScoreHistory(None, max_items=10, samples=10)
+    history.record(T0, {1: (10, 0), 2: (100, 1), 3: (50, 2), 4: (40, 3), 5: (30, 4)})
+    # One hour later 1 is out of the feeds (missing from the reference row); then 3 falls and 5 climbs
+    history.record(T0 + 3600, {2: (100, 1), 5: (35, 2), 4: (45, 3), 3: (55, 4)})
+    history.record(T0 + 7200, {1: (60, 0), 2: (130, 1), 5: (95, 2), 4: (50, 3), 3: (56, 6)})
+    now = T0 + 7200
+
+    velocities = history.velocities(now)
+    by_id = {history.ids[slot]: velocity for slot, velocity in enumerate(velocities) if history.ids[slot]}
+    assert by_id[2] == 30.0
+    assert by_id[5] == 60.0
+    # Missing from the reference row: measured from its first score, two hours ago
+    assert by_id[1] == 25.0
+    assert history.trending(now, 2) == [(5, 60.0), (2, 30.0)]
+
+    assert history.rank_change(2, now) == 0
+    assert history.rank_change(3, now) == -2
+    assert history.rank_change(1, now) is None # Not on the top list now
+    assert history.rank_change(99, now) is None
+
+def test_unranked_item_entering_the_top_list_counts_as_a_riser():
+    history = ScoreHistory(None, max_items=10, samples=10)
+    history.record(T0, {1: (10, 0), 2: (10, 1)})
+    history.record(T0 + 3600, {1: (30, 1), 2: (10, 2), 3: (5, 3)})
+    assert history.rank_change(1, T0 + 3600) == RANK_MOVE
+    assert history.rank_change(3, T0 + 3600) == 0 # No snapshot back then
+
+def test_missing_items_are_recorded_as_missing():
+    history = ScoreHistory(None, max_items=3, samples=2)
+    history.record(T0, {1: (10, 1)})
+    history.record(T0 + 600, {2: (10, 1)})
+    slot = history.slots[1]
+    assert history.scores[history.head * 3 + slot] == MISSING
+    assert history.velocities(T0 + 600)[slot] < 0
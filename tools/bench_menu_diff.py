@@ -0,0 +1,117 @@
+"""
+Counts the menu items a refresh touches with the keyed menu model.
+
+Builds a menu of --articles rows the way the app does (format_menu_title,
+keyed by story id), applies a set of typical refresh changes and reports, per
+scenario, how many edit operations MenuModel produced versus the rows a full
+rebuild would recreate, and the time to diff. The edits are replayed on a
+plain list and checked against the expected menu. Runs on any platform;
+rumps is not needed.
+
+Usage:
+    python tools/bench_menu_diff.py --articles 100
+    python tools/bench_menu_diff.py --articles 30 --repeat 1000 --json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hn_core import format_menu_title
+from hn_menu_model import OP_PLACE, OP_RELINK, OP_REMOVE, OP_RETITLE, MenuModel
+
+def replay(rows, operations):
+    """Applies edit operations to a plain list of (key, title, url) rows, as the menu would. Returns the new list."""
+    rows = list(rows)
+    for operation in operations:
+        kind, key = operation[0], operation[1]
+        index = next((i for i, row in enumerate(rows) if row[0] == key), None)
+        if kind == OP_REMOVE:
+            del rows[index]
+        elif kind == OP_PLACE:
+            _, _, anchor, title, url = operation
+            if index is not None:
+                del rows[index]
+            position = len(rows) if anchor is None else next(i for i, row in enumerate(rows) if row[0] == anchor)
+            rows.insert(position, (key, title, url))
+        elif kind == OP_RETITLE:
+            rows[index] = (key, operation[2], rows[index][2])
+        elif kind == OP_RELINK:
+            rows[index] = (key, rows[index][1], operation[2])
+    return rows
+
+def make_articles(count, first_id=1000):
+    return [
+        {"id": first_id + i, "title": f"Story number {first_id + i}", "score": 500 - i,
+         "url": f"https://example.com/{first_id + i}"}
+        for i in range(count)
+    ]
+
+def menu_rows(articles):
+    return [(article["id"], format_menu_title(i, article), article["url"]) for i, article in enumerate(articles)]
+
+def scenarios(articles):
+    """Yields (name, new articles) for typical changes between two refreshes."""
+    def changed(index, **fields):
+        result = [dict(article) for article in articles]
+        result[index].update(fields)
+        return result
+
+    middle = len(articles) // 2
+    yield "unchanged", articles
+    yield "one score changed", changed(middle, score=articles[middle]["score"] + 1)
+    yield "one url changed", changed(middle, url="https://example.com/moved")
+    swapped = list(articles)
+    swapped[middle], swapped[middle + 1] = swapped[middle + 1], swapped[middle]
+    yield "two neighbours swapped", swapped
+    yield "story dropped from the end", articles[:-1]
+    yield "new story at the top", make_articles(1, first_id=1) + articles[:-1]
+    shuffled = list(articles)
+    random.Random(0).shuffle(shuffled)
+    yield "shuffled", shuffled
+    yield "all replaced", make_articles(len(articles), first_id=10 ** 6)
+
+def run_benchmark(args):
+    articles = make_articles(args.articles)
+    results = []
+    for name, new_articles in scenarios(articles):
+        old_rows, new_rows = menu_rows(articles), menu_rows(new_articles)
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            model = MenuModel()
+            model.update(old_rows)
+            operations = model.update(new_rows)
+        diff_seconds = (time.perf_counter() - started) / args.repeat
+        if replay(old_rows, operations) != new_rows:
+            raise AssertionError(f"Edits for '{name}' do not reproduce the new menu")
+        results.append({
+            "scenario": name,
+            "operations": len(operations),
+            "rebuild_items": len(new_rows),
+            "diff_us": diff_seconds * 1e6,
+        })
+    return {"articles": args.articles, "scenarios": results}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=100, help="Rows in the menu")
+    parser.add_argument("--repeat", type=int, default=200, help="Diffs timed per scenario")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    args = parser.parse_args()
+
+    result = run_benchmark(args)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(f"menu of {result['articles']} rows")
+    for row in result["scenarios"]:
+        print(f"{row['scenario']:>27}: {row['operations']:4d} items touched "
+              f"(rebuild: {row['rebuild_items']})  diff {row['diff_us']:8.1f} us")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""
+Benchmarks the headless refresh pipeline against the local fake Hacker News API.
+
+Runs repeated refresh cycles through HackerNewsCore and reports wall time
+(mean/p50/p99), request count and bytes transferred per cycle, as counted by
+the server, plus the client-side request latency from the core's metrics.
+Runs on any platform; rumps is not needed.
+
+Usage:
+    python tools/bench_refresh.py --cycles 20 --articles 30 --latency-ms 80
+    python tools/bench_refresh.py --cache --incremental --churn 2 --json
+    python tools/bench_refresh.py --workers 1   # sequential baseline
+    python tools/bench_refresh.py --feeds new,best,ask,show,job --feed-limit 10
+    python tools/bench_refresh.py --min-score 450 --title-exclude "^Show"
+    python tools/bench_refresh.py --backend algolia   # one request per refresh (Algolia stand-in)
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_hn_api import add_config_arguments, algolia_base_url, config_from_args, start_fake_api
+from hn_backends import BACKENDS, BACKEND_FIREBASE
+from hn_core import HackerNewsCore, format_menu_bar_title, format_menu_title
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+def summarize(values):
+    return {
+        "mean": statistics.mean(values),
+        "p50": percentile(values, 0.50),
+        "p99": percentile(values, 0.99),
+        "max": max(values),
+    }
+
+def run_benchmark(args):
+    """Runs the configured cycles and returns the result dict."""
+    server, state, base_url = start_fake_api(config_from_args(args))
+    cache_dir = tempfile.mkdtemp(prefix="hn-bench-") if args.cache else None
+    settings = {
+        "HN_API_BASE": base_url,
+        "HN_BACKEND": args.backend,
+        "ALGOLIA_API_BASE": algolia_base_url(base_url),
+        "BACKEND_FALLBACK": not args.no_fallback,
+        "MAX_ARTICLES_IN_MENU": args.articles,
+        "MAX_FETCH_WORKERS": args.workers,
+        "ITEM_CACHE_ENABLED": args.cache,
+        "INCREMENTAL_REFRESH": args.incremental,
+        "REQUEST_TIMEOUT": args.timeout,
+        "FEEDS": {feed: args.feed_limit for feed in args.feeds.split(",") if feed},
+        "FILTER_MIN_SCORE": args.min_score,
+        "FILTER_TITLE_EXCLUDE": args.title_exclude,
+    }
+    core = HackerNewsCore(
+        settings, item_cache_path=os.path.join(cache_dir, "item_cache.sqlite3") if cache_dir else None,
+        score_history_path=None,
+    )
+    cycles = []
+    try:
+        for cycle in range(args.cycles):
+            if cycle and args.churn:
+                state.churn(new_stories=args.churn)
+            state.reset_counters()
+            started = time.perf_counter()
+            feeds, cycle_metrics = core.fetch_feeds()
+            articles = feeds["top"] if feeds is not None else None
+            if articles:
+                format_menu_bar_title(articles[0], "", 50)
+                for index, article in enumerate(articles):
+                    format_menu_title(index, article)
+            wall = time.perf_counter() - started
+            client = core.finish_cycle(cycle_metrics)
+            counters = state.snapshot()
+            cycles.append({
+                "wall_seconds": wall,
+                "requests": counters["requests"],
+                "bytes": counters["bytes"],
+                "errors": counters["errors"],
+                "duplicate_item_requests": counters["duplicate_item_requests"],
+                "articles": len(articles or []),
+                "client_requests": client["requests"],
+                "latency_max_seconds": client["latency_max"],
+                "skipped_by_type": client.get("skipped_by_type", {}),
+            })
+    finally:
+        core.close()
+        server.shutdown()
+        if cache_dir:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    # The first cycle starts cold (new connections, empty cache); report it apart.
+    warm = cycles[1:] or cycles
+    return {
+        "config": {key: value for key, value in vars(args).items() if key != "json"},
+        "cold_cycle": cycles[0],
+        "wall_seconds": summarize([c["wall_seconds"] for c in warm]),
+        "requests": summarize([c["requests"] for c in warm]),
+        "bytes": summarize([c["bytes"] for c in warm]),
+        "latency_max_seconds": summarize([c["latency_max_seconds"] for c in warm]),
+        "client_requests_total": sum(c["client_requests"] for c in cycles),
+        "server_requests_total": sum(c["requests"] for c in cycles),
+        "errors_total": sum(c["errors"] for c in cycles),
+        "duplicate_item_requests_total": sum(c["duplicate_item_requests"] for c in cycles),
+        "short_cycles": sum(1 for c in cycles if c["articles"] < args.articles),
+        "cycles": len(cycles),
+    }
+
+def print_report(result):
+    cold = result["cold_cycle"]
+    print(f"cycles: {result['cycles']}  (cold cycle: {cold['wall_seconds'] * 1000:.1f} ms, "
+          f"{cold['requests']} requests, {cold['bytes']} bytes)")
+    for name, unit, scale in (("wall_seconds", "ms", 1000), ("requests", "", 1), ("bytes", "B", 1),
+                              ("latency_max_seconds", "ms", 1000)):
+        stats = result[name]
+        print(f"{name:>19}: mean {stats['mean'] * scale:10.1f}{unit}  p50 {stats['p50'] * scale:10.1f}{unit}  "
+              f"p99 {stats['p99'] * scale:10.1f}{unit}  max {stats['max'] * scale:10.1f}{unit}")
+    print(f"server errors: {result['errors_total']}  duplicate item requests: {result['duplicate_item_requests_total']}  "
+          f"cycles short of articles: {result['short_cycles']}  "
+          f"requests seen by client/server: {result['client_requests_total']}/{result['server_requests_total']}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_config_arguments(parser)
+    parser.add_argument("--cycles", type=int, default=20, help="Refresh cycles to run")
+    parser.add_argument("--articles", type=int, default=30, help="MAX_ARTICLES_IN_MENU")
+    parser.add_argument("--workers", type=int, default=32, help="MAX_FETCH_WORKERS")
+    parser.add_argument("--timeout", type=float, default=10, help="REQUEST_TIMEOUT")
+    parser.add_argument("--cache", action="store_true", help="Use an item cache in a temporary directory")
+    parser.add_argument("--incremental", action="store_true", help="Enable incremental refresh")
+    parser.add_argument("--feeds", default="", help="Comma-separated extra feeds (new,best,ask,show,job)")
+    parser.add_argument("--feed-limit", type=int, default=5, help="Articles per extra feed")
+    parser.add_argument("--backend", choices=BACKENDS, default=BACKEND_FIREBASE, help="HN_BACKEND")
+    parser.add_argument("--no-fallback", action="store_true", help="Disable BACKEND_FALLBACK")
+    parser.add_argument("--min-score", type=int, default=0, help="FILTER_MIN_SCORE")
+    parser.add_argument("--title-exclude", action="append", default=[], help="FILTER_TITLE_EXCLUDE pattern (repeatable)")
+    parser.add_argument("--churn", type=int, default=0, help="New stories arriving between cycles")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    result = run_benchmark(args)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmarks the score history behind the Trending view and riser/faller marks.
+
+Simulates weeks of refreshes: each cycle a window of --visible stories is
+shown (new ones arriving on top, older ones leaving every feed), their
+scores grow at random rates, and the history records a snapshot and
+computes all velocities. Reports the time per snapshot (including the save)
+and per velocity pass, the bytes written per save, the fixed memory of the
+arrays, the file size and how many stories are tracked at the end. Runs on any platform; rumps is not needed.
+
+Usage:
+    python tools/bench_trends.py --max-items 3000 --cycles 2000
+    python tools/bench_trends.py --interval 300 --visible 400 --json
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hn_trends import DEFAULT_MAX_ITEMS, DEFAULT_SAMPLES, ScoreHistory
+
+def run_benchmark(args):
+    temp_dir = tempfile.mkdtemp(prefix="hn-trends-")
+    path = os.path.join(temp_dir, "score_history.bin")
+    history = ScoreHistory(path, max_items=args.max_items, samples=args.samples)
+    rng = random.Random(args.seed)
+    rates = {} # id -> points per cycle
+    scores = {}
+    next_id = 1
+    window = []
+    now = time.time()
+    record_seconds, velocity_seconds, save_bytes = [], [], []
+    try:
+        for _ in range(args.cycles):
+            now += args.interval
+            for _ in range(args.arrivals):
+                window.insert(0, next_id)
+                rates[next_id] = rng.expovariate(1 / 5)
+                next_id += 1
+            del window[args.visible:]
+            observed = {}
+            for rank, item_id in enumerate(window, 1):
+                scores[item_id] = scores.get(item_id, 0) + int(rng.random() * 2 * rates[item_id])
+                observed[item_id] = (scores[item_id], rank if rank <= 30 else 0)
+            started = time.perf_counter()
+            history.record(now, observed)
+            record_seconds.append(time.perf_counter() - started)
+            save_bytes.append(history.last_save_bytes)
+            started = time.perf_counter()
+            history.trending(now, 10)
+            velocity_seconds.append(time.perf_counter() - started)
+        return {
+            "cycles": args.cycles,
+            "simulated_days": args.cycles * args.interval / 86400,
+            "stories_seen": next_id - 1,
+            "tracked_at_end": len(history),
+            "array_bytes": history.memory_bytes(),
+            "file_bytes": os.path.getsize(path),
+            "save_bytes": {"mean": statistics.mean(save_bytes), "max": max(save_bytes)},
+            "record_ms": {"mean": statistics.mean(record_seconds) * 1000, "max": max(record_seconds) * 1000},
+            "velocity_ms": {"mean": statistics.mean(velocity_seconds) * 1000, "max": max(velocity_seconds) * 1000},
+        }
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cycles", type=int, default=2000, help="Refreshes to simulate")
+    parser.add_argument("--interval", type=float, default=600, help="Seconds between refreshes")
+    parser.add_argument("--visible", type=int, default=300, help="Stories shown (observed) per refresh")
+    parser.add_argument("--arrivals", type=int, default=3, help="New stories per refresh")
+    parser.add_argument("--max-items", type=int, default=DEFAULT_MAX_ITEMS, help="TREND_MAX_ITEMS")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES, help="TREND_SAMPLES")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    args = parser.parse_args()
+
+    result = run_benchmark(args)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(f"{result['cycles']} refreshes over {result['simulated_days']:.1f} days, "
+          f"{result['stories_seen']} stories seen, {result['tracked_at_end']} tracked at the end")
+    print(f"memory: {result['array_bytes'] / 1024:.0f} KB of arrays  file: {result['file_bytes'] / 1024:.0f} KB")
+    print(f"written per save: mean {result['save_bytes']['mean'] / 1024:.1f} KB  "
+          f"max {result['save_bytes']['max'] / 1024:.0f} KB")
+    for name in ("record_ms", "velocity_ms"):
+        print(f"{name:>12}: mean {result[name]['mean']:.2f} ms  max {result[name]['max']:.2f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+"""
+Local fake of the Hacker News Firebase API for benchmarks.
+
+Serves /v0/topstories.json (and the new/best/ask/show/job feeds, which
+overlap it), /v0/item/<id>.json and /v0/updates.json with
+configurable latency, error rate, item mix (jobs, polls, url-less posts) and
+list size, and counts requests and bytes so a client's cost can be measured.
+
+It also stands in for the HN Search (Algolia) API: /api/v1/search answers
+`tags=front_page` with the first FRONT_PAGE_SIZE top stories as search hits,
+and `tags=(story,job),story_<id>` with that one item, from the same items.
+
+Usage:
+    python tools/fake_hn_api.py --port 8766 --latency-ms 80 --error-rate 0.02
+"""
+
+import argparse
+import json
+import logging
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+ALGOLIA_PREFIX = "/api/v1" # Path of the Algolia stand-in, next to /v0
+FRONT_PAGE_SIZE = 30 # Stories on the front page, like the real site
+STORY_TAG_PATTERN = re.compile(r"story_(\d+)")
+
+# --- Configuration ---
+class FakeApiConfig:
+    """Behaviour knobs of the fake API."""
+
+    def __init__(self, latency_ms=50.0, jitter_ms=10.0, error_rate=0.0, list_size=500,
+                 job_fraction=0.03, poll_fraction=0.01, no_url_fraction=0.08, first_id=40000000, seed=1):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.list_size = list_size
+        self.job_fraction = job_fraction
+        self.poll_fraction = poll_fraction
+        self.no_url_fraction = no_url_fraction
+        self.first_id = first_id
+        self.seed = seed
+
+# --- Server State ---
+class FakeApiState:
+    """Top list, item store and request counters shared by all handler threads."""
+
+    def __init__(self, config):
+        self.config = config
+        self.lock = threading.Lock()
+        self.random = random.Random(config.seed)
+        self.top_ids = [config.first_id + config.list_size - index for index in range(config.list_size)]
+        self.items = {}
+        self.changed = []
+        self.requests = 0
+        self.bytes_sent = 0
+        self.errors = 0
+        self.paths = {}
+        self.item_requests = {} # id -> times requested, to spot duplicate fetches
+
+    def feed_ids(self, endpoint):
+        """Returns a feed's id list, derived from the top list so feeds share items like the real ones do."""
+        ids = list(self.top_ids)
+        if endpoint == "newstories":
+            return sorted(ids, reverse=True)
+        if endpoint == "beststories":
+            return ids[5:] + ids[:5]
+        if endpoint in ("askstories", "showstories"):
+            return ids[::3] if endpoint == "askstories" else ids[1::3]
+        if endpoint == "jobstories":
+            return [item_id for item_id in ids if self.item(item_id)["type"] == "job"]
+        return ids
+
+    def item(self, item_id):
+        with self.lock:
+            if item_id not in self.items:
+                # Seeded by id so every run sees the same mix.
+                rng = random.Random(item_id * 7919 + self.config.seed)
+                roll = rng.random()
+                item = {"id": item_id, "by": "fake", "time": 1700000000 + item_id % 100000,
+                        "title": f"Fake story {item_id} " + "x" * rng.randint(0, 60),
+                        "score": rng.randint(1, 900), "descendants": rng.randint(0, 400), "type": "story"}
+                if roll < self.config.job_fraction:
+                    item["type"] = "job"
+                elif roll < self.config.job_fraction + self.config.poll_fraction:
+                    item["type"] = "poll"
+                if rng.random() >= self.config.no_url_fraction:
+                    item["url"] = f"https://example.com/{item_id}"
+                self.items[item_id] = item
+            return dict(self.items[item_id])
+
+    def search(self, tags, hits_per_page):
+        """Answers an Algolia search: the front page, or the one item named by a story_<id> tag."""
+        if "front_page" in tags:
+            items = [self.item(item_id) for item_id in self.top_ids[:FRONT_PAGE_SIZE]]
+        else:
+            match = STORY_TAG_PATTERN.search(tags)
+            items = [self.item(int(match.group(1)))] if match else []
+            items = [item for item in items if item["type"] in ("story", "job")]
+        return {"hits": [algolia_hit(item, "front_page" in tags) for item in items[:hits_per_page]],
+                "hitsPerPage": hits_per_page, "nbHits": len(items)}
+
+    def churn(self, new_stories=1, score_changes=5):
+        """Simulates time passing: new stories arrive on top, some scores move."""
+        with self.lock:
+            self.changed = []
+            for _ in range(new_stories):
+                new_id = max(self.top_ids) + 1
+                self.top_ids.insert(0, new_id)
+                self.top_ids.pop()
+                self.changed.append(new_id)
+            for item_id in self.random.sample(self.top_ids[:60], min(score_changes, len(self.top_ids))):
+                if item_id in self.items:
+                    self.items[item_id]["score"] += self.random.randint(1, 20)
+                self.changed.append(item_id)
+
+    def count(self, path, size, error=False):
+        with self.lock:
+            self.requests += 1
+            self.bytes_sent += size
+            self.errors += int(error)
+            if path.startswith(ALGOLIA_PREFIX):
+                kind = "search"
+            else:
+                kind = path.split("/")[2] if path.count("/") >= 2 else path
+            self.paths[kind] = self.paths.get(kind, 0) + 1
+            if kind == "item":
+                self.item_requests[path] = self.item_requests.get(path, 0) + 1
+
+    def snapshot(self):
+        """Returns the counters as a dict."""
+        with self.lock:
+            duplicates = sum(count - 1 for count in self.item_requests.values())
+            return {"requests": self.requests, "bytes": self.bytes_sent, "errors": self.errors,
+                    "paths": dict(self.paths), "duplicate_item_requests": duplicates}
+
+    def reset_counters(self):
+        with self.lock:
+            self.requests = self.bytes_sent = self.errors = 0
+            self.paths = {}
+            self.item_requests = {}
+
+def algolia_hit(item, front_page=False):
+    """Converts a fake Firebase item into an Algolia search hit."""
+    tags = [item["type"], f"author_{item['by']}", f"story_{item['id']}"] + (["front_page"] if front_page else [])
+    return {"objectID": str(item["id"]), "title": item["title"], "url": item.get("url"),
+            "points": item["score"], "author": item["by"], "created_at_i": item["time"],
+            "num_comments": item["descendants"], "_tags": tags}
+
+# --- HTTP Handler ---
+def make_handler(state):
+    class FakeApiHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True # Headers and body go out separately; don't stall on delayed ACKs
+
+        def log_message(self, format, *args):
+            logging.debug(f"fake-api: {format % args}")
+
+        def respond(self, status, body, path):
+            # Count first: the client may read the body and snapshot the counters before write() returns
+            state.count(path, len(body), error=status >= 500)
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            config = state.config
+            url = urlsplit(self.path)
+            path = url.path
+            delay = max(0.0, config.latency_ms + random.uniform(-config.jitter_ms, config.jitter_ms)) / 1000.0
+            time.sleep(delay)
+            if config.error_rate and random.random() < config.error_rate:
+                self.respond(503, b'{"error": "fake outage"}', path)
+                return
+            if path.startswith("/v0/") and path.endswith("stories.json"):
+                value = state.feed_ids(path[len("/v0/"):-len(".json")])
+            elif path == "/v0/updates.json":
+                value = {"items": list(state.changed), "profiles": []}
+            elif path.startswith("/v0/item/") and path.endswith(".json"):
+                value = state.item(int(path[len("/v0/item/"):-len(".json")]))
+            elif path == f"{ALGOLIA_PREFIX}/search":
+                query = parse_qs(url.query)
+                value = state.search(query.get("tags", [""])[0], int(query.get("hitsPerPage", ["20"])[0]))
+            else:
+                self.respond(404, b'{"error": "not found"}', path)
+                return
+            self.respond(200, json.dumps(value).encode(), path)
+
+    return FakeApiHandler
+
+class FakeApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256 # Concurrent clients connect in bursts
+
+def start_fake_api(config=None, port=0):
+    """Starts the fake API on a daemon thread. Returns (server, state, base_url); see algolia_base_url()."""
+    state = FakeApiState(config or FakeApiConfig())
+    server = FakeApiServer(("127.0.0.1", port), make_handler(state))
+    threading.Thread(target=server.serve_forever, name="fake-hn-api", daemon=True).start()
+    return server, state, f"http://127.0.0.1:{server.server_port}/v0"
+
+def algolia_base_url(base_url):
+    """Returns the Algolia stand-in's base URL (ALGOLIA_API_BASE) for a fake API base URL."""
+    return base_url[:-len("/v0")] + ALGOLIA_PREFIX
+
+def add_config_arguments(parser):
+    """Adds the FakeApiConfig knobs to an argparse parser."""
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Mean per-request latency")
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="Uniform latency jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--list-size", type=int, default=500, help="Length of topstories.json")
+    parser.add_argument("--job-fraction", type=float, default=0.03)
+    parser.add_argument("--poll-fraction", type=float, default=0.01)
+    parser.add_argument("--no-url-fraction", type=float, default=0.08)
+    parser.add_argument("--seed", type=int, default=1)
+
+def config_from_args(args):
+    """Builds a FakeApiConfig from parsed add_config_arguments() options."""
+    return FakeApiConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        list_size=args.list_size, job_fraction=args.job_fraction, poll_fraction=args.poll_fraction,
+        no_url_fraction=args.no_url_fraction, seed=args.seed,
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8766)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    server, state, base_url = start_fake_api(config_from_args(args), args.port)
+    logging.info(f"Fake Hacker News API at {base_url} (set HN_API_BASE in settings.json to use it)")
+    logging.info(f"Algolia stand-in at {algolia_base_url(base_url)} (ALGOLIA_API_BASE, with HN_BACKEND \"algolia\")")
+    try:
+        while True:
+            time.sleep(60)
+            logging.info(f"fake-api counters: {state.snapshot()}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
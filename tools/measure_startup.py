@@ -0,0 +1,121 @@
+"""
+Measures how long the app takes to put its first title in the menu bar.
+
+Launches hn_menu_bar.py (or a built .app's executable) repeatedly with the
+startup probe enabled; the app reports the time from launch to its first
+title and quits. Runs with and without a saved menu snapshot show the effect
+of painting the last session's menu.
+
+--imports measures the first-paint import path instead (everything the app
+imports before drawing, minus rumps/pyobjc), which works on any platform and
+fails if `requests` is pulled back onto it or the budget is exceeded.
+
+Usage:
+    python tools/measure_startup.py --runs 10
+    python tools/measure_startup.py --app dist/HackerNewsMenuBar.app/Contents/MacOS/HackerNewsMenuBar
+    python tools/measure_startup.py --imports --budget-ms 40
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# What hn_menu_bar imports before the first title is drawn (besides rumps and pyobjc)
+FIRST_PAINT_MODULES = (
+    "hn_core", "hn_feeds", "hn_filters", "hn_fetch", "hn_menu_model", "hn_metrics", "hn_read_history",
+    "hn_refresh", "hn_schedule", "hn_trends",
+)
+# Must stay off the first-paint path
+DEFERRED_MODULES = ("requests", "urllib3", "webbrowser", "subprocess", "hn_session", "hn_stream")
+FIRST_TITLE_PATTERN = re.compile(r"first_title_ms=([0-9.]+)")
+
+def measure_launch(command, timeout):
+    """Launches the app once and returns its reported time-to-first-title in ms."""
+    env = dict(os.environ, HN_STARTUP_PROBE=repr(time.time()))
+    result = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True, timeout=timeout)
+    match = FIRST_TITLE_PATTERN.search(result.stdout)
+    if not match:
+        raise RuntimeError(f"App did not report a first title:\n{result.stdout}\n{result.stderr}")
+    return float(match.group(1))
+
+def measure_imports():
+    """Imports the first-paint modules in a fresh interpreter. Returns (total_ms, per-module ms, loaded modules)."""
+    code = (
+        "import json, sys, time\n"
+        "started = time.perf_counter()\n"
+        f"for name in {FIRST_PAINT_MODULES!r}: __import__(name)\n"
+        "print(json.dumps({'total_ms': (time.perf_counter() - started) * 1000, 'modules': sorted(sys.modules)}))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    report = json.loads(result.stdout)
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() in FIRST_PAINT_MODULES:
+            cumulative[parts[2].strip()] = int(parts[1]) / 1000
+    return report["total_ms"], cumulative, set(report["modules"])
+
+def run_launches(args):
+    command = [args.app] if args.app else [sys.executable, os.path.join(ROOT, "hn_menu_bar.py")]
+    snapshot_path = os.path.join(ROOT, "last_menu.json")
+    has_snapshot = os.path.exists(snapshot_path)
+    timings = [measure_launch(command, args.timeout) for _ in range(args.runs)]
+    return {
+        "snapshot": has_snapshot,
+        "runs": len(timings),
+        "mean_ms": statistics.mean(timings),
+        "p50_ms": statistics.median(timings),
+        "max_ms": max(timings),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Launches (or import runs) to measure")
+    parser.add_argument("--app", help="App executable to launch instead of hn_menu_bar.py")
+    parser.add_argument("--timeout", type=float, default=30, help="Seconds to wait for each launch")
+    parser.add_argument("--imports", action="store_true", help="Measure the first-paint import path only")
+    parser.add_argument("--budget-ms", type=float, help="Exit with an error if the mean exceeds this")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    args = parser.parse_args()
+
+    if args.imports:
+        runs = [measure_imports() for _ in range(args.runs)]
+        loaded = set.union(*(modules for _, _, modules in runs))
+        result = {
+            "runs": len(runs),
+            "mean_ms": statistics.mean(total for total, _, _ in runs),
+            "p50_ms": statistics.median(total for total, _, _ in runs),
+            "max_ms": max(total for total, _, _ in runs),
+            "modules_ms": runs[-1][1],
+            "deferred_modules_loaded": sorted(name for name in DEFERRED_MODULES if name in loaded),
+        }
+    else:
+        result = run_launches(args)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        label = "first-paint imports" if args.imports else f"time to first title (snapshot: {result['snapshot']})"
+        print(f"{label}: mean {result['mean_ms']:.1f} ms  p50 {result['p50_ms']:.1f} ms  "
+              f"max {result['max_ms']:.1f} ms over {result['runs']} runs")
+        for name, ms in sorted(result.get("modules_ms", {}).items()):
+            print(f"  {name:>12}: {ms:.1f} ms (cumulative)")
+
+    if result.get("deferred_modules_loaded"):
+        sys.exit(f"Deferred modules imported on the first-paint path: {', '.join(result['deferred_modules_loaded'])}")
+    if args.budget_ms is not None and result["mean_ms"] > args.budget_ms:
+        sys.exit(f"Startup budget exceeded: {result['mean_ms']:.1f} ms > {args.budget_ms:.1f} ms")
+
+if __name__ == '__main__':
+    main()
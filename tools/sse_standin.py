@@ -0,0 +1,188 @@
+"""
+Local stand-in for the Firebase Hacker News API with server-sent-events streaming.
+
+Serves /v0/topstories.json (plain JSON, or a text/event-stream when asked for
+one), /v0/item/<id>.json and /v0/updates.json. While a stream is open the top
+list is shuffled every --interval seconds and the change is sent as a Firebase
+`put` or `patch` event, so the streaming mode can be exercised offline.
+
+Usage:
+    python tools/sse_standin.py --port 8765
+    python tools/sse_standin.py --demo --duration 20 --drop-after 5
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# --- Fake Top List ---
+class TopList:
+    """Thread-safe fake top stories list that changes over time."""
+
+    def __init__(self, size=500, first_id=40000000):
+        self.lock = threading.Lock()
+        self.next_id = first_id + size
+        self.ids = list(range(first_id + size - 1, first_id - 1, -1))
+        self.changed = []
+        self.version = 0
+
+    def mutate(self):
+        """Applies one random change; returns the Firebase (event, payload) describing it."""
+        with self.lock:
+            self.version += 1
+            if random.random() < 0.3:
+                # A new story lands at the top: everything shifts, send the whole list.
+                self.ids.insert(0, self.next_id)
+                self.ids.pop()
+                self.changed = [self.next_id]
+                self.next_id += 1
+                return "put", {"path": "/", "data": list(self.ids)}
+            # Two stories near the top swap places: send only the changed indices.
+            first, second = random.sample(range(min(10, len(self.ids))), 2)
+            self.ids[first], self.ids[second] = self.ids[second], self.ids[first]
+            self.changed = [self.ids[first], self.ids[second]]
+            return "patch", {"path": "/", "data": {str(first): self.ids[first], str(second): self.ids[second]}}
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.ids)
+
+def make_item(item_id):
+    """Builds a deterministic fake item; roughly one in ten is a job or url-less post."""
+    item = {"id": item_id, "by": "standin", "time": int(time.time()), "title": f"Stand-in story {item_id}",
+            "type": "story", "score": item_id % 500}
+    if item_id % 10 == 3:
+        item["type"] = "job"
+    if item_id % 10 != 7:
+        item["url"] = f"https://example.com/{item_id}"
+    return item
+
+# --- HTTP Handler ---
+def make_handler(top_list, interval, keepalive, drop_after):
+    class StandInHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True # Headers and body go out separately; don't stall on delayed ACKs
+
+        def log_message(self, format, *args):
+            logging.debug(f"standin: {format % args}")
+
+        def send_json(self, value):
+            body = json.dumps(value).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def send_event(self, event, payload):
+            data = json.dumps(payload) if payload is not None else "null"
+            self.wfile.write(f"event: {event}\ndata: {data}\n\n".encode())
+            self.wfile.flush()
+
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            if path == "/v0/topstories.json":
+                if "text/event-stream" in self.headers.get("Accept", ""):
+                    self.stream_top_stories()
+                else:
+                    self.send_json(top_list.snapshot())
+            elif path == "/v0/updates.json":
+                self.send_json({"items": list(top_list.changed), "profiles": []})
+            elif path.startswith("/v0/item/") and path.endswith(".json"):
+                self.send_json(make_item(int(path[len("/v0/item/"):-len(".json")])))
+            else:
+                self.send_error(404)
+
+        def stream_top_stories(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            sent = 0
+            try:
+                # Like Firebase, every connection starts with the full current value.
+                self.send_event("put", {"path": "/", "data": top_list.snapshot()})
+                sent += 1
+                next_change = time.time() + interval
+                next_keepalive = time.time() + keepalive
+                while drop_after is None or sent < drop_after:
+                    now = time.time()
+                    if now >= next_change:
+                        event, payload = top_list.mutate()
+                        self.send_event(event, payload)
+                        sent += 1
+                        next_change = now + interval
+                    elif now >= next_keepalive:
+                        self.send_event("keep-alive", None)
+                        next_keepalive = now + keepalive
+                    time.sleep(0.05)
+                logging.info(f"standin: dropping stream after {sent} events")
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    return StandInHandler
+
+def start_server(port=0, interval=2.0, keepalive=30.0, drop_after=None, size=500):
+    """Starts the stand-in on a daemon thread. Returns (server, base_url)."""
+    top_list = TopList(size=size)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(top_list, interval, keepalive, drop_after))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="sse-standin", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/v0"
+
+# --- Demo Client ---
+def run_demo(base_url, duration, window_size):
+    """Connects a TopStoriesStream to the stand-in and logs every visible-window change."""
+    from hn_stream import TopStoriesStream
+
+    changes = []
+    stream = TopStoriesStream(
+        on_window_change=lambda ids: changes.append(time.time()) or logging.info(f"demo: window now {ids[:window_size]}"),
+        window_size=window_size,
+        url=f"{base_url}/topstories.json",
+        on_fallback=lambda: logging.warning("demo: stream fell back to polling"),
+        retry_seconds=0.5,
+    )
+    stream.start()
+    time.sleep(duration)
+    stream.stop()
+    logging.info(f"demo: {len(changes)} window changes from {stream.events_received} events")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--interval", type=float, default=2.0, help="Seconds between list changes while streaming")
+    parser.add_argument("--keepalive", type=float, default=30.0, help="Seconds between keep-alive events")
+    parser.add_argument("--drop-after", type=int, default=None, help="Close each stream after this many events")
+    parser.add_argument("--size", type=int, default=500, help="Length of the fake top list")
+    parser.add_argument("--demo", action="store_true", help="Run a streaming client against the stand-in")
+    parser.add_argument("--duration", type=float, default=20.0, help="Demo length in seconds")
+    parser.add_argument("--window", type=int, default=5, help="Demo visible window size")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    server, base_url = start_server(args.port, args.interval, args.keepalive, args.drop_after, args.size)
+    logging.info(f"Stand-in Hacker News API at {base_url}")
+    try:
+        if args.demo:
+            run_demo(base_url, args.duration, args.window)
+        else:
+            while True:
+                time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()